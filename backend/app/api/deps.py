@@ -1,15 +1,16 @@
-from typing import Annotated
-from fastapi import Depends, HTTPException, status
+from typing import Annotated, Optional
+from fastapi import Depends, HTTPException, Query, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
 from sqlmodel import Session, select
 from app.db.models import User, UserRole
 
 from app.core.config import JWT_SECRET_KEY, ALGORITHM
-from app.db.database import get_session
+from app.db.database import engine, get_session
 from app.db.models import User
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login")
+optional_oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/users/login", auto_error=False)
 
 def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotated[Session, Depends(get_session)]) -> User:
     credentials_exception = HTTPException(
@@ -30,6 +31,26 @@ def get_current_user(token: Annotated[str, Depends(oauth2_scheme)], db: Annotate
         raise credentials_exception
     return user
 
+def get_stream_user(
+    header_token: Annotated[Optional[str], Depends(optional_oauth2_scheme)],
+    access_token: Annotated[Optional[str], Query(description="JWT for clients that cannot set headers (EventSource)")] = None,
+) -> User:
+    """
+    Like get_current_user, for long-lived streams: also accepts `?access_token=`
+    and uses its own short session so the stream does not pin a DB connection.
+    """
+    token = header_token or access_token
+    if not token:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    with Session(engine) as db:
+        user = get_current_user(token, db)
+        db.expunge(user)
+    return user
+
 # Authorization Dependencies
 def get_super_admin(current_user: Annotated[User, Depends(get_current_user)]) -> User:
     """
@@ -1,16 +1,43 @@
-from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlmodel import Session, select
-from app.db.models import Club, Event 
+from typing import List, Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, File, HTTPException, Query, Response, UploadFile, status
+from sqlmodel import Session, func, or_, select
 from app.schemas import DashboardStats
+from app.core.rollups import dashboard_rollup
+from app.core.exports import export_response
+from app.core import fast_json, user_import
+from app.core.response_cache import response_cache
+from app.core.pagination import decode_cursor, keyset_after, set_next_cursor
 
 from app.db.database import get_session
 from app.db.models import User, UserRole
 from app.api.deps import get_super_admin
 from app.schemas import UserPublic
+from app.face.matcher import remove_face_from_index
 
 router = APIRouter()
 
+USER_EXPORT_HEADER = ("id", "email", "full_name", "role", "whatsapp_verified", "created_at")
+
+
+_USER_ROWS = fast_json.RowShape({"id": User.id, "email": User.email, "full_name": User.full_name, "role": User.role})
+
+
+def _filter_users(statement, q: Optional[str], role: Optional[UserRole]):
+    if q:
+        q = q.strip()
+        statement = statement.where(or_(
+            User.full_name.icontains(q, autoescape=True),
+            User.email.istartswith(q, autoescape=True),
+        ))
+    if role is not None:
+        statement = statement.where(User.role == role)
+    return statement
+
+
+def _user_directory_query(columns, q: Optional[str], role: Optional[UserRole]):
+    # Sirf chahiye wale columns - face_encoding / password hash kabhi load nahi hote
+    return _filter_users(select(*columns), q, role).order_by(User.id)
+
 # Naya endpoint
 @router.get("/stats", response_model=DashboardStats)
 def get_dashboard_stats(
@@ -20,25 +47,93 @@ def get_dashboard_stats(
     """
     Super Admin dashboard ke liye stats fetch karein.
     """
-    total_users = db.exec(select(User)).all()
-    active_clubs = db.exec(select(Club)).all()
-    total_events = db.exec(select(Event)).all()
-
+    # Saari rows load karke len() nahi - rollup ke counters
+    totals = dashboard_rollup.totals()
     return DashboardStats(
-        total_users=len(total_users),
-        active_clubs=len(active_clubs),
-        total_events=len(total_events),
+        total_users=totals["users"],
+        active_clubs=totals["clubs"],
+        total_events=totals["events"],
+        reconciled_at=totals["reconciled_at"],
+        age_seconds=totals["age_seconds"],
     )
 
+@router.get("/cache-stats", response_model=dict)
+def get_cache_stats(super_admin: Annotated[User, Depends(get_super_admin)]):
+    """
+    Hit / miss counters and size of the catalog response cache. (Super Admin only)
+    """
+    return response_cache.stats()
+
+
 @router.get("/users", response_model=List[UserPublic])
 def get_all_users(
+    response: Response,
+    db: Annotated[Session, Depends(get_session)],
+    super_admin: Annotated[User, Depends(get_super_admin)],
+    q: Optional[str] = Query(None, max_length=100, description="Name contains / email starts with"),
+    role: Optional[UserRole] = None,
+    limit: int = Query(100, ge=1, le=500),
+    cursor: Optional[str] = None,
+):
+    """
+    Search users by name, email prefix and role, in id order. (Super Admin only)
+    The next page's cursor is in the X-Next-Cursor header.
+    """
+    statement = _user_directory_query(_USER_ROWS.columns, q, role)
+    if cursor:
+        statement = statement.where(keyset_after((User.id,), decode_cursor(cursor, int)))
+    rows = set_next_cursor(response, db.exec(statement.limit(limit + 1)).all(), limit, key=lambda row: (row.id,))
+    return fast_json.json_response(fast_json.dumps(_USER_ROWS.dicts(rows), List[UserPublic]), dict(response.headers))
+
+
+@router.get("/users/role-counts", response_model=dict)
+def get_user_role_counts(
+    db: Annotated[Session, Depends(get_session)],
+    super_admin: Annotated[User, Depends(get_super_admin)],
+    q: Optional[str] = Query(None, max_length=100),
+):
+    """
+    Users per role for the same search as the directory. (Super Admin only)
+    """
+    # Ek GROUP BY - directory ka sirf ek page gin-ne se galat counts aate
+    statement = _filter_users(select(User.role, func.count(User.id)), q, None).group_by(User.role)
+    counts = dict(db.exec(statement).all())
+    return {role.value: counts.get(role, 0) for role in UserRole}
+
+
+@router.get("/users/export", summary="Export the user directory (Super Admin only)")
+def export_users(
+    super_admin: Annotated[User, Depends(get_super_admin)],
+    q: Optional[str] = Query(None, max_length=100),
+    role: Optional[UserRole] = None,
+    format: Literal["csv", "xlsx", "pdf"] = "csv",
+):
+    """Same filters as the directory, streamed from a server-side cursor."""
+    statement = _user_directory_query(
+        (User.id, User.email, User.full_name, User.role, User.whatsapp_verified, User.created_at), q, role
+    )
+    label = role.value if role else "all"
+    return export_response(format, USER_EXPORT_HEADER, statement, f"users-{label}", f"Users ({label})")
+
+
+@router.post("/users/import", response_model=dict)
+def import_users(
     db: Annotated[Session, Depends(get_session)],
     super_admin: Annotated[User, Depends(get_super_admin)],
+    file: UploadFile = File(...),
+    format: Optional[Literal["csv", "json"]] = None,
 ):
     """
-    Get a list of all users. (Super Admin only)
+    Create many users from a CSV or JSON file. (Super Admin only)
+    Columns: email, full_name, password, role, whatsapp_number. Invalid or
+    existing rows are reported per row; the rest are created in one go.
     """
-    return db.exec(select(User)).all()
+    fmt = format or ("json" if (file.filename or "").lower().endswith(".json") else "csv")
+    try:
+        rows = user_import.parse_rows(file.file.read(), fmt)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    return user_import.import_users(db, rows)
 
 
 @router.put("/users/{user_id}/role", response_model=UserPublic)
@@ -81,6 +176,7 @@ def delete_user(
         
     db.delete(user_to_delete)
     db.commit()
+    remove_face_from_index(user_id)
     return {"message": f"User with ID {user_id} deleted successfully."}
 
 
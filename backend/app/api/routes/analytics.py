@@ -1,75 +1,71 @@
-from datetime import datetime, timedelta
-from typing import Annotated, Dict, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import date, datetime, timedelta
+from typing import Annotated, Dict, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlmodel import Session, select, func
+from app.core.config import ANALYTICS_MAX_SERIES_DAYS
+from app.core.daily_stats import SITE_WIDE, series, total
+from app.core.engagement import engagement_cache
+from app.core.rollups import dashboard_rollup
 from app.db.database import get_session
 from app.db.models import User, Club, Event, Membership, EventRegistration, Announcement
 from app.api.deps import get_current_user
 
 router = APIRouter()
 
+Metric = Literal["members", "registrations", "attendance", "signups"]
+ClubMetric = Literal["members", "registrations", "attendance"]
+
+def _series_window(start: Optional[date], end: Optional[date], default_days: int = 30):
+    end = end or datetime.utcnow().date()
+    start = start or end - timedelta(days=default_days - 1)
+    if start > end:
+        raise HTTPException(status_code=400, detail="start must not be after end")
+    if (end - start).days + 1 > ANALYTICS_MAX_SERIES_DAYS:
+        raise HTTPException(status_code=400, detail=f"Window can be at most {ANALYTICS_MAX_SERIES_DAYS} days")
+    return start, end
+
 @router.get("/dashboard-stats")
-async def get_dashboard_stats(
+def get_dashboard_stats(
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[Session, Depends(get_session)]
 ):
-    """Get overall dashboard statistics"""
-    
-    # Total counts
-    total_users = db.exec(select(func.count(User.id))).first()
-    total_clubs = db.exec(select(func.count(Club.id))).first()
-    total_events = db.exec(select(func.count(Event.id))).first()
-    
-    # Active events (future events)
-    active_events = db.exec(
-        select(func.count(Event.id)).where(Event.date >= datetime.now())
-    ).first()
+    """Get overall dashboard statistics (served from the in-memory rollup; see `freshness`)"""
     
-    # Recent registrations (last 30 days)
-    thirty_days_ago = datetime.now() - timedelta(days=30)
-    recent_users = db.exec(
-        select(func.count(User.id)).where(User.id >= 1)  # Assuming auto-increment IDs
-    ).first()
-    
-    # Most popular clubs (by member count)
-    popular_clubs = db.exec(
-        select(Club.name, func.count(Membership.user_id).label('member_count'))
-        .join(Membership, Club.id == Membership.club_id, isouter=True)
-        .group_by(Club.id, Club.name)
-        .order_by(func.count(Membership.user_id).desc())
-        .limit(5)
-    ).all()
+    # Har load par saat aggregate queries ki jagah precomputed rollup
+    stats = dashboard_rollup.dashboard()
+    # Last 30 days ke signups - daily rollup ka ek chhota range scan
+    today = datetime.utcnow().date()
+    stats["totals"]["recent_users"] = total(db, SITE_WIDE, "signups", today - timedelta(days=29))
+    return stats
+
+@router.get("/timeseries")
+def get_site_timeseries(
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    start: Optional[date] = Query(None, description="First UTC day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last UTC day, inclusive (default: today)"),
+    metrics: List[Metric] = Query(["members", "registrations", "attendance", "signups"]),
+):
+    """Daily site-wide counts for the window, one zero-filled value per day"""
     
-    # Upcoming events with registration counts
-    upcoming_events = db.exec(
-        select(Event.name, Event.date, func.count(EventRegistration.user_id).label('registrations'))
-        .join(EventRegistration, Event.id == EventRegistration.event_id, isouter=True)
-        .where(Event.date >= datetime.now())
-        .group_by(Event.id, Event.name, Event.date)
-        .order_by(Event.date)
-        .limit(5)
-    ).all()
+    start, end = _series_window(start, end)
+    return series(db, SITE_WIDE, start, end, metrics)
+
+@router.get("/club-analytics/{club_id}/timeseries")
+def get_club_timeseries(
+    club_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    start: Optional[date] = Query(None, description="First UTC day (default: 29 days before end)"),
+    end: Optional[date] = Query(None, description="Last UTC day, inclusive (default: today)"),
+    metrics: List[ClubMetric] = Query(["members", "registrations", "attendance"]),
+):
+    """Daily joins, registrations and attendance for a club; `members_total` is the member count over time"""
     
-    return {
-        "totals": {
-            "users": total_users or 0,
-            "clubs": total_clubs or 0,
-            "events": total_events or 0,
-            "active_events": active_events or 0
-        },
-        "popular_clubs": [
-            {"name": club.name, "members": club.member_count or 0} 
-            for club in popular_clubs
-        ],
-        "upcoming_events": [
-            {
-                "name": event.name, 
-                "date": event.date.isoformat(), 
-                "registrations": event.registrations or 0
-            } 
-            for event in upcoming_events
-        ]
-    }
+    if not db.get(Club, club_id):
+        raise HTTPException(status_code=404, detail="Club not found")
+    start, end = _series_window(start, end)
+    return series(db, club_id, start, end, metrics)
 
 @router.get("/club-analytics/{club_id}")
 async def get_club_analytics(
@@ -84,7 +80,7 @@ async def get_club_analytics(
     if not club:
         raise HTTPException(status_code=404, detail="Club not found")
     
-    # Member count over time (simplified - just current count)
+    # Current count; member count over time: /analytics/club-analytics/{club_id}/timeseries
     member_count = db.exec(
         select(func.count(Membership.user_id)).where(Membership.club_id == club_id)
     ).first()
@@ -119,6 +115,27 @@ async def get_club_analytics(
         ]
     }
 
+@router.get("/club-analytics/{club_id}/engagement")
+def get_club_engagement(
+    club_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    start: Optional[date] = Query(None, description="First UTC day (default: 89 days before end)"),
+    end: Optional[date] = Query(None, description="Last UTC day, inclusive (default: today)"),
+    event_id: Optional[int] = Query(None, description="Limit to one of the club's events"),
+):
+    """Weekday x hour attendance heatmap, turnout vs registrations per event and repeat-attendee rate"""
+    
+    if not db.get(Club, club_id):
+        raise HTTPException(status_code=404, detail="Club not found")
+    if event_id is not None:
+        event = db.get(Event, event_id)
+        if not event or event.club_id != club_id:
+            raise HTTPException(status_code=404, detail="Event not found")
+    start, end = _series_window(start, end, default_days=90)
+    # Club + window ke hisaab se cached; NumPy binning, ORM objects nahi
+    return engagement_cache.get_or_compute(db, club_id, start, end, event_id)
+
 @router.get("/user-activity")
 async def get_user_activity(
     current_user: Annotated[User, Depends(get_current_user)],
@@ -1,98 +1,128 @@
 from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, WebSocket, WebSocketDisconnect
-from sqlmodel import Session, select
+from time import perf_counter
+import asyncio
+from fastapi import APIRouter, Depends, status, File, UploadFile, WebSocket, WebSocketDisconnect
+from sqlmodel import Session
 from pydantic import BaseModel
-# import face_recognition  # Temporarily disabled for deployment
-# import numpy as np  # Temporarily disabled for deployment
-import io
-from PIL import Image
+import numpy as np
 import json
-import base64
+import binascii
 
-from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
+from app.core.secure_error_handler import SecureErrorHandler
+from app.core.attendance_writer import attendance_writer
 from app.db.database import get_session
-from app.db.models import User, AttendanceRecord
+from app.core.config import FRAME_MAX_SIDE
+from app.db.models import User, Event
 from app.api.deps import get_current_user
+from app.face.encoder import get_face_encoder
+from app.face.matcher import get_face_index
+from app.face.frames import (
+    LatestFrameBuffer, RateController, encode_frame_in_pool,
+    negotiate_frame_config, parse_binary_frame, parse_text_frame,
+)
 
 router = APIRouter()
 
-# Helper function to convert string back to numpy array
-# Face recognition functions temporarily disabled for deployment
-# def string_to_encoding(encoding_str: str) -> np.ndarray:
-#     return np.array([float(val) for val in encoding_str.split(',')])
+# WebSocket ka URL ab general ho gaya hai
+@router.websocket("/ws/general")
+async def attendance_websocket(websocket: WebSocket, notes: str = "General Attendance", db: Session = Depends(get_session)):
+    await websocket.accept()
 
-# Face recognition attendance temporarily disabled for deployment
-# # WebSocket ka URL ab general ho gaya hai
-# @router.websocket("/ws/general")
-# async def attendance_websocket(websocket: WebSocket, notes: str = "General Attendance", db: Session = Depends(get_session)):
-#     await websocket.accept()
-    
-#     # 1. Sabhi enrolled students (jinka face data hai) ko database se load karein
-#     all_enrolled_users = db.exec(select(User).where(User.face_encoding != None)).all()
-    
-#     known_face_encodings = []
-#     known_face_users = []
-    
-#     for user in all_enrolled_users:
-#         known_face_encodings.append(string_to_encoding(user.face_encoding))
-#         known_face_users.append(user)
+    if get_face_encoder() is None:
+        await websocket.close(code=1011, reason="Face recognition is not available on this server.")
+        return
 
-#     if not known_face_encodings:
-#         await websocket.close(code=1008, reason="No enrolled faces found in the system.")
-#         return
+    # 1. Sabhi enrolled faces ka process-wide index (disk ya database se)
+    face_index = await asyncio.to_thread(get_face_index, db)
+    if len(face_index) == 0:
+        await websocket.close(code=1008, reason="No enrolled faces found in the system.")
+        return
 
-#     try:
-#         while True:
-#             # 2. Frontend se image data receive karein
-#             data = await websocket.receive_text()
-            
-#             header, encoded = data.split(",", 1)
-#             image_data = base64.b64decode(encoded)
-#             image = Image.open(io.BytesIO(image_data)).convert("RGB")
-#             image_np = np.array(image)
+    # Handshake: naye clients pehle JSON hello bhejte hain, purane seedha data URL
+    first = await websocket.receive()
+    if first["type"] == "websocket.disconnect":
+        return
+    max_side = FRAME_MAX_SIDE
+    if (first.get("text") or "").lstrip().startswith("{"):
+        try:
+            hello = json.loads(first["text"])
+        except json.JSONDecodeError:
+            hello = {}
+        config = negotiate_frame_config(hello)
+        # Jo size client ke saath tay hua, decode bhi usi size par
+        max_side = config["max_side"]
+        await websocket.send_json({"status": "CONFIG", **config})
+        first = None
 
-#             # 3. Image mein face dhoondhein aur recognize karein
-#             face_locations = face_recognition.face_locations(image_np)
-#             unknown_encodings = face_recognition.face_encodings(image_np, face_locations)
+    # Receive loop sirf latest frame rakhta hai; purane frames drop ho jaate hain
+    frames = LatestFrameBuffer()
+    rate = RateController()
 
-#             recognized_user = None
-#             for encoding in unknown_encodings:
-#                 matches = face_recognition.compare_faces(known_face_encodings, encoding, tolerance=0.5)
-                
-#                 if True in matches:
-#                     first_match_index = matches.index(True)
-#                     recognized_user = known_face_users[first_match_index]
-                    
-#                     # 4. Check karein ki kya is user ki attendance aaj pehle se mark ho chuki hai
-#                     today = date.today()
-#                     start_of_day = datetime.combine(today, time.min)
-#                     end_of_day = datetime.combine(today, time.max)
-                    
-#                     existing_record = db.exec(
-#                         select(AttendanceRecord).where(
-#                             AttendanceRecord.user_id == recognized_user.id,
-#                             AttendanceRecord.timestamp >= start_of_day,
-#                             AttendanceRecord.timestamp <= end_of_day,
-#                             AttendanceRecord.event_id == None # Sirf general attendance check karein
-#                         )
-#                     ).first()
-                    
-#                     if not existing_record:
-#                         # 5. Nayi attendance mark karein
-#                         new_record = AttendanceRecord(user_id=recognized_user.id, notes=notes)
-#                         db.add(new_record)
-#                         db.commit()
-#                         await websocket.send_json({"status": "SUCCESS", "name": recognized_user.full_name, "id": recognized_user.id})
-#                     else:
-#                         await websocket.send_json({"status": "ALREADY_MARKED", "name": recognized_user.full_name, "id": recognized_user.id})
-                    
-#                     break
-            
-#             if not recognized_user:
-#                 await websocket.send_json({"status": "NOT_FOUND"})
+    async def receive_frames(message):
+        try:
+            while True:
+                # 2. Frontend se frame receive karein - binary (header + image) ya legacy data URL
+                if message is not None:
+                    try:
+                        if message.get("bytes") is not None:
+                            frames.put(parse_binary_frame(message["bytes"]))
+                        elif message.get("text") is not None:
+                            frames.put(parse_text_frame(message["text"]))
+                    except (ValueError, binascii.Error):
+                        pass  # Kharab frame chhod dein, agla aa hi raha hai
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(message.get("code", 1000))
+        finally:
+            frames.close()
 
-#     except WebSocketDisconnect:
-#         SecureErrorHandler.log_error(Exception("WebSocket disconnected"), "General Attendance WebSocket")
-#     except Exception as e:
-#         SecureErrorHandler.log_error(e, "General Attendance WebSocket")
-#         await websocket.close(code=1011, reason="An internal error occurred")
\ No newline at end of file
+    # Event ids jo header mein aate hain unhe ek hi baar check karein
+    known_events = {}
+
+    async def event_exists(event_id: int) -> bool:
+        if event_id not in known_events:
+            # Blocking query event loop par nahi - baaki DB calls ki tarah thread mein
+            known_events[event_id] = await asyncio.to_thread(db.get, Event, event_id) is not None
+        return known_events[event_id]
+
+    receiver = asyncio.create_task(receive_frames(first))
+    try:
+        while True:
+            frame = await frames.get()
+            if frame is None:
+                break
+            reply = {} if frame.frame_id is None else {"frame_id": frame.frame_id}
+            if frame.event_id is not None and not await event_exists(frame.event_id):
+                await websocket.send_json({"status": "EVENT_NOT_FOUND", "event_id": frame.event_id, **reply})
+                continue
+
+            # 3. Decode + face encoding process pool mein, matching index mein
+            started = perf_counter()
+            unknown_encodings = await encode_frame_in_pool(frame.data, frame.offset, max_side)
+            # Lambe connection mein doosre workers ke enrollments bhi dikhein (version check throttled hai)
+            face_index = await asyncio.to_thread(get_face_index, db)
+            match = face_index.best_match(np.stack(unknown_encodings)) if unknown_encodings else None
+            recognized_user = await asyncio.to_thread(db.get, User, match.user_id) if match else None
+
+            if recognized_user:
+                # 4. Attendance mark karein (ek din mein ek baar) - dedupe cache + batched insert
+                newly_marked = await asyncio.to_thread(attendance_writer.mark, recognized_user.id, frame.event_id, notes)
+                status_text = "SUCCESS" if newly_marked else "ALREADY_MARKED"
+                await websocket.send_json({"status": status_text, "name": recognized_user.full_name, "id": recognized_user.id, **reply})
+            else:
+                await websocket.send_json({"status": "NOT_FOUND", **reply})
+
+            # 5. Client ko batayein ki frames kitni der mein bheje
+            new_interval = rate.observe((perf_counter() - started) * 1000, frames.dropped)
+            if new_interval is not None:
+                await websocket.send_json({"status": "RATE", "interval_ms": new_interval})
+
+        # Receive loop band hua - disconnect ya error wahin se aayega
+        await receiver
+    except WebSocketDisconnect:
+        SecureErrorHandler.log_error(Exception("WebSocket disconnected"), "General Attendance WebSocket")
+    except Exception as e:
+        SecureErrorHandler.log_error(e, "General Attendance WebSocket")
+        await websocket.close(code=1011, reason="An internal error occurred")
+    finally:
+        receiver.cancel()
@@ -1,13 +1,16 @@
 from typing import List, Annotated, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, status, Form, File, UploadFile
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Request, status, Form, File, UploadFile
 from sqlmodel import Session, select
-from twilio.rest import Client
 import cloudinary
 import cloudinary.uploader
 
-from app.core.config import TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_WHATSAPP_NUMBER
-from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
+from app.core.secure_error_handler import SecureErrorHandler
+from app.core import fast_json
+from app.core.http_cache import Validator, conditional_get
+from app.core.response_cache import response_cache
+from app.core.messaging import messaging_gateway
+from app.core.pubsub import club_channel, hub
 from app.db.database import get_session
 from app.db.models import User, Club, UserRole, Announcement, Membership
 from app.api.deps import get_current_user, get_admin_or_super_admin, get_super_admin
@@ -15,12 +18,6 @@ from app.schemas import ClubCreate, ClubPublic, ClubWithMembersAndEvents, UserPu
 
 router = APIRouter()
 
-# Initialize Twilio Client
-if TWILIO_ACCOUNT_SID and TWILIO_AUTH_TOKEN:
-    twilio_client = Client(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
-else:
-    twilio_client = None
-
 # --- CRUD for Clubs ---
 @router.post("/", response_model=ClubPublic, status_code=status.HTTP_201_CREATED)
 def create_club(
@@ -89,16 +86,36 @@ def create_club(
     return club
 
 # ... (THE REST OF YOUR FUNCTIONS LIKE GET, UPDATE, DELETE, ETC. REMAIN THE SAME) ...
+# Club list sirf columns se - ORM objects nahi banate (app/core/fast_json.py)
+_CLUB_ROWS = fast_json.RowShape({
+    "name": Club.name, "description": Club.description, "id": Club.id, "admin_id": Club.admin_id,
+    "admin": {"id": User.id, "email": User.email, "full_name": User.full_name, "role": User.role},
+})
+
 @router.get("/", response_model=List[ClubPublic])
-def get_all_clubs(db: Annotated[Session, Depends(get_session)]):
-    return db.exec(select(Club)).all()
+def get_all_clubs(
+    request: Request,
+    db: Annotated[Session, Depends(get_session)],
+    validator: Annotated[Validator, Depends(conditional_get("clubs", "users"))],
+):
+    def build():
+        rows = db.exec(_CLUB_ROWS.select().join(User, User.id == Club.admin_id).order_by(Club.id)).all()
+        return fast_json.dumps(_CLUB_ROWS.dicts(rows), List[ClubPublic])
+    return response_cache.serve(request, validator, build)
 
 @router.get("/{club_id}", response_model=ClubWithMembersAndEvents)
-def get_club_by_id(club_id: int, db: Annotated[Session, Depends(get_session)]):
-    club = db.get(Club, club_id)
-    if not club:
-        raise HTTPException(status_code=404, detail="Club not found")
-    return club
+def get_club_by_id(
+    club_id: int,
+    request: Request,
+    db: Annotated[Session, Depends(get_session)],
+    validator: Annotated[Validator, Depends(conditional_get("club:{club_id}", "users"))],
+):
+    def build():
+        club = db.get(Club, club_id)
+        if not club:
+            raise HTTPException(status_code=404, detail="Club not found")
+        return fast_json.dump_models(club, ClubWithMembersAndEvents)
+    return response_cache.serve(request, validator, build)
 
 @router.put("/{club_id}", response_model=ClubPublic)
 def update_existing_club(
@@ -157,7 +174,7 @@ def join_club(
 @router.post("/{club_id}/announcements", response_model=AnnouncementPublic, status_code=status.HTTP_201_CREATED)
 def create_announcement_for_club(
     club_id: int, announcement_in: AnnouncementCreate, db: Annotated[Session, Depends(get_session)],
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(get_current_user)], background_tasks: BackgroundTasks
 ):
     club = db.get(Club, club_id)
     if not club:
@@ -178,23 +195,19 @@ def create_announcement_for_club(
     db.add(announcement)
     db.commit()
     db.refresh(announcement)
+    hub.publish([club_channel(club_id)], "announcement_created", AnnouncementPublic.model_validate(announcement, from_attributes=True).model_dump(mode="json"))
     
-    if twilio_client:
+    if messaging_gateway.configured:
         try:
-            users_to_notify = db.exec(select(User).where(User.whatsapp_verified == True, User.whatsapp_consent == True)).all()
+            numbers = db.exec(
+                select(User.whatsapp_number).where(
+                    User.whatsapp_verified == True, User.whatsapp_consent == True, User.whatsapp_number != None
+                )
+            ).all()
             message_body = (f"📢 New Announcement from *{club.name}*!\n\n"
                             f"*{announcement.title}*\n\n{announcement.content}")
-            for user in users_to_notify:
-                if user.whatsapp_number:
-                    try:
-                        twilio_client.messages.create(
-                            from_=TWILIO_WHATSAPP_NUMBER, body=message_body,
-                            to=f"whatsapp:{user.whatsapp_number}"
-                        )
-                    except Exception as e:
-                        # Secure logging - don't expose phone numbers
-                        sanitized_phone = SecureValidator.sanitize_phone_number(user.whatsapp_number)
-                        SecureErrorHandler.log_error(e, f"WhatsApp send to {sanitized_phone}")
+            # Response ke baad gateway se concurrently bhejein; har failure gateway khud log karta hai
+            background_tasks.add_task(messaging_gateway.send_many, numbers, message_body)
         except Exception as e:
             SecureErrorHandler.log_error(e, "WhatsApp notification process")
 
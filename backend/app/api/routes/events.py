@@ -1,11 +1,14 @@
 from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile
 from sqlmodel import Session, select
 from pydantic import BaseModel
 import cloudinary
 import cloudinary.uploader
 
 from app.core.config import CLOUDINARY_CLOUD_NAME, CLOUDINARY_API_KEY, CLOUDINARY_API_SECRET
+from app.core import fast_json
+from app.core.http_cache import Validator, conditional_get
+from app.core.response_cache import response_cache
 from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
 from app.db.database import get_session
 from app.db.models import Club, Event, User, EventRegistration, EventPhoto, UserRole
@@ -156,9 +159,21 @@ def create_event(
     db.refresh(event)
     return event
 
+_EVENT_ROWS = fast_json.RowShape({
+    "name": Event.name, "description": Event.description, "date": Event.date, "location": Event.location,
+    "id": Event.id, "club_id": Event.club_id,
+})
+
 @router.get("/", response_model=List[EventPublic])
-def get_all_events(db: Annotated[Session, Depends(get_session)]):
-    return db.exec(select(Event)).all()
+def get_all_events(
+    request: Request,
+    db: Annotated[Session, Depends(get_session)],
+    validator: Annotated[Validator, Depends(conditional_get("events"))],
+):
+    def build():
+        rows = db.exec(_EVENT_ROWS.select().order_by(Event.id)).all()
+        return fast_json.dumps(_EVENT_ROWS.dicts(rows), List[EventPublic])
+    return response_cache.serve(request, validator, build)
 
 @router.get("/{event_id}", response_model=EventPublic)
 def get_event_by_id(event_id: int, db: Annotated[Session, Depends(get_session)]):
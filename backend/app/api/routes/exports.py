@@ -0,0 +1,184 @@
+from typing import Annotated, List, Literal, Optional, Tuple
+from datetime import date, datetime, time
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select
+
+from app.core import warehouse
+from app.core.exports import export_response
+from app.db.database import get_session
+from app.db.models import User, Club, Event, UserRole, AttendanceRecord, EventRegistration
+from app.api.deps import get_current_user, get_super_admin
+
+router = APIRouter()
+
+ExportFormat = Literal["csv", "xlsx", "pdf"]
+
+ATTENDANCE_HEADER = ("user_id", "full_name", "email", "event_id", "event_name", "timestamp", "notes")
+REGISTRATION_HEADER = ("user_id", "full_name", "email", "event_id", "event_name", "event_date")
+
+
+def _ensure_club_staff(club: Club, current_user: User) -> None:
+    # Club admin, coordinator, sub-coordinator, ya super admin hi roster export kar sakte hain
+    is_authorized = (
+        club.admin_id == current_user.id or
+        club.coordinator_id == current_user.id or
+        club.sub_coordinator_id == current_user.id or
+        current_user.role == UserRole.super_admin
+    )
+    if not is_authorized:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Not authorized to export this club's rosters")
+
+
+def _date_window(semester: Optional[str], start: Optional[date], end: Optional[date]) -> Tuple[datetime, datetime]:
+    """
+    `semester` is "<year>-spring" (Jan-Jun) or "<year>-fall" (Jul-Dec);
+    otherwise an explicit `start` / `end` date range (both inclusive).
+    """
+    if semester:
+        try:
+            year_str, term = semester.lower().split("-", 1)
+            year = int(year_str)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Semester must look like '2025-spring' or '2025-fall'")
+        if term == "spring":
+            start, end = date(year, 1, 1), date(year, 6, 30)
+        elif term == "fall":
+            start, end = date(year, 7, 1), date(year, 12, 31)
+        else:
+            raise HTTPException(status_code=400, detail="Semester must look like '2025-spring' or '2025-fall'")
+    return (
+        datetime.combine(start or date.min, time.min),
+        datetime.combine(end or date.max, time.max),
+    )
+
+
+def _attendance_query():
+    return (
+        select(User.id, User.full_name, User.email, Event.id, Event.name, AttendanceRecord.timestamp, AttendanceRecord.notes)
+        .select_from(AttendanceRecord)
+        .join(User, User.id == AttendanceRecord.user_id)
+        .join(Event, Event.id == AttendanceRecord.event_id)
+    )
+
+
+def _registration_query():
+    return (
+        select(User.id, User.full_name, User.email, Event.id, Event.name, Event.date)
+        .select_from(EventRegistration)
+        .join(User, User.id == EventRegistration.user_id)
+        .join(Event, Event.id == EventRegistration.event_id)
+    )
+
+
+def _get_event_for_staff(event_id: int, db: Session, current_user: User) -> Event:
+    event = db.get(Event, event_id)
+    if not event:
+        raise HTTPException(status_code=404, detail="Event not found")
+    _ensure_club_staff(event.club, current_user)
+    return event
+
+
+def _get_club_for_staff(club_id: int, db: Session, current_user: User) -> Club:
+    club = db.get(Club, club_id)
+    if not club:
+        raise HTTPException(status_code=404, detail="Club not found")
+    _ensure_club_staff(club, current_user)
+    return club
+
+
+@router.get("/events/{event_id}/attendance", summary="Export an event's attendance")
+def export_event_attendance(
+    event_id: int,
+    db: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    format: ExportFormat = "csv",
+):
+    event = _get_event_for_staff(event_id, db, current_user)
+    statement = _attendance_query().where(AttendanceRecord.event_id == event_id).order_by(AttendanceRecord.timestamp)
+    return export_response(format, ATTENDANCE_HEADER, statement, f"event-{event_id}-attendance", f"Attendance - {event.name}")
+
+
+@router.get("/events/{event_id}/registrations", summary="Export an event's registration roster")
+def export_event_registrations(
+    event_id: int,
+    db: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    format: ExportFormat = "csv",
+):
+    event = _get_event_for_staff(event_id, db, current_user)
+    statement = _registration_query().where(EventRegistration.event_id == event_id).order_by(User.full_name)
+    return export_response(format, REGISTRATION_HEADER, statement, f"event-{event_id}-registrations", f"Registrations - {event.name}")
+
+
+@router.get("/clubs/{club_id}/attendance", summary="Export a club's attendance for a semester or date range")
+def export_club_attendance(
+    club_id: int,
+    db: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    format: ExportFormat = "csv",
+    semester: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    club = _get_club_for_staff(club_id, db, current_user)
+    window_start, window_end = _date_window(semester, start, end)
+    statement = (
+        _attendance_query()
+        .where(Event.club_id == club_id, AttendanceRecord.timestamp >= window_start, AttendanceRecord.timestamp <= window_end)
+        .order_by(AttendanceRecord.timestamp)
+    )
+    label = semester or (f"{start or 'start'}_to_{end or 'end'}" if start or end else "all")
+    return export_response(format, ATTENDANCE_HEADER, statement, f"club-{club_id}-attendance-{label}", f"Attendance - {club.name} ({label})")
+
+
+@router.get("/clubs/{club_id}/registrations", summary="Export a club's registrations for a semester or date range")
+def export_club_registrations(
+    club_id: int,
+    db: Annotated[Session, Depends(get_session)],
+    current_user: Annotated[User, Depends(get_current_user)],
+    format: ExportFormat = "csv",
+    semester: Optional[str] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+):
+    club = _get_club_for_staff(club_id, db, current_user)
+    window_start, window_end = _date_window(semester, start, end)
+    statement = (
+        _registration_query()
+        .where(Event.club_id == club_id, Event.date >= window_start, Event.date <= window_end)
+        .order_by(Event.date, User.full_name)
+    )
+    label = semester or (f"{start or 'start'}_to_{end or 'end'}" if start or end else "all")
+    return export_response(format, REGISTRATION_HEADER, statement, f"club-{club_id}-registrations-{label}", f"Registrations - {club.name} ({label})")
+
+
+@router.get("/warehouse", summary="Bulk export of every table for the data warehouse (Super Admin only)")
+def export_warehouse(
+    super_admin: Annotated[User, Depends(get_super_admin)],
+    format: Literal["ndjson", "parquet"] = "ndjson",
+    tables: Optional[List[str]] = Query(None, description=f"Subset of: {', '.join(warehouse.TABLES)} (default: all)"),
+    updated_since: Optional[datetime] = Query(None, description="Incremental pull: the previous export's X-Snapshot-At"),
+):
+    """
+    NDJSON: one stream of lines tagged with `_table`. Parquet: a zip with one
+    `<table>.parquet` per table. All tables come from one database snapshot.
+    """
+    tables = tables or list(warehouse.TABLES)
+    unknown = set(tables) - set(warehouse.TABLES)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown tables: {', '.join(sorted(unknown))}")
+    if format == "parquet" and not warehouse.parquet_available():
+        raise HTTPException(status_code=status.HTTP_501_NOT_IMPLEMENTED, detail="Parquet export is not installed on this server; use ndjson")
+    
+    # Snapshot abhi khulta hai; agla incremental pull X-Snapshot-At (overlap ke saath) se shuru ho
+    snapshot_at, body = warehouse.export_stream(format, tables, updated_since)
+    if format == "parquet":
+        media_type, filename = "application/zip", "samvad-export.zip"
+    else:
+        media_type, filename = "application/x-ndjson", "samvad-export.ndjson"
+    return StreamingResponse(
+        body,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"', "X-Snapshot-At": snapshot_at.isoformat()},
+    )
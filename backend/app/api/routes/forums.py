@@ -1,10 +1,18 @@
 from datetime import datetime
-from typing import Annotated, List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Annotated, List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
 from pydantic import BaseModel
+from sqlalchemy import delete, or_, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select, func
+from app.core.config import FORUM_MAX_REPLY_DEPTH
+from app.core.http_cache import conditional_static
+from app.core.pubsub import category_channel, club_channel, hub, post_channel
+from app.core.pagination import NEXT_CURSOR_HEADER, decode_cursor, encode_cursor, keyset_after, set_next_cursor
+from app.core.trending import hot_score, refresh_hot_score, trending
 from app.db.database import get_session
-from app.db.models import User, Club, Event
+from app.db.models import User, Club, Event, ForumPost, ForumReply, ForumPostLike, ForumReplyLike
 from app.api.deps import get_current_user
 
 router = APIRouter()
@@ -41,52 +49,129 @@ class ForumReplyResponse(BaseModel):
     author_id: int
     post_id: int
     parent_id: Optional[int] = None
+    depth: int = 0
     created_at: datetime
     likes_count: int = 0
 
-# In-memory storage for demo (replace with proper database models)
-forum_posts = []
-forum_replies = []
-post_likes = []
-reply_likes = []
+class ForumReplyNode(ForumReplyResponse):
+    child_count: int = 0
+    children: List["ForumReplyNode"] = []
+    # child_count > len(children): fetch /forums/replies/{id}/children?cursor=more_children_cursor
+    has_more_children: bool = False
+    more_children_cursor: Optional[str] = None
+
+# Materialized path: fixed-width ids so string order == thread order
+REPLY_PATH_SEGMENT_WIDTH = 10
+
+def _path_segment(reply_id: int) -> str:
+    return str(reply_id).zfill(REPLY_PATH_SEGMENT_WIDTH)
+
+def _post_columns():
+    # Counts are columns on the post itself - one indexed read, no per-post COUNT(*)
+    return select(ForumPost, User.full_name).join(User, User.id == ForumPost.author_id)
+
+def _reply_columns():
+    return select(ForumReply, User.full_name).join(User, User.id == ForumReply.author_id)
+
+def _post_response(post: ForumPost, author_name: str) -> ForumPostResponse:
+    return ForumPostResponse(
+        **post.model_dump(), author_name=author_name, replies_count=post.reply_count, likes_count=post.like_count
+    )
+
+def _reply_response(reply: ForumReply, author_name: str) -> ForumReplyResponse:
+    return ForumReplyResponse(**reply.model_dump(), author_name=author_name, likes_count=reply.like_count)
+
+def _post_channels(post: ForumPost) -> List[str]:
+    channels = [post_channel(post.id), category_channel(post.category)]
+    if post.club_id:
+        channels.append(club_channel(post.club_id))
+    return channels
+
+def _publish_post_counts(db: Session, post: ForumPost) -> None:
+    # Sirf counters ka delta - listings poora page dobara fetch na karein
+    db.refresh(post)
+    trending.observe(post)
+    hub.publish(_post_channels(post), "post_counts", {
+        "post_id": post.id, "replies_count": post.reply_count, "likes_count": post.like_count,
+    })
+
+def _get_post_or_404(post_id: int, db: Session) -> ForumPost:
+    post = db.get(ForumPost, post_id)
+    if not post:
+        raise HTTPException(status_code=404, detail="Post not found")
+    return post
 
 @router.get("/posts", response_model=List[ForumPostResponse])
-async def get_forum_posts(
+def get_forum_posts(
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
     club_id: Optional[int] = None,
     event_id: Optional[int] = None,
     category: Optional[str] = None,
-    limit: int = 20,
-    offset: int = 0,
-    current_user: Annotated[User, Depends(get_current_user)] = None,
-    db: Annotated[Session, Depends(get_session)] = None
+    sort: Literal["new", "hot"] = "new",
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+    offset: int = Query(0, ge=0, deprecated=True, description="Deprecated, use cursor; ignored when a cursor is given"),
 ):
-    """Get forum posts with optional filtering"""
+    """Get forum posts with optional filtering, newest or hottest first (keyset paginated)"""
     
-    # Filter posts based on parameters
-    filtered_posts = forum_posts.copy()
+    # Purane clients ke liye offset ek release tak chalta rahega; cursor ho to wahi use hota hai
+    if cursor:
+        offset = 0
+    if sort == "hot":
+        return _get_hot_posts(response, db, club_id, event_id, category, limit, cursor, offset)
     
+    statement = _post_columns()
     if club_id:
-        filtered_posts = [p for p in filtered_posts if p.get('club_id') == club_id]
+        statement = statement.where(ForumPost.club_id == club_id)
     if event_id:
-        filtered_posts = [p for p in filtered_posts if p.get('event_id') == event_id]
+        statement = statement.where(ForumPost.event_id == event_id)
     if category:
-        filtered_posts = [p for p in filtered_posts if p.get('category') == category]
-    
-    # Sort by creation date (newest first)
-    filtered_posts.sort(key=lambda x: x.get('created_at', datetime.now()), reverse=True)
-    
-    # Apply pagination
-    paginated_posts = filtered_posts[offset:offset + limit]
-    
-    # Add reply counts
-    for post in paginated_posts:
-        post['replies_count'] = len([r for r in forum_replies if r.get('post_id') == post.get('id')])
-        post['likes_count'] = len([l for l in post_likes if l.get('post_id') == post.get('id')])
-    
-    return paginated_posts
+        statement = statement.where(ForumPost.category == category)
+    if cursor:
+        # (scope, created_at) index se seedha agle page par - OFFSET jaisa scan nahi
+        statement = statement.where(
+            keyset_after((ForumPost.created_at, ForumPost.id), decode_cursor(cursor, datetime, int), descending=True)
+        )
+    rows = db.exec(statement.order_by(ForumPost.created_at.desc(), ForumPost.id.desc()).offset(offset).limit(limit + 1)).all()
+    rows = set_next_cursor(response, list(rows), limit, key=lambda row: (row[0].created_at, row[0].id))
+    return [_post_response(*row) for row in rows]
+
+def _get_hot_posts(
+    response: Response, db: Session, club_id: Optional[int], event_id: Optional[int], category: Optional[str],
+    limit: int, cursor: Optional[str], offset: int = 0,
+) -> List[ForumPostResponse]:
+    def page_key(row):
+        return (row[0].hot_score, row[0].id)
+
+    # Pehla page ek hi scope ka ho to memory ke top-K se - ranking ke liye koi scan nahi
+    scope = None
+    if not cursor and not offset and not event_id and not (club_id and category):
+        scope = f"club:{club_id}" if club_id else f"category:{category}" if category else "all"
+    ranked = trending.top(scope, limit) if scope else None
+    if ranked is not None:
+        order = {post_id: i for i, (post_id, _) in enumerate(ranked)}
+        rows = db.exec(_post_columns().where(ForumPost.id.in_(order))).all() if order else []
+        rows = sorted(rows, key=lambda row: order[row[0].id])
+    else:
+        statement = _post_columns()
+        if club_id:
+            statement = statement.where(ForumPost.club_id == club_id)
+        if event_id:
+            statement = statement.where(ForumPost.event_id == event_id)
+        if category:
+            statement = statement.where(ForumPost.category == category)
+        if cursor:
+            statement = statement.where(
+                keyset_after((ForumPost.hot_score, ForumPost.id), decode_cursor(cursor, float, int), descending=True)
+            )
+        rows = db.exec(statement.order_by(ForumPost.hot_score.desc(), ForumPost.id.desc()).offset(offset).limit(limit + 1)).all()
+    rows = set_next_cursor(response, list(rows), limit, key=page_key)
+    return [_post_response(*row) for row in rows]
 
 @router.post("/posts", response_model=ForumPostResponse)
-async def create_forum_post(
+def create_forum_post(
     post_data: ForumPostCreate,
     current_user: Annotated[User, Depends(get_current_user)],
     db: Annotated[Session, Depends(get_session)]
@@ -105,130 +190,261 @@ async def create_forum_post(
             raise HTTPException(status_code=404, detail="Event not found")
     
     # Create new post
-    new_post = {
-        'id': len(forum_posts) + 1,
-        'title': post_data.title,
-        'content': post_data.content,
-        'author_name': current_user.full_name,
-        'author_id': current_user.id,
-        'club_id': post_data.club_id,
-        'event_id': post_data.event_id,
-        'category': post_data.category,
-        'created_at': datetime.now(),
-        'replies_count': 0,
-        'likes_count': 0
-    }
-    
-    forum_posts.append(new_post)
-    return new_post
+    created_at = datetime.utcnow()
+    new_post = ForumPost(
+        **post_data.model_dump(), author_id=current_user.id, created_at=created_at, hot_score=hot_score(0, 0, created_at)
+    )
+    db.add(new_post)
+    db.commit()
+    db.refresh(new_post)
+    trending.observe(new_post)
+    response = _post_response(new_post, current_user.full_name)
+    hub.publish(_post_channels(new_post)[1:], "post_created", response.model_dump(mode="json"))
+    return response
 
 @router.get("/posts/{post_id}", response_model=ForumPostResponse)
-async def get_forum_post(
+def get_forum_post(
     post_id: int,
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Get a specific forum post"""
     
-    post = next((p for p in forum_posts if p.get('id') == post_id), None)
-    if not post:
+    row = db.exec(_post_columns().where(ForumPost.id == post_id)).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Post not found")
-    
-    # Add counts
-    post['replies_count'] = len([r for r in forum_replies if r.get('post_id') == post_id])
-    post['likes_count'] = len([l for l in post_likes if l.get('post_id') == post_id])
-    
-    return post
+    return _post_response(*row)
 
 @router.get("/posts/{post_id}/replies", response_model=List[ForumReplyResponse])
-async def get_post_replies(
+def get_post_replies(
     post_id: int,
-    current_user: Annotated[User, Depends(get_current_user)] = None
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
 ):
-    """Get replies for a specific post"""
+    """Get replies for a specific post, oldest first (keyset paginated)"""
     
-    # Check if post exists
-    post = next((p for p in forum_posts if p.get('id') == post_id), None)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
-    
-    # Get replies for this post
-    post_replies = [r for r in forum_replies if r.get('post_id') == post_id]
+    _get_post_or_404(post_id, db)
     
-    # Add like counts
-    for reply in post_replies:
-        reply['likes_count'] = len([l for l in reply_likes if l.get('reply_id') == reply.get('id')])
+    statement = _reply_columns().where(ForumReply.post_id == post_id)
+    if cursor:
+        statement = statement.where(
+            keyset_after((ForumReply.created_at, ForumReply.id), decode_cursor(cursor, datetime, int))
+        )
+    rows = db.exec(statement.order_by(ForumReply.created_at, ForumReply.id).limit(limit + 1)).all()
+    rows = set_next_cursor(response, list(rows), limit, key=lambda row: (row[0].created_at, row[0].id))
+    return [_reply_response(*row) for row in rows]
+
+def _load_thread(
+    db: Session, post_id: int, parent: Optional[ForumReply], limit: int, children: int, levels: int,
+    after_path: Optional[str],
+):
+    """
+    One page of direct replies under `parent` (or the post) with up to
+    `children` replies per node for `levels` levels. Returns `(nodes, next_path)`.
+    """
+    base_depth = parent.depth + 1 if parent else 0
+    scope = [ForumReply.post_id == post_id]
+    if parent:
+        # Subtree of `parent` = paths in [parent.path + "/", parent.path + "0")  ("0" follows "/")
+        scope += [ForumReply.path > f"{parent.path}/", ForumReply.path < f"{parent.path}0"]
+
+    # 1. Page boundaries from the (post_id, depth, path) index
+    page = select(ForumReply.path).where(*scope, ForumReply.depth == base_depth)
+    if after_path:
+        page = page.where(ForumReply.path > after_path)
+    paths = db.exec(page.order_by(ForumReply.path).limit(limit + 1)).all()
+    next_path = paths[limit - 1] if len(paths) > limit else None
+    paths = paths[:limit]
+    if not paths:
+        return [], None
+
+    # 2. Whole page of threads in one ordered range scan; row_number caps children per parent
+    max_depth = min(base_depth + levels - 1, FORUM_MAX_REPLY_DEPTH - 1)
+    rank = func.row_number().over(partition_by=ForumReply.parent_id, order_by=ForumReply.path).label("rank")
+    ranked = (
+        select(ForumReply, rank)
+        .where(*scope, ForumReply.path >= paths[0], ForumReply.path < f"{paths[-1]}0", ForumReply.depth <= max_depth)
+        .subquery()
+    )
+    reply = aliased(ForumReply, ranked)
+    rows = db.exec(
+        select(reply, User.full_name)
+        .join(User, User.id == reply.author_id)
+        .where(or_(reply.depth == base_depth, ranked.c.rank <= children))
+        .order_by(reply.path)
+    ).all()
+
+    # Path order = parent before children, so the tree builds in one pass
+    nodes, roots, node_paths = {}, [], {}
+    for row, author_name in rows:
+        if row.depth != base_depth and row.parent_id not in nodes:
+            continue  # Parent was cut by the per-node limit
+        node = ForumReplyNode(**row.model_dump(), author_name=author_name, likes_count=row.like_count)
+        nodes[row.id], node_paths[row.id] = node, row.path
+        (roots if row.depth == base_depth else nodes[row.parent_id].children).append(node)
+    for node in nodes.values():
+        node.has_more_children = node.child_count > len(node.children)
+        if node.has_more_children and node.children:
+            node.more_children_cursor = encode_cursor(node_paths[node.children[-1].id])
+    return roots, next_path
+
+@router.get("/posts/{post_id}/thread", response_model=List[ForumReplyNode])
+def get_post_thread(
+    post_id: int,
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    limit: int = Query(10, ge=1, le=50, description="Top-level replies per page"),
+    children: int = Query(3, ge=0, le=20, description="Replies shown under each reply"),
+    levels: int = Query(3, ge=1, le=FORUM_MAX_REPLY_DEPTH, description="Nesting levels to include"),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
+):
+    """Threaded replies: the first `limit` top-level replies with their first `children` replies per level"""
     
-    # Sort by creation date
-    post_replies.sort(key=lambda x: x.get('created_at', datetime.now()))
+    _get_post_or_404(post_id, db)
+    after_path = decode_cursor(cursor, str)[0] if cursor else None
+    nodes, next_path = _load_thread(db, post_id, None, limit, children, levels, after_path)
+    if next_path:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_path)
+    return nodes
+
+@router.get("/replies/{reply_id}/children", response_model=List[ForumReplyNode])
+def get_reply_children(
+    reply_id: int,
+    response: Response,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+    limit: int = Query(10, ge=1, le=50),
+    children: int = Query(3, ge=0, le=20),
+    levels: int = Query(3, ge=1, le=FORUM_MAX_REPLY_DEPTH),
+    cursor: Optional[str] = Query(None, description="A node's more_children_cursor or the previous X-Next-Cursor"),
+):
+    """'Load more' under a reply: its next direct replies, each with their own first replies"""
     
-    return post_replies
+    parent = db.get(ForumReply, reply_id)
+    if not parent:
+        raise HTTPException(status_code=404, detail="Reply not found")
+    after_path = decode_cursor(cursor, str)[0] if cursor else None
+    nodes, next_path = _load_thread(db, parent.post_id, parent, limit, children, levels, after_path)
+    if next_path:
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(next_path)
+    return nodes
 
 @router.post("/posts/{post_id}/replies", response_model=ForumReplyResponse)
-async def create_reply(
+def create_reply(
     post_id: int,
     reply_data: ForumReplyCreate,
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Create a reply to a forum post"""
     
-    # Check if post exists
-    post = next((p for p in forum_posts if p.get('id') == post_id), None)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    post = _get_post_or_404(post_id, db)
+    
+    # Nested reply ka parent isi post ka hona chahiye
+    parent = None
+    if reply_data.parent_id is not None:
+        parent = db.get(ForumReply, reply_data.parent_id)
+        if not parent or parent.post_id != post_id:
+            raise HTTPException(status_code=404, detail="Parent reply not found")
+        if parent.depth + 1 >= FORUM_MAX_REPLY_DEPTH:
+            raise HTTPException(
+                status_code=400, detail=f"Replies can be nested at most {FORUM_MAX_REPLY_DEPTH} levels deep"
+            )
     
-    # Create new reply
-    new_reply = {
-        'id': len(forum_replies) + 1,
-        'content': reply_data.content,
-        'author_name': current_user.full_name,
-        'author_id': current_user.id,
-        'post_id': post_id,
-        'parent_id': reply_data.parent_id,
-        'created_at': datetime.now(),
-        'likes_count': 0
-    }
-    
-    forum_replies.append(new_reply)
-    return new_reply
+    new_reply = ForumReply(
+        content=reply_data.content, parent_id=reply_data.parent_id, post_id=post_id, author_id=current_user.id,
+        depth=parent.depth + 1 if parent else 0,
+    )
+    db.add(new_reply)
+    db.flush()  # Path mein apna id chahiye
+    new_reply.path = (f"{parent.path}/" if parent else "") + _path_segment(new_reply.id)
+    # Counters reply ke saath hi same transaction mein badhte hain
+    db.execute(update(ForumPost).where(ForumPost.id == post_id).values(reply_count=ForumPost.reply_count + 1))
+    if parent:
+        db.execute(update(ForumReply).where(ForumReply.id == parent.id).values(child_count=ForumReply.child_count + 1))
+    refresh_hot_score(db, post_id)
+    db.commit()
+    db.refresh(new_reply)
+    response = _reply_response(new_reply, current_user.full_name)
+    hub.publish([post_channel(post_id)], "reply_created", response.model_dump(mode="json"))
+    _publish_post_counts(db, post)
+    return response
+
+def _toggle_like(db: Session, like_model, key_column, target_model, key_value: int, user_id: int) -> bool:
+    """
+    Delete the like if present, otherwise insert it, adjusting the target's
+    `like_count` in the same transaction. Membership is a primary-key lookup.
+    Returns True when the item is now liked.
+    """
+    def bump(delta: int):
+        db.execute(
+            update(target_model).where(target_model.id == key_value).values(like_count=target_model.like_count + delta)
+        )
+        if target_model is ForumPost:
+            refresh_hot_score(db, key_value)
+
+    removed = db.execute(delete(like_model).where(key_column == key_value, like_model.user_id == user_id)).rowcount
+    if removed:
+        bump(-1)
+        db.commit()
+        return False
+    db.add(like_model(**{key_column.key: key_value, "user_id": user_id}))
+    try:
+        db.flush()
+    except IntegrityError:
+        # Ek saath do requests - doosri ne pehle hi like kar diya (aur counter bhi badha diya)
+        db.rollback()
+        return True
+    bump(1)
+    db.commit()
+    return True
 
 @router.post("/posts/{post_id}/like")
-async def like_post(
+def like_post(
     post_id: int,
-    current_user: Annotated[User, Depends(get_current_user)]
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)]
 ):
     """Like or unlike a forum post"""
     
-    # Check if post exists
-    post = next((p for p in forum_posts if p.get('id') == post_id), None)
-    if not post:
-        raise HTTPException(status_code=404, detail="Post not found")
+    post = _get_post_or_404(post_id, db)
     
-    # Check if user already liked this post
-    existing_like = next((l for l in post_likes if l.get('post_id') == post_id and l.get('user_id') == current_user.id), None)
-    
-    if existing_like:
-        # Unlike
-        post_likes.remove(existing_like)
-        return {"message": "Post unliked", "liked": False}
-    else:
-        # Like
-        new_like = {
-            'post_id': post_id,
-            'user_id': current_user.id,
-            'created_at': datetime.now()
-        }
-        post_likes.append(new_like)
+    liked = _toggle_like(db, ForumPostLike, ForumPostLike.post_id, ForumPost, post_id, current_user.id)
+    _publish_post_counts(db, post)
+    if liked:
         return {"message": "Post liked", "liked": True}
+    return {"message": "Post unliked", "liked": False}
+
+@router.post("/replies/{reply_id}/like")
+def like_reply(
+    reply_id: int,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Like or unlike a reply"""
+    
+    if not db.get(ForumReply, reply_id):
+        raise HTTPException(status_code=404, detail="Reply not found")
+    
+    if _toggle_like(db, ForumReplyLike, ForumReplyLike.reply_id, ForumReply, reply_id, current_user.id):
+        return {"message": "Reply liked", "liked": True}
+    return {"message": "Reply unliked", "liked": False}
+
+FORUM_CATEGORIES = {
+    "categories": [
+        {"id": "general", "name": "General Discussion", "description": "General topics and conversations"},
+        {"id": "question", "name": "Questions & Help", "description": "Ask questions and get help"},
+        {"id": "announcement", "name": "Announcements", "description": "Important announcements and news"},
+        {"id": "discussion", "name": "Club Discussions", "description": "Club-specific discussions"},
+        {"id": "events", "name": "Event Discussions", "description": "Event-related conversations"}
+    ]
+}
 
-@router.get("/categories")
+@router.get("/categories", dependencies=[Depends(conditional_static(FORUM_CATEGORIES))])
 async def get_forum_categories():
     """Get available forum categories"""
-    return {
-        "categories": [
-            {"id": "general", "name": "General Discussion", "description": "General topics and conversations"},
-            {"id": "question", "name": "Questions & Help", "description": "Ask questions and get help"},
-            {"id": "announcement", "name": "Announcements", "description": "Important announcements and news"},
-            {"id": "discussion", "name": "Club Discussions", "description": "Club-specific discussions"},
-            {"id": "events", "name": "Event Discussions", "description": "Event-related conversations"}
-        ]
-    }
+    return FORUM_CATEGORIES
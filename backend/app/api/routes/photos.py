@@ -1,12 +1,15 @@
 from typing import List, Annotated, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Request, status, File, UploadFile, Form
+from sqlmodel import Session
 from pydantic import BaseModel
 from datetime import datetime
 import cloudinary
 import cloudinary.uploader
 
 from app.core.cloudinary_utils import upload_to_cloudinary
+from app.core import fast_json
+from app.core.http_cache import Validator, conditional_get
+from app.core.response_cache import response_cache
 from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
 from app.db.database import get_session
 from app.db.models import EventPhoto, GalleryPhoto, User, UserRole, Event
@@ -30,6 +33,17 @@ class PhotoWithDetails(BaseModel):
     timestamp: datetime
     event: EventInfo
 
+_EVENT_PHOTO_ROWS = fast_json.RowShape({
+    "id": EventPhoto.id, "image_url": EventPhoto.image_url, "timestamp": EventPhoto.timestamp,
+    "event": {"id": Event.id, "name": Event.name},
+})
+
+_GALLERY_ROWS = fast_json.RowShape({
+    "id": GalleryPhoto.id, "image_url": GalleryPhoto.image_url, "caption": GalleryPhoto.caption,
+    "timestamp": GalleryPhoto.timestamp,
+    "uploader": {"id": User.id, "email": User.email, "full_name": User.full_name, "role": User.role},
+})
+
 @router.get("/", response_model=List[PhotoWithDetails], summary="Get All Event Photos")
 def get_all_photos(
     db: Annotated[Session, Depends(get_session)],
@@ -38,8 +52,10 @@ def get_all_photos(
     """
     Get all photos from all specific club events, sorted by most recent.
     """
-    photos = db.exec(select(EventPhoto).order_by(EventPhoto.timestamp.desc())).all()
-    return photos
+    rows = db.exec(
+        _EVENT_PHOTO_ROWS.select().join(Event, Event.id == EventPhoto.event_id).order_by(EventPhoto.timestamp.desc())
+    ).all()
+    return fast_json.json_response(fast_json.dumps(_EVENT_PHOTO_ROWS.dicts(rows), List[PhotoWithDetails]))
 
 @router.delete("/{photo_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete an Event Photo")
 def delete_photo(
@@ -96,15 +112,24 @@ def upload_to_gallery(
     
     return new_photo
 
-@router.get("/gallery", response_model=List[GalleryPhotoPublic], summary="Get All Common Gallery Photos")
+@router.get(
+    "/gallery", response_model=List[GalleryPhotoPublic], summary="Get All Common Gallery Photos",
+)
 def get_common_gallery_photos(
-    db: Annotated[Session, Depends(get_session)]
+    request: Request,
+    db: Annotated[Session, Depends(get_session)],
+    validator: Annotated[Validator, Depends(conditional_get("gallery", "users"))],
 ):
     """
     Get all photos from the common gallery, available to all users.
     """
-    photos = db.exec(select(GalleryPhoto).order_by(GalleryPhoto.timestamp.desc())).all()
-    return photos
+    def build():
+        rows = db.exec(
+            _GALLERY_ROWS.select().join(User, User.id == GalleryPhoto.uploaded_by_id)
+            .order_by(GalleryPhoto.timestamp.desc())
+        ).all()
+        return fast_json.dumps(_GALLERY_ROWS.dicts(rows), List[GalleryPhotoPublic])
+    return response_cache.serve(request, validator, build)
 
 @router.delete("/gallery/{photo_id}", status_code=status.HTTP_204_NO_CONTENT, summary="Delete a Common Gallery Photo")
 def delete_gallery_photo(
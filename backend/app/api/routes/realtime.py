@@ -0,0 +1,60 @@
+import asyncio
+from typing import Annotated, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+
+from app.core.config import SSE_HEARTBEAT_SECONDS
+from app.core.pubsub import category_channel, club_channel, format_sse, hub, post_channel
+from app.db.models import User
+from app.api.deps import get_stream_user
+
+router = APIRouter()
+
+
+@router.get("/stream", summary="Server-sent events for a forum post, club and/or forum category")
+async def stream_updates(
+    current_user: Annotated[User, Depends(get_stream_user)],
+    post_id: Optional[int] = None,
+    club_id: Optional[int] = None,
+    category: Optional[str] = Query(None, max_length=50),
+):
+    """
+    Events: `post_created`, `reply_created`, `post_counts` and
+    `announcement_created`, each with a small JSON delta. A `reset` event
+    means this client fell too far behind and was dropped: refetch, then
+    reconnect.
+    """
+    channels = set()
+    if post_id is not None:
+        channels.add(post_channel(post_id))
+    if club_id is not None:
+        channels.add(club_channel(club_id))
+    if category:
+        channels.add(category_channel(category))
+    if not channels:
+        raise HTTPException(status_code=400, detail="Subscribe to at least one of post_id, club_id or category")
+
+    subscription = hub.subscribe(channels)
+
+    async def events():
+        try:
+            yield "retry: 3000\n\n" + format_sse("subscribed", {"channels": sorted(channels)})
+            while True:
+                try:
+                    message = await asyncio.wait_for(subscription.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    # Proxies idle connections band na karein
+                    yield ": ping\n\n"
+                    continue
+                if message is None:
+                    yield format_sse("reset", {"reason": "Client too slow; refetch and reconnect"})
+                    return
+                yield message
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,9 +1,14 @@
-from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, List, Annotated, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import update
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from datetime import datetime
 
+from app.core import http_cache
+from app.core.config import ROLE_REVIEW_BULK_MAX
+from app.core.pagination import decode_cursor, keyset_after, set_next_cursor
 from app.db.database import get_session
 from app.db.models import User, UserRole, RoleRequest, RoleRequestStatus
 from app.api.deps import get_current_user
@@ -32,6 +37,18 @@ class RoleRequestReview(BaseModel):
     status: RoleRequestStatus  # approved or rejected
     admin_notes: str | None = None
 
+class RoleRequestBulkReview(RoleRequestReview):
+    request_ids: List[int] = Field(min_length=1, max_length=ROLE_REVIEW_BULK_MAX)
+
+class RoleRequestReviewOutcome(BaseModel):
+    request_id: int
+    outcome: Literal["approved", "rejected", "not_found", "already_reviewed", "superseded"]
+
+class RoleRequestBulkReviewResult(BaseModel):
+    status: RoleRequestStatus
+    reviewed: int
+    results: List[RoleRequestReviewOutcome]
+
 # --- Router ---
 router = APIRouter()
 
@@ -101,122 +118,171 @@ def request_role_upgrade(
         "status": "pending"
     }
 
+Requester = aliased(User)
+Reviewer = aliased(User)
+
+def _request_columns():
+    # Requester aur reviewer ke naam ek hi joined query mein - har row par db.get nahi
+    return (
+        select(RoleRequest, Requester.full_name, Requester.email, Reviewer.full_name)
+        .join(Requester, Requester.id == RoleRequest.user_id, isouter=True)
+        .join(Reviewer, Reviewer.id == RoleRequest.reviewed_by_id, isouter=True)
+    )
+
+def _request_response(req: RoleRequest, user_name: Optional[str], user_email: Optional[str],
+                      reviewed_by_name: Optional[str]) -> RoleRequestResponse:
+    return RoleRequestResponse(
+        id=req.id,
+        user_id=req.user_id,
+        user_name=user_name or "Unknown",
+        user_email=user_email or "Unknown",
+        requested_role=req.requested_role,
+        current_role=req.current_role,
+        reason=req.reason,
+        status=req.status,
+        created_at=req.created_at,
+        reviewed_at=req.reviewed_at,
+        reviewed_by_name=reviewed_by_name,
+        admin_notes=req.admin_notes
+    )
+
+def _list_requests(
+    db: Session, response: Response, statement, limit: int, cursor: Optional[str]
+) -> List[RoleRequestResponse]:
+    """Newest first, keyset paginated on (created_at, id)."""
+    if cursor:
+        statement = statement.where(
+            keyset_after((RoleRequest.created_at, RoleRequest.id), decode_cursor(cursor, datetime, int), descending=True)
+        )
+    rows = db.exec(statement.order_by(RoleRequest.created_at.desc(), RoleRequest.id.desc()).limit(limit + 1)).all()
+    rows = set_next_cursor(response, list(rows), limit, key=lambda row: (row[0].created_at, row[0].id))
+    return [_request_response(*row) for row in rows]
+
+def _ensure_super_admin(current_user: User, detail: str) -> None:
+    if current_user.role != UserRole.super_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=detail)
+
 @router.get("/my-requests", response_model=List[RoleRequestResponse])
 def get_my_role_requests(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_session)]
+    db: Annotated[Session, Depends(get_session)],
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
 ):
     """Get current user's role requests"""
     
-    requests = db.exec(
-        select(RoleRequest).where(RoleRequest.user_id == current_user.id)
-        .order_by(RoleRequest.created_at.desc())
-    ).all()
-    
-    result = []
-    for req in requests:
-        reviewed_by_name = None
-        if req.reviewed_by_id:
-            reviewer = db.get(User, req.reviewed_by_id)
-            reviewed_by_name = reviewer.full_name if reviewer else None
-        
-        result.append(RoleRequestResponse(
-            id=req.id,
-            user_id=req.user_id,
-            user_name=current_user.full_name,
-            user_email=current_user.email,
-            requested_role=req.requested_role,
-            current_role=req.current_role,
-            reason=req.reason,
-            status=req.status,
-            created_at=req.created_at,
-            reviewed_at=req.reviewed_at,
-            reviewed_by_name=reviewed_by_name,
-            admin_notes=req.admin_notes
-        ))
-    
-    return result
+    statement = _request_columns().where(RoleRequest.user_id == current_user.id)
+    return _list_requests(db, response, statement, limit, cursor)
 
 @router.get("/all-requests", response_model=List[RoleRequestResponse])
 def get_all_role_requests(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_session)]
+    db: Annotated[Session, Depends(get_session)],
+    status_filter: Optional[RoleRequestStatus] = Query(None, alias="status"),
+    requested_role: Optional[UserRole] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
 ):
-    """Get all role requests - only for super admins"""
+    """Get all role requests, optionally by status / requested role - only for super admins"""
     
-    if current_user.role != UserRole.super_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only super admins can view all role requests"
-        )
+    _ensure_super_admin(current_user, "Only super admins can view all role requests")
     
-    requests = db.exec(
-        select(RoleRequest).order_by(RoleRequest.created_at.desc())
-    ).all()
-    
-    result = []
-    for req in requests:
-        user = db.get(User, req.user_id)
-        reviewed_by_name = None
-        if req.reviewed_by_id:
-            reviewer = db.get(User, req.reviewed_by_id)
-            reviewed_by_name = reviewer.full_name if reviewer else None
-        
-        result.append(RoleRequestResponse(
-            id=req.id,
-            user_id=req.user_id,
-            user_name=user.full_name if user else "Unknown",
-            user_email=user.email if user else "Unknown",
-            requested_role=req.requested_role,
-            current_role=req.current_role,
-            reason=req.reason,
-            status=req.status,
-            created_at=req.created_at,
-            reviewed_at=req.reviewed_at,
-            reviewed_by_name=reviewed_by_name,
-            admin_notes=req.admin_notes
-        ))
-    
-    return result
+    statement = _request_columns()
+    if status_filter:
+        statement = statement.where(RoleRequest.status == status_filter)
+    if requested_role:
+        statement = statement.where(RoleRequest.requested_role == requested_role)
+    return _list_requests(db, response, statement, limit, cursor)
 
 @router.get("/pending-requests", response_model=List[RoleRequestResponse])
 def get_pending_role_requests(
+    response: Response,
     current_user: Annotated[User, Depends(get_current_user)],
-    db: Annotated[Session, Depends(get_session)]
+    db: Annotated[Session, Depends(get_session)],
+    requested_role: Optional[UserRole] = None,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = Query(None, description="Value of the previous page's X-Next-Cursor header"),
 ):
     """Get pending role requests - only for super admins"""
     
+    _ensure_super_admin(current_user, "Only super admins can view pending role requests")
+    
+    statement = _request_columns().where(RoleRequest.status == RoleRequestStatus.pending)
+    if requested_role:
+        statement = statement.where(RoleRequest.requested_role == requested_role)
+    return _list_requests(db, response, statement, limit, cursor)
+
+def _check_review(current_user: User, review_data: RoleRequestReview) -> None:
     if current_user.role != UserRole.super_admin:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only super admins can view pending role requests"
+            detail="Only super admins can review role requests"
         )
     
-    requests = db.exec(
-        select(RoleRequest).where(RoleRequest.status == RoleRequestStatus.pending)
-        .order_by(RoleRequest.created_at.desc())
+    if review_data.status not in [RoleRequestStatus.approved, RoleRequestStatus.rejected]:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Status must be either 'approved' or 'rejected'"
+        )
+
+def _apply_reviews(
+    db: Session, request_ids: List[int], review_data: RoleRequestReview, reviewer: User
+) -> Dict[int, str]:
+    """
+    Decide many requests with set-based UPDATEs and commit once; returns an
+    outcome per id. Only rows still pending are claimed, so a request
+    reviewed concurrently is reported as already_reviewed, never changed twice.
+    When approving several requests of one user, only the newest is approved;
+    the older ones stay pending and are reported as superseded.
+    """
+    superseded = set()
+    if review_data.status == RoleRequestStatus.approved:
+        # Ek user ki kai requests - sabse nayi (created_at, id) jeet-ti hai, dict order nahi
+        newest: Dict[int, int] = {}
+        pending = db.exec(
+            select(RoleRequest.id, RoleRequest.user_id, RoleRequest.created_at)
+            .where(RoleRequest.id.in_(request_ids), RoleRequest.status == RoleRequestStatus.pending)
+        ).all()
+        for request_id, user_id, _ in sorted(pending, key=lambda row: (row.created_at, row.id)):
+            if user_id in newest:
+                superseded.add(newest[user_id])
+            newest[user_id] = request_id
+
+    claimed = db.execute(
+        update(RoleRequest)
+        .where(
+            RoleRequest.id.in_([i for i in request_ids if i not in superseded]),
+            RoleRequest.status == RoleRequestStatus.pending,
+        )
+        .values(
+            status=review_data.status, reviewed_at=datetime.utcnow(), reviewed_by_id=reviewer.id,
+            admin_notes=review_data.admin_notes,
+        )
+        .returning(RoleRequest.id, RoleRequest.user_id, RoleRequest.requested_role)
     ).all()
     
-    result = []
-    for req in requests:
-        user = db.get(User, req.user_id)
-        
-        result.append(RoleRequestResponse(
-            id=req.id,
-            user_id=req.user_id,
-            user_name=user.full_name if user else "Unknown",
-            user_email=user.email if user else "Unknown",
-            requested_role=req.requested_role,
-            current_role=req.current_role,
-            reason=req.reason,
-            status=req.status,
-            created_at=req.created_at,
-            reviewed_at=req.reviewed_at,
-            reviewed_by_name=None,
-            admin_notes=req.admin_notes
-        ))
+    # Approved: ek UPDATE per requested role, har user ko alag load nahi karna
+    if review_data.status == RoleRequestStatus.approved:
+        users_by_role: Dict[UserRole, List[int]] = {}
+        for _, user_id, requested_role in claimed:
+            users_by_role.setdefault(requested_role, []).append(user_id)
+        for role, user_ids in users_by_role.items():
+            db.execute(update(User).where(User.id.in_(user_ids)).values(role=role))
+        if users_by_role:
+            # Core UPDATE session hooks ko nahi dikhta - role public pages par nested hai
+            http_cache.bump(db, ["users"])
+    db.commit()
     
-    return result
+    outcomes = {request_id: review_data.status.value for request_id, _, _ in claimed}
+    outcomes.update(dict.fromkeys(superseded, "superseded"))
+    unclaimed = [request_id for request_id in request_ids if request_id not in outcomes]
+    if unclaimed:
+        existing = set(db.exec(select(RoleRequest.id).where(RoleRequest.id.in_(unclaimed))).all())
+        for request_id in unclaimed:
+            outcomes[request_id] = "already_reviewed" if request_id in existing else "not_found"
+    return outcomes
 
 @router.post("/review-request/{request_id}", response_model=dict)
 def review_role_request(
@@ -227,48 +293,21 @@ def review_role_request(
 ):
     """Review a role request - only for super admins"""
     
-    if current_user.role != UserRole.super_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Only super admins can review role requests"
-        )
-    
-    if review_data.status not in [RoleRequestStatus.approved, RoleRequestStatus.rejected]:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Status must be either 'approved' or 'rejected'"
-        )
+    _check_review(current_user, review_data)
     
-    # Get the role request
-    role_request = db.get(RoleRequest, request_id)
-    if not role_request:
+    outcome = _apply_reviews(db, [request_id], review_data, current_user)[request_id]
+    if outcome == "not_found":
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Role request not found"
         )
     
-    if role_request.status != RoleRequestStatus.pending:
+    if outcome == "already_reviewed":
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="This request has already been reviewed"
         )
     
-    # Update the role request
-    role_request.status = review_data.status
-    role_request.reviewed_at = datetime.utcnow()
-    role_request.reviewed_by_id = current_user.id
-    role_request.admin_notes = review_data.admin_notes
-    
-    # If approved, update the user's role
-    if review_data.status == RoleRequestStatus.approved:
-        user = db.get(User, role_request.user_id)
-        if user:
-            user.role = role_request.requested_role
-            db.add(user)
-    
-    db.add(role_request)
-    db.commit()
-    
     action = "approved" if review_data.status == RoleRequestStatus.approved else "rejected"
     return {
         "message": f"Role request {action} successfully",
@@ -276,6 +315,24 @@ def review_role_request(
         "status": review_data.status
     }
 
+@router.post("/review-requests", response_model=RoleRequestBulkReviewResult)
+def bulk_review_role_requests(
+    review_data: RoleRequestBulkReview,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)]
+):
+    """Approve or reject many role requests in one transaction - only for super admins"""
+    
+    _check_review(current_user, review_data)
+    
+    request_ids = list(dict.fromkeys(review_data.request_ids))
+    outcomes = _apply_reviews(db, request_ids, review_data, current_user)
+    return RoleRequestBulkReviewResult(
+        status=review_data.status,
+        reviewed=sum(outcome == review_data.status.value for outcome in outcomes.values()),
+        results=[RoleRequestReviewOutcome(request_id=i, outcome=outcomes[i]) for i in request_ids],
+    )
+
 @router.delete("/cancel-request/{request_id}", response_model=dict)
 def cancel_role_request(
     request_id: int,
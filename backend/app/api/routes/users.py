@@ -1,21 +1,21 @@
-from typing import List, Annotated
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile
+from typing import List, Annotated, Optional
+import asyncio
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, BackgroundTasks
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlmodel import Session, select
 from pydantic import BaseModel
-# import face_recognition  # Temporarily disabled for deployment
-# import numpy as np  # Temporarily disabled for deployment
-import io
-from PIL import Image
 import requests
 
 from app.core.security import get_password_hash, verify_password, create_access_token
 from app.core.super_admin_config import is_super_admin_email, log_super_admin_attempt
 from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
 from app.db.database import get_session
-from app.db.models import User, UserRole, Club
+from app.db.models import User, UserRole, Club, EnrollmentJob, EnrollmentStatus
 from app.api.deps import get_current_user
 from app.schemas import UserPublic, ClubPublic, UserPublicWithDetails, ClubAdminView
+from app.core.config import ENROLLMENT_MAX_IMAGES
+from app.face.encoder import get_face_encoder
+from app.face.enrollment import create_enrollment_job, run_enrollment_job
 
 def get_user_role_by_email(email: str) -> UserRole:
     """
@@ -46,6 +46,21 @@ class GoogleLoginRequest(BaseModel):
     token: str
     # Role is removed - all new users are students by default
 
+class EnrollmentJobPublic(BaseModel):
+    job_id: str
+    status: EnrollmentStatus
+    image_count: int
+    accepted_images: int
+    rejected: List[dict]
+    detail: Optional[str] = None
+
+    @classmethod
+    def from_job(cls, job: EnrollmentJob) -> "EnrollmentJobPublic":
+        return cls(
+            job_id=job.id, status=job.status, image_count=job.image_count,
+            accepted_images=job.accepted_images, rejected=job.rejected, detail=job.detail,
+        )
+
 # --- Router ---
 router = APIRouter()
 
@@ -179,41 +194,38 @@ def get_my_administered_clubs(
         clubs_with_counts.append(club_view)
     return clubs_with_counts
 
-# Face enrollment temporarily disabled for deployment
-# @router.post("/me/enroll-face", response_model=UserPublic)
-# async def enroll_user_face(
-#     current_user: Annotated[User, Depends(get_current_user)],
-#     db: Annotated[Session, Depends(get_session)],
-#     file: UploadFile = File(...),
-# ):
-#     try:
-#         # Validate file first
-#         SecureValidator.validate_file_upload(file)
-#         
-#         contents = await file.read()
-#         image = Image.open(io.BytesIO(contents)).convert("RGB")
-#         image_np = np.array(image)
-#     except HTTPException:
-#         # Re-raise validation errors
-#         raise
-#     except Exception as e:
-#         raise SecureErrorHandler.handle_validation_error("image", "Invalid image file format")
-
-#     face_locations = face_recognition.face_locations(image_np)
-#     if not face_locations:
-#         raise HTTPException(status_code=400, detail="No face found in the image.")
-#     if len(face_locations) > 1:
-#         raise HTTPException(status_code=400, detail="Multiple faces found. Please upload an image with only one face.")
-    
-#     face_encoding = face_recognition.face_encodings(image_np, known_face_locations=face_locations)[0]
-#     encoding_str = ",".join(map(str, face_encoding))
-    
-#     user_to_update = db.get(User, current_user.id)
-#     if not user_to_update:
-#         raise HTTPException(status_code=404, detail="User not found")
-        
-#     user_to_update.face_encoding = encoding_str
-#     db.add(user_to_update)
-#     db.commit()
-#     db.refresh(user_to_update)
-#     return user_to_update
\ No newline at end of file
+@router.post("/me/enroll-face", response_model=EnrollmentJobPublic, status_code=status.HTTP_202_ACCEPTED)
+async def enroll_user_face(
+    current_user: Annotated[User, Depends(get_current_user)],
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="Several photos of the same face from slightly different angles."),
+):
+    if get_face_encoder() is None:
+        raise SecureErrorHandler.handle_external_service_error(Exception("Face encoder unavailable"), "Face recognition")
+    if len(files) > ENROLLMENT_MAX_IMAGES:
+        raise SecureErrorHandler.handle_validation_error("files", f"Upload at most {ENROLLMENT_MAX_IMAGES} photos")
+
+    images = []
+    for file in files:
+        # Validate every file first; detection and encoding happen in the background job
+        SecureValidator.validate_file_upload(file)
+        contents = await file.read()
+        if len(contents) > SecureValidator.MAX_FILE_SIZE:
+            raise SecureErrorHandler.handle_validation_error("file", "File size must be less than 5MB")
+        images.append(contents)
+
+    job = await asyncio.to_thread(create_enrollment_job, current_user.id, len(images))
+    background_tasks.add_task(run_enrollment_job, job.id, images)
+    return EnrollmentJobPublic.from_job(job)
+
+@router.get("/me/enroll-face/{job_id}", response_model=EnrollmentJobPublic)
+def get_enrollment_job(
+    job_id: str,
+    current_user: Annotated[User, Depends(get_current_user)],
+    db: Annotated[Session, Depends(get_session)],
+):
+    # Job status database mein hai - poll kisi bhi worker par aa sakta hai
+    job = db.get(EnrollmentJob, job_id)
+    if not job or job.user_id != current_user.id:
+        raise HTTPException(status_code=404, detail="Enrollment job not found")
+    return EnrollmentJobPublic.from_job(job)
@@ -0,0 +1,160 @@
+"""
+Attendance dedupe cache + write-behind buffer.
+
+`mark()` answers "already marked today?" from an in-memory set per
+(day, event_id), warmed from the database with one query the first time a
+key is seen. New marks are appended to a buffer that is flushed as a single
+multi-row INSERT ... ON CONFLICT DO NOTHING every `ATTENDANCE_FLUSH_SIZE`
+records or `ATTENDANCE_FLUSH_INTERVAL_MS` milliseconds, together with the
+daily attendance rollup for the rows that were actually new. The unique index on
+`AttendanceRecord (user_id, coalesce(event_id, 0), day)` keeps the table
+correct even if the cache is cold, stale or per-process.
+
+A batch that fails is split in halves and retried down to single rows, so
+one bad mark (e.g. an FK violation after its user or event was deleted)
+can't hold back the rest. A row that still fails goes back in the buffer
+and is dropped, with a log line, after `ATTENDANCE_MAX_RETRIES` flushes.
+"""
+
+import asyncio
+from collections import Counter
+from datetime import date, datetime
+from threading import Lock
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.core.config import ATTENDANCE_FLUSH_SIZE, ATTENDANCE_FLUSH_INTERVAL_MS, ATTENDANCE_MAX_RETRIES
+from app.core.daily_stats import SITE_WIDE, event_clubs, record as record_daily
+from app.core.secure_error_handler import SecureErrorHandler
+from app.db.database import engine
+from app.db.models import AttendanceRecord
+
+_CacheKey = Tuple[date, Optional[int]]
+# Buffered rows carry their failed-flush count under this key; it is not a column
+_ATTEMPTS = "attempts"
+
+
+def _insert_ignoring_duplicates():
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    return dialect.insert(AttendanceRecord).on_conflict_do_nothing()
+
+
+class AttendanceWriter:
+    def __init__(
+        self, flush_size: int = ATTENDANCE_FLUSH_SIZE, flush_interval_ms: int = ATTENDANCE_FLUSH_INTERVAL_MS,
+        max_retries: int = ATTENDANCE_MAX_RETRIES,
+    ):
+        self.flush_size = flush_size
+        self.flush_interval_ms = flush_interval_ms
+        self.max_retries = max_retries
+        self.dropped = 0
+        self._marked: Dict[_CacheKey, Set[int]] = {}
+        self._pending: List[dict] = []
+        self._lock = Lock()
+        self._flush_lock = Lock()
+        self._task: Optional[asyncio.Task] = None
+
+    def _warm(self, key: _CacheKey) -> Set[int]:
+        day, event_id = key
+        event_filter = AttendanceRecord.event_id == None if event_id is None else AttendanceRecord.event_id == event_id
+        with Session(engine) as db:
+            user_ids = db.exec(select(AttendanceRecord.user_id).where(AttendanceRecord.day == day, event_filter)).all()
+        # Only today's keys are ever looked up again
+        for stale in [k for k in self._marked if k[0] != day]:
+            del self._marked[stale]
+        return self._marked.setdefault(key, set(user_ids))
+
+    def mark(self, user_id: int, event_id: Optional[int] = None, notes: Optional[str] = None) -> bool:
+        """Record attendance; returns False if the user was already marked today."""
+        now = datetime.utcnow()
+        key = (now.date(), event_id)
+        with self._lock:
+            marked = self._marked.get(key)
+            if marked is None:
+                marked = self._warm(key)
+            if user_id in marked:
+                return False
+            marked.add(user_id)
+            self._pending.append(
+                {"user_id": user_id, "event_id": event_id, "notes": notes, "timestamp": now, "day": key[0], _ATTEMPTS: 0}
+            )
+            flush_now = len(self._pending) >= self.flush_size
+        if flush_now:
+            self.flush()
+        return True
+
+    def _write(self, rows: List[dict]) -> None:
+        params = [{k: v for k, v in row.items() if k != _ATTEMPTS} for row in rows]
+        with Session(engine) as db:
+            # RETURNING gives only the rows that were new, so the daily rollup counts each mark once
+            inserted = db.execute(
+                _insert_ignoring_duplicates().returning(AttendanceRecord.event_id, AttendanceRecord.day), params
+            ).all()
+            clubs = event_clubs(db, (event_id for event_id, _ in inserted))
+            record_daily(db, Counter(
+                (clubs.get(event_id, SITE_WIDE), day, "attendance") for event_id, day in inserted
+            ))
+            db.commit()
+
+    def _write_or_split(self, rows: List[dict]) -> List[dict]:
+        """Write `rows`, halving on failure; returns the single rows that still failed."""
+        try:
+            self._write(rows)
+            return []
+        except Exception as e:
+            if len(rows) == 1:
+                SecureErrorHandler.log_error(e, "Attendance flush of 1 record")
+                return rows
+        middle = len(rows) // 2
+        return self._write_or_split(rows[:middle]) + self._write_or_split(rows[middle:])
+
+    def _forget(self, row: dict) -> None:
+        # Cache se hatao taki agla scan dobara mark kar sake
+        marked = self._marked.get((row["day"], row["event_id"]))
+        if marked is not None:
+            marked.discard(row["user_id"])
+
+    def flush(self) -> int:
+        """Write all buffered marks; returns the number of rows written (or found already present)."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            failed = self._write_or_split(rows)
+            retry, dropped = [], []
+            for row in failed:
+                row[_ATTEMPTS] += 1
+                (retry if row[_ATTEMPTS] < self.max_retries else dropped).append(row)
+            for row in dropped:
+                SecureErrorHandler.log_error(
+                    RuntimeError(f"dropped after {row[_ATTEMPTS]} attempts"),
+                    f"Attendance mark user={row['user_id']} event={row['event_id']} day={row['day']}",
+                )
+            with self._lock:
+                for row in dropped:
+                    self._forget(row)
+                self.dropped += len(dropped)
+                self._pending[:0] = retry
+            return len(rows) - len(failed)
+
+    async def _flush_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval_ms / 1000)
+            if self._pending:
+                await asyncio.to_thread(self.flush)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._flush_periodically())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        await asyncio.to_thread(self.flush)
+
+
+attendance_writer = AttendanceWriter()
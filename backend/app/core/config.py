@@ -19,3 +19,94 @@ CLOUDINARY_API_SECRET = os.getenv("CLOUDINARY_API_SECRET")
 TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
 TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_WHATSAPP_NUMBER = os.getenv("TWILIO_WHATSAPP_NUMBER")
+
+# Messaging gateway (async HTTP client shared by OTP sends and announcements)
+MESSAGING_API_BASE_URL = os.getenv("MESSAGING_API_BASE_URL", "https://api.twilio.com")
+MESSAGING_TIMEOUT_SECONDS = float(os.getenv("MESSAGING_TIMEOUT_SECONDS", 10))
+MESSAGING_MAX_CONNECTIONS = int(os.getenv("MESSAGING_MAX_CONNECTIONS", 20))
+MESSAGING_MAX_CONCURRENCY = int(os.getenv("MESSAGING_MAX_CONCURRENCY", 20))
+
+# OTP store: "database" (shared by all workers) or "memory" (single worker only)
+OTP_STORE_BACKEND = os.getenv("OTP_STORE_BACKEND", "database")
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", 300))
+OTP_MAX_ATTEMPTS = int(os.getenv("OTP_MAX_ATTEMPTS", 5))
+OTP_RESEND_COOLDOWN_SECONDS = int(os.getenv("OTP_RESEND_COOLDOWN_SECONDS", 60))
+OTP_SWEEP_INTERVAL_SECONDS = int(os.getenv("OTP_SWEEP_INTERVAL_SECONDS", 300))
+
+# Face Recognition Config
+# "dlib" needs the optional face_recognition package; "stub" runs without it (dev/benchmarks only)
+FACE_ENCODER_BACKEND = os.getenv("FACE_ENCODER_BACKEND", "dlib")
+FACE_MATCH_TOLERANCE = float(os.getenv("FACE_MATCH_TOLERANCE", 0.5))
+# "brute" (exact) or "ivf" (approximate, for very large enrollments)
+FACE_INDEX_BACKEND = os.getenv("FACE_INDEX_BACKEND", "brute")
+FACE_INDEX_PATH = os.getenv("FACE_INDEX_PATH", "./face_index.npz")
+FACE_INDEX_SYNC_SECONDS = float(os.getenv("FACE_INDEX_SYNC_SECONDS", 5))  # How often a worker checks for enrollments elsewhere
+
+# Live Attendance Frame Processing
+FRAME_WORKERS = int(os.getenv("FRAME_WORKERS", max(1, (os.cpu_count() or 2) - 1)))
+FRAME_MAX_SIDE = int(os.getenv("FRAME_MAX_SIDE", 640))  # Frames are decoded at or below this size
+FRAME_MIN_INTERVAL_MS = int(os.getenv("FRAME_MIN_INTERVAL_MS", 500))
+FRAME_MAX_INTERVAL_MS = int(os.getenv("FRAME_MAX_INTERVAL_MS", 5000))
+FRAME_QUALITY = float(os.getenv("FRAME_QUALITY", 0.6))  # Encoder quality (0-1) clients are asked to use
+
+# Multi-photo face enrollment
+ENROLLMENT_MAX_IMAGES = int(os.getenv("ENROLLMENT_MAX_IMAGES", 10))
+ENROLLMENT_MIN_FACES = int(os.getenv("ENROLLMENT_MIN_FACES", 1))  # Photos that must survive outlier rejection
+ENROLLMENT_OUTLIER_DISTANCE = float(os.getenv("ENROLLMENT_OUTLIER_DISTANCE", 0.4))
+ENROLLMENT_JOB_TTL_SECONDS = int(os.getenv("ENROLLMENT_JOB_TTL_SECONDS", 3600))
+
+# Roster exports (fpdf builds PDFs in memory, so they are capped)
+EXPORT_PDF_MAX_ROWS = int(os.getenv("EXPORT_PDF_MAX_ROWS", 5000))
+
+# Bulk user import (app/core/user_import.py); bcrypt hashing runs in a process pool
+USER_IMPORT_WORKERS = int(os.getenv("USER_IMPORT_WORKERS", os.cpu_count() or 1))
+USER_IMPORT_CHUNK_ROWS = int(os.getenv("USER_IMPORT_CHUNK_ROWS", 1000))  # Rows per executemany INSERT
+USER_IMPORT_MAX_ROWS = int(os.getenv("USER_IMPORT_MAX_ROWS", 20000))
+
+# Conditional GET (ETag) on public read endpoints
+HTTP_CACHE_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_MAX_AGE_SECONDS", 0))  # 0 = revalidate every time
+HTTP_CACHE_STATIC_MAX_AGE_SECONDS = int(os.getenv("HTTP_CACHE_STATIC_MAX_AGE_SECONDS", 3600))
+
+# In-process cache of serialized catalog responses (app/core/response_cache.py)
+RESPONSE_CACHE_ENABLED = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+RESPONSE_CACHE_MAX_BYTES = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+
+# Fast JSON path for large lists (app/core/fast_json.py); true = validate every row, not just the first
+FAST_JSON_VALIDATE = os.getenv("FAST_JSON_VALIDATE", "false").lower() == "true"
+
+# Role requests
+ROLE_REVIEW_BULK_MAX = int(os.getenv("ROLE_REVIEW_BULK_MAX", 500))  # Requests per bulk review call
+
+# Warehouse exports (app/core/warehouse.py)
+WAREHOUSE_BATCH_ROWS = int(os.getenv("WAREHOUSE_BATCH_ROWS", 5000))
+
+# Forums (threaded replies; depth 0 = direct reply to the post)
+FORUM_MAX_REPLY_DEPTH = int(os.getenv("FORUM_MAX_REPLY_DEPTH", 8))
+# "Hot" sort: 10x the likes (+ weighted replies) is worth FORUM_HOT_DECAY_SECONDS of recency
+FORUM_HOT_DECAY_SECONDS = float(os.getenv("FORUM_HOT_DECAY_SECONDS", 45000))
+FORUM_HOT_REPLY_WEIGHT = int(os.getenv("FORUM_HOT_REPLY_WEIGHT", 2))
+FORUM_TRENDING_TOP_K = int(os.getenv("FORUM_TRENDING_TOP_K", 200))  # Hottest posts kept in memory per category / club
+
+# Real-time updates (SSE)
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", 100))  # Pending events per subscriber before it is dropped
+SSE_HEARTBEAT_SECONDS = int(os.getenv("SSE_HEARTBEAT_SECONDS", 15))
+
+# Dashboard rollups (kept current by write hooks; full recompute on this interval)
+ANALYTICS_RECONCILE_SECONDS = int(os.getenv("ANALYTICS_RECONCILE_SECONDS", 600))
+ANALYTICS_MAX_SERIES_DAYS = int(os.getenv("ANALYTICS_MAX_SERIES_DAYS", 731))  # Longest time-series window
+ANALYTICS_UTC_OFFSET_MINUTES = int(os.getenv("ANALYTICS_UTC_OFFSET_MINUTES", 330))  # Campus time for heatmaps (IST)
+ANALYTICS_ENGAGEMENT_CACHE_SECONDS = int(os.getenv("ANALYTICS_ENGAGEMENT_CACHE_SECONDS", 300))
+ANALYTICS_ENGAGEMENT_CACHE_SIZE = int(os.getenv("ANALYTICS_ENGAGEMENT_CACHE_SIZE", 256))
+
+# Attendance write-behind buffer
+ATTENDANCE_FLUSH_SIZE = int(os.getenv("ATTENDANCE_FLUSH_SIZE", 50))
+ATTENDANCE_FLUSH_INTERVAL_MS = int(os.getenv("ATTENDANCE_FLUSH_INTERVAL_MS", 1000))
+ATTENDANCE_MAX_RETRIES = int(os.getenv("ATTENDANCE_MAX_RETRIES", 3))  # Flushes a failing mark gets before it is dropped
+
+# Warehouse export watermark (app/core/warehouse.py): snapshot_at is moved back by this much.
+# Rows are stamped in Python before they commit, attendance marks up to a flush interval per
+# attempt later - so never less than that bound
+WAREHOUSE_OVERLAP_SECONDS = max(
+    float(os.getenv("WAREHOUSE_OVERLAP_SECONDS", 60)),
+    ATTENDANCE_FLUSH_INTERVAL_MS / 1000 * (ATTENDANCE_MAX_RETRIES + 1),
+)
@@ -0,0 +1,163 @@
+"""
+Daily rollups behind the growth time series.
+
+`DailyStat` keeps one counter per (club, UTC day, metric), with club 0 for
+the whole site. Counters are bumped in the same transaction as the write
+they describe. A session hook turns new User, Membership and
+EventRegistration rows into upserts at flush. The attendance writer calls
+`record()` with the rows its batch actually inserted. Every club-level count
+is also added to the site-wide row.
+
+`backfill()` rebuilds the table from the source timestamps with one grouped
+query per metric and runs at startup when the table is empty. Counts are of
+things that happened (joins, registrations, marks, signups); rows deleted
+later are only dropped from history by the next backfill.
+"""
+
+from collections import Counter
+from datetime import date, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, literal
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, func, select
+
+from app.db.database import engine
+from app.db.models import AttendanceRecord, DailyStat, Event, EventRegistration, Membership, User
+
+METRICS = ("members", "registrations", "attendance", "signups")
+SITE_WIDE = 0
+
+# (club_id, day, metric) -> count
+DailyCounts = Dict[Tuple[int, date, str], int]
+
+
+def _as_date(value) -> date:
+    # SQLite's date() returns text, Postgres returns a date
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+def _upsert():
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(DailyStat)
+    return statement.on_conflict_do_update(
+        index_elements=["club_id", "day", "metric"],
+        set_={"count": DailyStat.count + statement.excluded["count"]},
+    )
+
+
+def record(executor, counts: DailyCounts) -> None:
+    """Add `counts` to the rollup (and to the site-wide rows) with one executemany upsert."""
+    totals = Counter()
+    for (club_id, day, metric), n in counts.items():
+        if club_id:
+            totals[(club_id, day, metric)] += n
+        totals[(SITE_WIDE, day, metric)] += n
+    if totals:
+        executor.execute(
+            _upsert(),
+            [{"club_id": c, "day": d, "metric": m, "count": n} for (c, d, m), n in totals.items()],
+        )
+
+
+def event_clubs(executor, event_ids: Iterable[int]) -> Dict[int, int]:
+    ids = {event_id for event_id in event_ids if event_id is not None}
+    if not ids:
+        return {}
+    return dict(executor.execute(select(Event.id, Event.club_id).where(Event.id.in_(ids))).all())
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _record_new_rows(session, flush_context) -> None:
+    counts: DailyCounts = Counter()
+    registrations: List[EventRegistration] = []
+    for instance in session.new:
+        if isinstance(instance, User):
+            counts[(SITE_WIDE, instance.created_at.date(), "signups")] += 1
+        elif isinstance(instance, Membership):
+            counts[(instance.club_id, instance.joined_at.date(), "members")] += 1
+        elif isinstance(instance, EventRegistration):
+            registrations.append(instance)
+    if not counts and not registrations:
+        return
+    # Flush ke andar session.execute autoflush karega - seedha connection use karein
+    connection = session.connection()
+    clubs = event_clubs(connection, (r.event_id for r in registrations))
+    for registration in registrations:
+        counts[(clubs.get(registration.event_id, SITE_WIDE), registration.registered_at.date(), "registrations")] += 1
+    record(connection, counts)
+
+
+def backfill(db: Session) -> int:
+    """Rebuild every daily counter from the source tables; returns the number of rows written."""
+    counts: DailyCounts = Counter()
+    grouped = {
+        "members": select(Membership.club_id, func.date(Membership.joined_at), func.count())
+        .group_by(Membership.club_id, func.date(Membership.joined_at)),
+        "registrations": select(Event.club_id, func.date(EventRegistration.registered_at), func.count())
+        .join(Event, Event.id == EventRegistration.event_id)
+        .group_by(Event.club_id, func.date(EventRegistration.registered_at)),
+        "attendance": select(func.coalesce(Event.club_id, SITE_WIDE), AttendanceRecord.day, func.count())
+        .join(Event, Event.id == AttendanceRecord.event_id, isouter=True)
+        .group_by(Event.club_id, AttendanceRecord.day),
+        "signups": select(literal(SITE_WIDE), func.date(User.created_at), func.count())
+        .group_by(func.date(User.created_at)),
+    }
+    for metric, statement in grouped.items():
+        for club_id, day, n in db.exec(statement):
+            if day is not None:
+                counts[(club_id, _as_date(day), metric)] += n
+    db.execute(delete(DailyStat))
+    record(db, counts)
+    db.commit()
+    return len(counts)
+
+
+def backfill_if_empty() -> None:
+    with Session(engine) as db:
+        if db.exec(select(DailyStat.club_id).limit(1)).first() is None:
+            backfill(db)
+
+
+def total(db: Session, club_id: int, metric: str, start: date, end: Optional[date] = None) -> int:
+    statement = select(func.coalesce(func.sum(DailyStat.count), 0)).where(
+        DailyStat.club_id == club_id, DailyStat.day >= start, DailyStat.metric == metric
+    )
+    if end is not None:
+        statement = statement.where(DailyStat.day <= end)
+    return db.exec(statement).one()
+
+
+def series(db: Session, club_id: int, start: date, end: date, metrics: Iterable[str] = METRICS) -> dict:
+    """
+    Zero-filled daily series for `start`..`end` (inclusive) from one range scan
+    of the rollup. With "members", `members_total` is the running member count.
+    """
+    metrics = list(dict.fromkeys(metrics))
+    days = (end - start).days + 1
+    values = {metric: [0] * days for metric in metrics}
+    rows = db.exec(
+        select(DailyStat.day, DailyStat.metric, DailyStat.count)
+        .where(DailyStat.club_id == club_id, DailyStat.day >= start, DailyStat.day <= end)
+    )
+    for day, metric, count in rows:
+        if metric in values:
+            values[metric][(day - start).days] = count
+    result = {
+        "start": start,
+        "end": end,
+        "days": [start + timedelta(days=i) for i in range(days)],
+        "series": values,
+    }
+    if "members" in values:
+        running = db.exec(
+            select(func.coalesce(func.sum(DailyStat.count), 0))
+            .where(DailyStat.club_id == club_id, DailyStat.metric == "members", DailyStat.day < start)
+        ).one()
+        members_total = []
+        for joined in values["members"]:
+            running += joined
+            members_total.append(running)
+        result["members_total"] = members_total
+    return result
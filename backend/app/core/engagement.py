@@ -0,0 +1,159 @@
+"""
+Engagement heatmaps from attendance marks.
+
+The marks of a club (or one event) in a window are fetched as plain column
+tuples, with no ORM objects, and turned into NumPy arrays. Every statistic
+is then a vectorized binning step:
+
+- weekday x hour heatmap: one `bincount` over `weekday * 24 + hour` in
+  campus local time (`ANALYTICS_UTC_OFFSET_MINUTES`)
+- turnout per event: distinct attendees / registrations, via `unique` on
+  (event, user) pairs
+- repeat-attendee rate: the share of attendees seen at two or more events
+
+Results are cached per (club, event, window) for
+`ANALYTICS_ENGAGEMENT_CACHE_SECONDS`.
+"""
+
+from collections import OrderedDict
+from datetime import date, datetime, timedelta
+from threading import Lock
+from typing import Optional, Tuple
+
+import numpy as np
+from sqlmodel import Session, func, select
+
+from app.core.config import (
+    ANALYTICS_ENGAGEMENT_CACHE_SECONDS, ANALYTICS_ENGAGEMENT_CACHE_SIZE, ANALYTICS_UTC_OFFSET_MINUTES,
+)
+from app.db.models import AttendanceRecord, Event, EventRegistration
+
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+_MINUTES_PER_DAY = 24 * 60
+# 1970-01-01 was a Thursday
+_EPOCH_WEEKDAY = 3
+
+_CacheKey = Tuple[int, Optional[int], date, date]
+
+
+def _load_marks(db: Session, club_id: int, start: date, end: date, event_id: Optional[int]):
+    """(user_ids, event_ids, timestamps) arrays for the club's marks in the window."""
+    statement = (
+        select(AttendanceRecord.user_id, AttendanceRecord.event_id, AttendanceRecord.timestamp)
+        .join(Event, Event.id == AttendanceRecord.event_id)
+        .where(Event.club_id == club_id, AttendanceRecord.day >= start, AttendanceRecord.day <= end)
+    )
+    if event_id is not None:
+        statement = statement.where(AttendanceRecord.event_id == event_id)
+    rows = db.exec(statement).all()
+    if not rows:
+        return np.empty(0, np.int64), np.empty(0, np.int64), np.empty(0, "datetime64[us]")
+    user_ids, event_ids, timestamps = zip(*rows)
+    return (
+        np.array(user_ids, dtype=np.int64),
+        np.array(event_ids, dtype=np.int64),
+        np.array(timestamps, dtype="datetime64[us]"),
+    )
+
+
+def weekday_hour_heatmap(
+    timestamps: np.ndarray, utc_offset_minutes: int = ANALYTICS_UTC_OFFSET_MINUTES
+) -> np.ndarray:
+    """7 x 24 counts (Monday first) of UTC `timestamps` shifted to local time."""
+    minutes = timestamps.astype("datetime64[m]").astype(np.int64) + utc_offset_minutes
+    days, minute_of_day = np.divmod(minutes, _MINUTES_PER_DAY)
+    weekday = (days + _EPOCH_WEEKDAY) % 7
+    return np.bincount(weekday * 24 + minute_of_day // 60, minlength=7 * 24).reshape(7, 24)
+
+
+def _pair_keys(event_ids: np.ndarray, user_ids: np.ndarray) -> np.ndarray:
+    return (event_ids << 32) | user_ids
+
+
+def compute_engagement(db: Session, club_id: int, start: date, end: date, event_id: Optional[int] = None) -> dict:
+    user_ids, event_ids, timestamps = _load_marks(db, club_id, start, end, event_id)
+    heatmap = weekday_hour_heatmap(timestamps)
+
+    # Distinct (event, user) pairs: a user marked on several days counts once per event
+    pairs = np.unique(_pair_keys(event_ids, user_ids))
+    pair_events, pair_users = pairs >> 32, pairs & 0xFFFFFFFF
+    attended_events, attendees = np.unique(pair_events, return_counts=True)
+    attendee_ids, events_per_user = np.unique(pair_users, return_counts=True)
+    repeat_rate = float((events_per_user >= 2).mean()) if attendee_ids.size else 0.0
+
+    # Events dated in the window, with their registration counts (one grouped query)
+    events_query = (
+        select(Event.id, Event.name, Event.date, func.count(EventRegistration.user_id))
+        .join(EventRegistration, EventRegistration.event_id == Event.id, isouter=True)
+        .where(Event.club_id == club_id, Event.date >= start, Event.date < end + timedelta(days=1))
+        .group_by(Event.id, Event.name, Event.date)
+        .order_by(Event.date)
+    )
+    if event_id is not None:
+        events_query = events_query.where(Event.id == event_id)
+    attendees_by_event = dict(zip(attended_events.tolist(), attendees.tolist()))
+    events = []
+    for eid, name, event_date, registrations in db.exec(events_query):
+        attended = attendees_by_event.get(eid, 0)
+        events.append({
+            "event_id": eid,
+            "name": name,
+            "date": event_date,
+            "registrations": registrations,
+            "attendees": attended,
+            "turnout_ratio": round(attended / registrations, 3) if registrations else None,
+        })
+
+    peak = None
+    if heatmap.any():
+        weekday, hour = np.unravel_index(int(heatmap.argmax()), heatmap.shape)
+        peak = {"weekday": WEEKDAYS[weekday], "hour": int(hour), "count": int(heatmap[weekday, hour])}
+    return {
+        "club_id": club_id,
+        "event_id": event_id,
+        "start": start,
+        "end": end,
+        "utc_offset_minutes": ANALYTICS_UTC_OFFSET_MINUTES,
+        "total_marks": int(timestamps.size),
+        "unique_attendees": int(attendee_ids.size),
+        "repeat_attendee_rate": round(repeat_rate, 3),
+        "heatmap": {"weekdays": WEEKDAYS, "counts": heatmap.tolist()},
+        "peak": peak,
+        "events": events,
+        "generated_at": datetime.utcnow(),
+    }
+
+
+class EngagementCache:
+    """Small LRU of computed reports with a TTL."""
+
+    def __init__(
+        self, ttl_seconds: int = ANALYTICS_ENGAGEMENT_CACHE_SECONDS, max_entries: int = ANALYTICS_ENGAGEMENT_CACHE_SIZE
+    ):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[_CacheKey, dict]" = OrderedDict()
+        self._lock = Lock()
+
+    def get_or_compute(self, db: Session, club_id: int, start: date, end: date, event_id: Optional[int] = None) -> dict:
+        key = (club_id, event_id, start, end)
+        now = datetime.utcnow()
+        with self._lock:
+            report = self._entries.get(key)
+            if report is not None and now - report["generated_at"] < self.ttl:
+                self._entries.move_to_end(key)
+                return report
+        report = compute_engagement(db, club_id, start, end, event_id)
+        with self._lock:
+            self._entries[key] = report
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return report
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+engagement_cache = EngagementCache()
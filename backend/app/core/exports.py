@@ -0,0 +1,134 @@
+"""
+Streaming tabular exports (CSV / XLSX / PDF).
+
+Rows come from `stream_rows`, which runs the query on its own session with
+`yield_per` so the driver uses a server-side cursor and only one batch of
+tuples is alive at a time. CSV is written and sent incrementally. XLSX uses
+openpyxl's write-only mode (rows are spooled to disk, not kept in memory)
+and is streamed once the zip is finalised. fpdf builds the whole document in
+memory, so PDF exports are capped at `EXPORT_PDF_MAX_ROWS`.
+"""
+
+import csv
+import io
+import tempfile
+from datetime import date, datetime
+from enum import Enum
+from typing import Iterable, Iterator, Sequence
+
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from fpdf import FPDF
+from openpyxl import Workbook
+from sqlmodel import Session
+
+from app.core.config import EXPORT_PDF_MAX_ROWS
+from app.db.database import engine
+
+EXPORT_FORMATS = ("csv", "xlsx", "pdf")
+_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "xlsx": "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+    "pdf": "application/pdf",
+}
+_BATCH_ROWS = 1000
+_FILE_CHUNK = 64 * 1024
+
+
+def stream_rows(statement, batch_size: int = _BATCH_ROWS) -> Iterator[tuple]:
+    """Iterate a column query through a server-side cursor on a dedicated session."""
+    with Session(engine) as db:
+        for row in db.exec(statement.execution_options(yield_per=batch_size)):
+            yield tuple(row)
+
+
+def _cell(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.value
+    return value
+
+
+def csv_chunks(header: Sequence[str], rows: Iterable[tuple]) -> Iterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(header)
+    # Send the header immediately so the download starts before the first batch
+    yield buffer.getvalue().encode()
+    buffer.seek(0)
+    buffer.truncate()
+    for i, row in enumerate(rows, 1):
+        writer.writerow([_cell(v) for v in row])
+        if i % _BATCH_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def xlsx_chunks(header: Sequence[str], rows: Iterable[tuple], title: str) -> Iterator[bytes]:
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet(title=title[:31])
+    sheet.append(list(header))
+    for row in rows:
+        sheet.append(list(row))
+    with tempfile.TemporaryFile() as f:
+        workbook.save(f)
+        f.seek(0)
+        while chunk := f.read(_FILE_CHUNK):
+            yield chunk
+
+
+def _latin1(value) -> str:
+    # fpdf 1.7 core fonts are latin-1 only
+    return str(_cell(value) if value is not None else "").encode("latin-1", "replace").decode("latin-1")
+
+
+def pdf_chunks(header: Sequence[str], rows: Iterable[tuple], title: str) -> Iterator[bytes]:
+    pdf = FPDF(orientation="L")
+    pdf.set_auto_page_break(True, margin=10)
+    pdf.add_page()
+    pdf.set_font("Arial", "B", 12)
+    pdf.cell(0, 8, _latin1(title), ln=1)
+    width = (pdf.w - 2 * pdf.l_margin) / len(header)
+
+    def header_row():
+        pdf.set_font("Arial", "B", 8)
+        for name in header:
+            pdf.cell(width, 6, _latin1(name), border=1)
+        pdf.ln()
+        pdf.set_font("Arial", "", 8)
+
+    header_row()
+    for i, row in enumerate(rows, 1):
+        if i > EXPORT_PDF_MAX_ROWS:
+            pdf.cell(0, 6, f"Truncated at {EXPORT_PDF_MAX_ROWS} rows - use the CSV or XLSX export for the full list.", ln=1)
+            break
+        if pdf.get_y() > pdf.h - 16:
+            pdf.add_page()
+            header_row()
+        for value in row:
+            pdf.cell(width, 5, _latin1(value)[:60], border=1)
+        pdf.ln()
+    data = pdf.output(dest="S").encode("latin-1")
+    for start in range(0, len(data), _FILE_CHUNK):
+        yield data[start : start + _FILE_CHUNK]
+
+
+def export_response(fmt: str, header: Sequence[str], statement, filename: str, title: str) -> StreamingResponse:
+    """Build a StreamingResponse that runs `statement` lazily in the chosen format."""
+    if fmt not in EXPORT_FORMATS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Format must be one of {', '.join(EXPORT_FORMATS)}")
+    rows = stream_rows(statement)
+    if fmt == "csv":
+        body = csv_chunks(header, rows)
+    elif fmt == "xlsx":
+        body = xlsx_chunks(header, rows, title)
+    else:
+        body = pdf_chunks(header, rows, title)
+    return StreamingResponse(
+        body,
+        media_type=_MEDIA_TYPES[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{filename}.{fmt}"'},
+    )
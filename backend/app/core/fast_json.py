@@ -0,0 +1,92 @@
+"""
+Fast JSON path for large list responses.
+
+FastAPI's default path for a `List[Model]` built from ORM objects hydrates
+every row into the identity map, validates each object against the response
+model with `from_attributes`, walks the result with `jsonable_encoder` and
+then calls `json.dumps`. At 10k rows that costs far more than the query.
+
+Routes opt in to this path instead:
+
+- a `RowShape` selects only the response's columns and builds the (nested)
+  response dicts straight from the row tuples, with no ORM objects
+- the dicts go to orjson in one call; the column types already match the
+  schema, so rows are not validated one by one
+- the response model's `TypeAdapter` is built once and cached. It checks the
+  first row of every response, which catches a shape that drifted from its
+  schema. With `FAST_JSON_VALIDATE=true` it checks every row.
+
+`orjson` is optional. Without it the cached adapter validates and dumps
+(pydantic-core's own JSON writer), which is still several times faster than
+the default path. See `benchmarks/json_lists.py`.
+"""
+
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from fastapi import Response
+from pydantic import TypeAdapter
+from sqlmodel import select
+
+from app.core.config import FAST_JSON_VALIDATE
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+@lru_cache(maxsize=None)
+def type_adapter(model) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def _flatten(spec: Dict[str, Any]) -> Iterator:
+    for value in spec.values():
+        if isinstance(value, dict):
+            yield from _flatten(value)
+        else:
+            yield value
+
+
+def _fill(spec: Dict[str, Any], values: Iterator) -> dict:
+    # Same walk order as _flatten, so values line up with the selected columns
+    return {key: _fill(value, values) if isinstance(value, dict) else next(values) for key, value in spec.items()}
+
+
+class RowShape:
+    """
+    Response dicts from a flat column select. `spec` maps output keys to
+    columns, or to nested specs for nested models:
+
+        RowShape({"id": Club.id, "name": Club.name, "admin": {"id": User.id, "email": User.email}})
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self.spec = spec
+        self.columns = list(_flatten(spec))
+
+    def select(self):
+        return select(*self.columns)
+
+    def dicts(self, rows: Iterable[tuple]) -> List[dict]:
+        return [_fill(self.spec, iter(row)) for row in rows]
+
+
+def dumps(rows: List[dict], response_model) -> bytes:
+    """JSON bytes of `RowShape` dicts for a `List[Model]` response model."""
+    adapter = type_adapter(response_model)
+    if orjson is None:
+        return adapter.dump_json(adapter.validate_python(rows))
+    adapter.validate_python(rows if FAST_JSON_VALIDATE else rows[:1])
+    return orjson.dumps(rows)
+
+
+def dump_models(value: Any, response_model) -> bytes:
+    """JSON bytes of ORM objects (e.g. a detail graph), validated with the cached adapter."""
+    adapter = type_adapter(response_model)
+    return adapter.dump_json(adapter.validate_python(value, from_attributes=True))
+
+
+def json_response(body: bytes, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,163 @@
+"""
+ETags and conditional GETs for the public read endpoints.
+
+Every cacheable resource has a version counter in `ResourceVersion`. A
+session hook bumps the counters of all resources a flush touches, in the same
+transaction as the write. A rolled-back write therefore changes nothing, and
+every worker sees the same versions. A route's strong ETag is built from the
+versions of the resources its body is made of. Answering `If-None-Match` costs
+one primary-key lookup, and the 304 goes out before the route runs or
+anything is serialized.
+
+Resources:
+
+- "clubs": the club list
+- "club:<id>": one club's page (the club, its members and events)
+- "events": the event list
+- "gallery": the common gallery
+- "users": public user fields (email, name, role) nested in the above
+- "faces": enrolled face embeddings. No HTTP route uses this key; each
+  worker's face index syncs when it changes (see app/face/matcher.py)
+
+Writes that bypass the session (Core UPDATEs) call `bump()` themselves.
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Annotated, Dict, Iterable, List, Optional
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, select
+
+from app.core.config import HTTP_CACHE_MAX_AGE_SECONDS, HTTP_CACHE_STATIC_MAX_AGE_SECONDS
+from app.db.database import engine, get_session
+from app.db.models import Club, Event, GalleryPhoto, Membership, ResourceVersion, User
+
+# Keys bumped by the session's current transaction (read by the response cache on commit)
+BUMPED_KEYS = "http_cache_bumped_keys"
+
+FACES_KEY = "faces"
+
+# Changes to other user columns (face data, phone number) don't show on public pages
+_USER_PUBLIC_FIELDS = ("email", "full_name", "role")
+_USER_FACE_FIELDS = ("face_embedding", "face_encoding")
+
+
+def club_key(club_id: int) -> str:
+    return f"club:{club_id}"
+
+
+def _history_values(instance, attribute: str) -> set:
+    """Current and pre-flush values of `attribute` (e.g. both clubs of a moved event)."""
+    return {value for value in inspect(instance).attrs[attribute].history.sum() if value is not None}
+
+
+def _keys_for(instance, change: str) -> Iterable[str]:
+    if isinstance(instance, Club):
+        yield "clubs"
+        yield club_key(instance.id)
+    elif isinstance(instance, Event):
+        yield "events"
+        yield from map(club_key, _history_values(instance, "club_id"))
+    elif isinstance(instance, Membership):
+        yield club_key(instance.club_id)
+    elif isinstance(instance, GalleryPhoto):
+        yield "gallery"
+    elif isinstance(instance, User) and change != "new":
+        # A new user isn't on any page (or enrolled) until a later write links it
+        state = inspect(instance)
+        if change == "deleted" or any(state.attrs[f].history.has_changes() for f in _USER_PUBLIC_FIELDS):
+            yield "users"
+        if any(state.attrs[f].history.has_changes() for f in _USER_FACE_FIELDS) or (
+            change == "deleted" and (instance.face_embedding is not None or instance.face_encoding is not None)
+        ):
+            yield FACES_KEY
+
+
+def _upsert():
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    statement = dialect.insert(ResourceVersion)
+    return statement.on_conflict_do_update(
+        index_elements=["key"], set_={"version": ResourceVersion.version + 1}
+    )
+
+
+def bump(executor, keys: Iterable[str]) -> None:
+    """Bump the version of each resource in `keys` (one executemany upsert)."""
+    # Sorted so concurrent writers take the row locks in the same order
+    keys = sorted(set(keys))
+    if keys:
+        executor.execute(_upsert(), [{"key": key, "version": 1} for key in keys])
+        if isinstance(executor, OrmSession):
+            executor.info.setdefault(BUMPED_KEYS, set()).update(keys)
+
+
+@event.listens_for(OrmSession, "after_flush")
+def _bump_touched(session, flush_context) -> None:
+    keys = set()
+    for instance in session.new:
+        keys.update(_keys_for(instance, "new"))
+    for instance in session.dirty:
+        if session.is_modified(instance):
+            keys.update(_keys_for(instance, "dirty"))
+    for instance in session.deleted:
+        keys.update(_keys_for(instance, "deleted"))
+    if keys:
+        # Flush ke andar session.execute autoflush karega - seedha connection use karein
+        bump(session.connection(), keys)
+        session.info.setdefault(BUMPED_KEYS, set()).update(keys)
+
+
+def etag(db: Session, keys: List[str]) -> str:
+    versions = dict(db.exec(select(ResourceVersion.key, ResourceVersion.version).where(ResourceVersion.key.in_(keys))).all())
+    return '"' + "-".join(str(versions.get(key, 0)) for key in keys) + '"'
+
+
+def _matches(if_none_match: Optional[str], tag: str) -> bool:
+    if not if_none_match:
+        return False
+    # If-None-Match uses the weak comparison: W/"x" matches "x"
+    candidates = {candidate.strip().removeprefix("W/") for candidate in if_none_match.split(",")}
+    return "*" in candidates or tag in candidates
+
+
+@dataclass
+class Validator:
+    """What a cacheable route's dependency worked out: its resource keys, ETag and cache headers."""
+    keys: List[str]
+    etag: str
+    headers: Dict[str, str]
+
+
+def _answer(request: Request, response: Response, keys: List[str], tag: str, max_age: int) -> Validator:
+    headers = {"ETag": tag, "Cache-Control": f"public, max-age={max_age}, must-revalidate"}
+    if _matches(request.headers.get("if-none-match"), tag):
+        raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    response.headers.update(headers)
+    return Validator(keys=keys, etag=tag, headers=headers)
+
+
+def conditional_get(*key_templates: str, max_age: int = HTTP_CACHE_MAX_AGE_SECONDS):
+    """
+    Route dependency: sets ETag / Cache-Control, or ends the request with a 304.
+    Key templates are filled from the path parameters, e.g. "club:{club_id}".
+    Returns the `Validator`, which `response_cache.serve()` uses as its cache check.
+    """
+    def dependency(request: Request, response: Response, db: Annotated[Session, Depends(get_session)]) -> Validator:
+        keys = [template.format(**request.path_params) for template in key_templates]
+        return _answer(request, response, keys, etag(db, keys), max_age)
+    return dependency
+
+
+def conditional_static(body, max_age: int = HTTP_CACHE_STATIC_MAX_AGE_SECONDS):
+    """Same for a body that only changes with a deploy: the ETag is a hash of its JSON."""
+    digest = hashlib.sha256(json.dumps(body, sort_keys=True, default=str).encode()).hexdigest()[:20]
+    tag = f'"{digest}"'
+
+    def dependency(request: Request, response: Response) -> Validator:
+        return _answer(request, response, [], tag, max_age)
+    return dependency
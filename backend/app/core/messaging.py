@@ -0,0 +1,123 @@
+"""
+Shared WhatsApp messaging gateway.
+
+One `httpx.AsyncClient` per process talks to the provider's REST API
+(Twilio's Messages endpoint by default), so sends reuse keep-alive
+connections and never hold a worker thread for the provider round trip.
+Concurrency is capped by a semaphore (`MESSAGING_MAX_CONCURRENCY`) on top of
+the connection pool limit, and every request has connect/read timeouts.
+
+`MESSAGING_API_BASE_URL` can point at `benchmarks/fake_provider.py` for
+local testing and latency benchmarks.
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Iterable, List, Optional
+
+import httpx
+
+from app.core.config import (
+    TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN, TWILIO_WHATSAPP_NUMBER,
+    MESSAGING_API_BASE_URL, MESSAGING_TIMEOUT_SECONDS, MESSAGING_MAX_CONNECTIONS, MESSAGING_MAX_CONCURRENCY,
+)
+from app.core.secure_error_handler import SecureErrorHandler, SecureValidator
+
+
+class MessagingError(Exception):
+    """A send failed. `permanent` errors (4xx, e.g. an invalid number) will not succeed on retry."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, permanent: bool = False):
+        super().__init__(message)
+        self.status_code = status_code
+        self.permanent = permanent
+
+
+@dataclass
+class SendResult:
+    to: str
+    sid: Optional[str] = None
+    error: Optional[MessagingError] = None
+
+
+class MessagingGateway:
+    def __init__(
+        self,
+        account_sid: Optional[str] = TWILIO_ACCOUNT_SID,
+        auth_token: Optional[str] = TWILIO_AUTH_TOKEN,
+        from_number: Optional[str] = TWILIO_WHATSAPP_NUMBER,
+        base_url: str = MESSAGING_API_BASE_URL,
+        timeout_seconds: float = MESSAGING_TIMEOUT_SECONDS,
+        max_connections: int = MESSAGING_MAX_CONNECTIONS,
+        max_concurrency: int = MESSAGING_MAX_CONCURRENCY,
+    ):
+        self.account_sid = account_sid
+        self.auth_token = auth_token
+        self.from_number = from_number
+        self.base_url = base_url
+        self.timeout_seconds = timeout_seconds
+        self.max_connections = max_connections
+        self.max_concurrency = max_concurrency
+        self._client: Optional[httpx.AsyncClient] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+
+    @property
+    def configured(self) -> bool:
+        return bool(self.account_sid and self.auth_token and self.from_number)
+
+    def _get_client(self) -> httpx.AsyncClient:
+        # Created on first use so it binds to the running event loop
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                base_url=self.base_url,
+                auth=(self.account_sid, self.auth_token),
+                timeout=httpx.Timeout(self.timeout_seconds, connect=min(self.timeout_seconds, 5.0)),
+                limits=httpx.Limits(max_connections=self.max_connections, max_keepalive_connections=self.max_connections),
+                transport=httpx.AsyncHTTPTransport(retries=1),  # Retries failed connects only
+            )
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        return self._client
+
+    async def send_whatsapp(self, to: str, body: str) -> str:
+        """Send one WhatsApp message to an E.164 number; returns the provider message id."""
+        if not self.configured:
+            raise MessagingError("Messaging provider is not configured")
+        client = self._get_client()
+        async with self._semaphore:
+            try:
+                response = await client.post(
+                    f"/2010-04-01/Accounts/{self.account_sid}/Messages.json",
+                    data={"From": self.from_number, "To": f"whatsapp:{to}", "Body": body},
+                )
+            except httpx.HTTPError as e:
+                raise MessagingError(f"Provider request failed: {type(e).__name__}") from e
+        if response.status_code >= 400:
+            try:
+                detail = response.json().get("message", response.reason_phrase)
+            except ValueError:
+                detail = response.reason_phrase
+            raise MessagingError(detail, status_code=response.status_code, permanent=response.status_code < 500)
+        return response.json().get("sid", "")
+
+    async def send_many(self, numbers: Iterable[str], body: str) -> List[SendResult]:
+        """Fan one message out to many numbers (bounded by the gateway's concurrency)."""
+
+        async def send(to: str) -> SendResult:
+            try:
+                return SendResult(to, sid=await self.send_whatsapp(to, body))
+            except MessagingError as e:
+                SecureErrorHandler.log_error(e, f"WhatsApp send to {SecureValidator.sanitize_phone_number(to)}")
+                return SendResult(to, error=e)
+
+        return list(await asyncio.gather(*(send(to) for to in numbers)))
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+            self._semaphore = None
+
+
+messaging_gateway = MessagingGateway()
+if not messaging_gateway.configured:
+    SecureErrorHandler.log_error(Exception("Missing credentials"), "Twilio configuration")
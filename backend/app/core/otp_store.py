@@ -0,0 +1,215 @@
+"""
+OTP store with expiry, attempt counting and resend cooldown.
+
+Each phone number has at most one live code. `issue()` refuses to replace a
+code younger than `OTP_RESEND_COOLDOWN_SECONDS`, `verify()` counts every
+guess against the code and locks it after `OTP_MAX_ATTEMPTS`, and expired
+codes are swept periodically. Codes are stored as HMACs keyed with the JWT
+secret, never in plain text.
+
+`MemoryOTPStore` keeps everything in a dict and only works with a single
+worker. `DatabaseOTPStore` keeps one `OTPCode` row per number in the app
+database, so every worker sees the same codes; cooldown and attempt checks
+are single conditional statements, so concurrent requests cannot race them.
+"""
+
+import asyncio
+import hashlib
+from abc import ABC, abstractmethod
+import hmac
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from enum import Enum
+from threading import Lock
+from typing import Dict, Optional
+
+from sqlalchemy import delete, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, select
+
+from app.core.config import (
+    JWT_SECRET_KEY, OTP_STORE_BACKEND, OTP_TTL_SECONDS, OTP_MAX_ATTEMPTS,
+    OTP_RESEND_COOLDOWN_SECONDS, OTP_SWEEP_INTERVAL_SECONDS,
+)
+from app.core.secure_error_handler import SecureErrorHandler
+from app.db.database import engine
+from app.db.models import OTPCode
+
+
+class OTPResult(str, Enum):
+    valid = "valid"
+    invalid = "invalid"
+    expired = "expired"  # Also returned when no code was issued
+    locked = "locked"  # Too many wrong attempts for this code
+
+
+def hash_otp(code: str) -> str:
+    return hmac.new(JWT_SECRET_KEY.encode(), str(code).encode(), hashlib.sha256).hexdigest()
+
+
+class OTPStore(ABC):
+    def __init__(
+        self,
+        ttl_seconds: int = OTP_TTL_SECONDS,
+        max_attempts: int = OTP_MAX_ATTEMPTS,
+        cooldown_seconds: int = OTP_RESEND_COOLDOWN_SECONDS,
+        sweep_interval_seconds: int = OTP_SWEEP_INTERVAL_SECONDS,
+    ):
+        self.ttl = timedelta(seconds=ttl_seconds)
+        self.max_attempts = max_attempts
+        self.cooldown = timedelta(seconds=cooldown_seconds)
+        self.sweep_interval_seconds = sweep_interval_seconds
+        self._task: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    def issue(self, phone: str, code: str) -> int:
+        """Store a new code; returns 0, or the seconds left on the resend cooldown (nothing stored)."""
+
+    @abstractmethod
+    def verify(self, phone: str, code: str) -> OTPResult:
+        """Check a code, counting the attempt; a valid code is consumed."""
+
+    @abstractmethod
+    def discard(self, phone: str) -> None:
+        """Drop the code, e.g. when it could not be delivered."""
+
+    @abstractmethod
+    def sweep(self) -> int:
+        """Delete expired codes; returns how many were removed."""
+
+    def _retry_after(self, sent_at: datetime, now: datetime) -> int:
+        return max(1, int((sent_at + self.cooldown - now).total_seconds() + 0.999))
+
+    async def _sweep_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.sweep_interval_seconds)
+            try:
+                await asyncio.to_thread(self.sweep)
+            except Exception as e:
+                SecureErrorHandler.log_error(e, "OTP store sweep")
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._sweep_periodically())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+@dataclass
+class _Entry:
+    code_hash: str
+    expires_at: datetime
+    sent_at: datetime
+    attempts: int = 0
+
+
+class MemoryOTPStore(OTPStore):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = Lock()
+
+    def issue(self, phone: str, code: str) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(phone)
+            if entry and entry.sent_at + self.cooldown > now:
+                return self._retry_after(entry.sent_at, now)
+            self._entries[phone] = _Entry(hash_otp(code), now + self.ttl, now)
+        return 0
+
+    def verify(self, phone: str, code: str) -> OTPResult:
+        now = datetime.utcnow()
+        with self._lock:
+            entry = self._entries.get(phone)
+            if entry is None or entry.expires_at <= now:
+                return OTPResult.expired
+            if entry.attempts >= self.max_attempts:
+                return OTPResult.locked
+            entry.attempts += 1
+            if not hmac.compare_digest(entry.code_hash, hash_otp(code)):
+                return OTPResult.invalid
+            del self._entries[phone]
+        return OTPResult.valid
+
+    def discard(self, phone: str) -> None:
+        with self._lock:
+            self._entries.pop(phone, None)
+
+    def sweep(self) -> int:
+        now = datetime.utcnow()
+        with self._lock:
+            expired = [phone for phone, entry in self._entries.items() if entry.expires_at <= now]
+            for phone in expired:
+                del self._entries[phone]
+        return len(expired)
+
+
+class DatabaseOTPStore(OTPStore):
+    def _upsert(self):
+        dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+        return dialect.insert(OTPCode)
+
+    def issue(self, phone: str, code: str) -> int:
+        now = datetime.utcnow()
+        values = {"phone": phone, "code_hash": hash_otp(code), "expires_at": now + self.ttl, "sent_at": now, "attempts": 0}
+        insert = self._upsert().values(**values)
+        # Replace the existing row only once its cooldown has passed
+        statement = insert.on_conflict_do_update(
+            index_elements=[OTPCode.phone],
+            set_={k: insert.excluded[k] for k in ("code_hash", "expires_at", "sent_at", "attempts")},
+            where=OTPCode.sent_at <= now - self.cooldown,
+        )
+        with Session(engine) as db:
+            stored = db.execute(statement).rowcount
+            db.commit()
+            if stored:
+                return 0
+            sent_at = db.exec(select(OTPCode.sent_at).where(OTPCode.phone == phone)).first()
+        return self._retry_after(sent_at, now) if sent_at else 0
+
+    def verify(self, phone: str, code: str) -> OTPResult:
+        now = datetime.utcnow()
+        with Session(engine) as db:
+            counted = db.execute(
+                update(OTPCode)
+                .where(OTPCode.phone == phone, OTPCode.expires_at > now, OTPCode.attempts < self.max_attempts)
+                .values(attempts=OTPCode.attempts + 1)
+            ).rowcount
+            db.commit()
+            row = db.exec(select(OTPCode.code_hash, OTPCode.expires_at).where(OTPCode.phone == phone)).first()
+            if row is None or row.expires_at <= now:
+                return OTPResult.expired
+            if not counted:
+                return OTPResult.locked
+            if not hmac.compare_digest(row.code_hash, hash_otp(code)):
+                return OTPResult.invalid
+            db.execute(delete(OTPCode).where(OTPCode.phone == phone, OTPCode.code_hash == row.code_hash))
+            db.commit()
+        return OTPResult.valid
+
+    def discard(self, phone: str) -> None:
+        with Session(engine) as db:
+            db.execute(delete(OTPCode).where(OTPCode.phone == phone))
+            db.commit()
+
+    def sweep(self) -> int:
+        with Session(engine) as db:
+            removed = db.execute(delete(OTPCode).where(OTPCode.expires_at <= datetime.utcnow())).rowcount
+            db.commit()
+        return removed
+
+
+OTP_STORE_BACKENDS = {"memory": MemoryOTPStore, "database": DatabaseOTPStore}
+
+
+def create_otp_store(backend: str = OTP_STORE_BACKEND) -> OTPStore:
+    if backend not in OTP_STORE_BACKENDS:
+        raise ValueError(f"Unknown OTP store backend {backend!r}; expected one of {', '.join(OTP_STORE_BACKENDS)}")
+    return OTP_STORE_BACKENDS[backend]()
+
+
+otp_store = create_otp_store()
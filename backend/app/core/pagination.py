@@ -0,0 +1,57 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor is the sort key of the last row on the previous page, e.g.
+`(created_at, id)`, JSON-encoded and base64url'd so clients treat it as
+opaque. The next page is `WHERE (created_at, id) < (:created_at, :id)`,
+which an index on the sort columns answers without scanning skipped rows
+the way OFFSET does.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from sqlalchemy import and_, or_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+
+def encode_cursor(*values: Any) -> str:
+    raw = json.dumps([v.isoformat() if isinstance(v, datetime) else v for v in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *types: Callable[[Any], Any]) -> Tuple:
+    """Decode a cursor into `len(types)` values; `datetime` entries are parsed from ISO format."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+        if not isinstance(values, list) or len(values) != len(types):
+            raise ValueError("Wrong cursor length")
+        return tuple(datetime.fromisoformat(v) if t is datetime else t(v) for t, v in zip(types, values))
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid pagination cursor")
+
+
+def keyset_after(columns: Sequence, values: Sequence, descending: bool = False):
+    """Row-value comparison `(c1, c2, ...) > (v1, v2, ...)` (or `<`), spelled out so every backend can use the index."""
+    clauses = []
+    for i, (column, value) in enumerate(zip(columns, values)):
+        beyond = column < value if descending else column > value
+        clauses.append(and_(*[c == v for c, v in zip(columns[:i], values[:i])], beyond))
+    # Redundant bound on the leading column keeps the planner on an index range scan
+    leading = columns[0] <= values[0] if descending else columns[0] >= values[0]
+    return and_(leading, or_(*clauses))
+
+
+def set_next_cursor(response: Response, rows: list, limit: int, key: Callable[[Any], tuple]) -> list:
+    """
+    Trim a `limit + 1` result to `limit` rows and advertise the next cursor in
+    the `X-Next-Cursor` header when there is another page.
+    """
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(*key(rows[-1]))
+    return rows
@@ -0,0 +1,118 @@
+"""
+In-process pub/sub hub for real-time forum and announcement updates.
+
+Routes publish small JSON deltas to named channels ("post:12", "club:3",
+"category:question") after their transaction commits; SSE subscribers get
+them through a bounded `asyncio.Queue` each. Publishing is safe from the
+threadpool that runs sync endpoints: the fan-out is handed to the event loop
+with `call_soon_threadsafe`, and each message is serialized once no matter
+how many subscribers receive it.
+
+A subscriber whose queue is full is dropped instead of buffering without
+limit; its stream ends with a `reset` event so the client can refetch and
+reconnect. Subscriptions are per process, so with several workers a client
+only sees events published by the worker it is connected to.
+"""
+
+import asyncio
+import itertools
+import json
+from threading import Lock
+from typing import Dict, Iterable, Optional, Set
+
+from app.core.config import SSE_QUEUE_SIZE
+
+
+def post_channel(post_id: int) -> str:
+    return f"post:{post_id}"
+
+
+def club_channel(club_id: int) -> str:
+    return f"club:{club_id}"
+
+
+def category_channel(category: str) -> str:
+    return f"category:{category}"
+
+
+def format_sse(event: str, data: dict, event_id: Optional[int] = None) -> str:
+    payload = json.dumps(data, separators=(",", ":"), default=str)
+    prefix = f"id: {event_id}\n" if event_id is not None else ""
+    return f"{prefix}event: {event}\ndata: {payload}\n\n"
+
+
+class Subscription:
+    def __init__(self, channels: Set[str], maxsize: int):
+        self.channels = channels
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.dropped = False
+
+    async def get(self) -> Optional[str]:
+        """Next formatted message, or None once the subscriber has been dropped."""
+        message = await self.queue.get()
+        return None if self.dropped else message
+
+
+class PubSubHub:
+    def __init__(self, queue_size: int = SSE_QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._lock = Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._ids = itertools.count(1)
+        self.dropped = 0
+
+    def subscribe(self, channels: Iterable[str]) -> Subscription:
+        """Register a subscriber (must be called on the event loop)."""
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(set(channels), self.queue_size)
+        with self._lock:
+            for channel in subscription.channels:
+                self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            for channel in subscription.channels:
+                subscribers = self._subscribers.get(channel)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscribers[channel]
+
+    def publish(self, channels: Iterable[str], event: str, data: dict) -> None:
+        """Send `data` to everyone subscribed to any of `channels`; callable from any thread."""
+        with self._lock:
+            targets = set().union(*(self._subscribers.get(channel, ()) for channel in channels))
+        if not targets or self._loop is None:
+            return
+        message = format_sse(event, data, next(self._ids))
+        try:
+            self._loop.call_soon_threadsafe(self._deliver, targets, message)
+        except RuntimeError:
+            pass  # Loop already closed (shutdown)
+
+    def _deliver(self, targets: Set[Subscription], message: str) -> None:
+        for subscription in targets:
+            if subscription.dropped:
+                continue
+            try:
+                subscription.queue.put_nowait(message)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        # Slow client: forget its backlog and wake its stream so it can end
+        subscription.dropped = True
+        self.dropped += 1
+        self.unsubscribe(subscription)
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(None)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(set().union(*self._subscribers.values())) if self._subscribers else 0
+
+
+hub = PubSubHub()
@@ -0,0 +1,142 @@
+"""
+Read-through cache of serialized JSON for the club and event catalogs.
+
+Entries are the finished response bytes, keyed by path plus query string and
+stored with the ETag they were built for (see app/core/http_cache.py). An
+entry is served only while the route's current ETag still matches. A write
+on any worker bumps the version counters and so retires every entry built on
+them, without any cross-process messaging. On top of that, entries are
+tagged with their resource keys and dropped as soon as this process commits
+a write to one of them, so stale bytes don't sit in memory.
+
+The cache is an LRU capped at `RESPONSE_CACHE_MAX_BYTES` of bodies, and
+`RESPONSE_CACHE_ENABLED=false` turns it off. Routes keep their ETag / 304
+behaviour either way.
+"""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from typing import Callable, Dict, Iterable, Optional, Set
+
+from fastapi import Request, Response
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+
+from app.core.config import RESPONSE_CACHE_ENABLED, RESPONSE_CACHE_MAX_BYTES
+from app.core.fast_json import json_response
+from app.core.http_cache import BUMPED_KEYS, Validator
+
+
+@dataclass
+class _Entry:
+    etag: str
+    body: bytes
+    tags: Iterable[str]
+
+
+def cache_key(request: Request) -> str:
+    query = request.url.query
+    return f"{request.url.path}?{query}" if query else request.url.path
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES, enabled: bool = RESPONSE_CACHE_ENABLED):
+        self.max_bytes = max_bytes
+        self.enabled = enabled
+        self._entries: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._by_tag: Dict[str, Set[str]] = {}
+        self._bytes = 0
+        self._lock = Lock()
+        self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def _drop(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self._bytes -= len(entry.body)
+        for tag in entry.tags:
+            keys = self._by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._by_tag[tag]
+
+    def get(self, key: str, etag: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.etag != etag:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry.body
+
+    def put(self, key: str, etag: str, tags: Iterable[str], body: bytes) -> None:
+        if len(body) > self.max_bytes:
+            return
+        with self._lock:
+            self._drop(key)
+            self._entries[key] = _Entry(etag=etag, body=body, tags=tuple(tags))
+            self._bytes += len(body)
+            for tag in tags:
+                self._by_tag.setdefault(tag, set()).add(key)
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def invalidate(self, tags: Iterable[str]) -> None:
+        with self._lock:
+            for tag in tags:
+                for key in list(self._by_tag.get(tag, ())):
+                    self._drop(key)
+                    self.invalidations += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._by_tag.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else None,
+                "evictions": self.evictions,
+                "invalidations": self.invalidations,
+            }
+
+    def serve(self, request: Request, validator: Validator, build: Callable[[], bytes]) -> Response:
+        """
+        The cached body for this request if it was built for the current ETag;
+        otherwise `build()` the JSON bytes (see app/core/fast_json.py) and cache them.
+        """
+        key = cache_key(request)
+        body = self.get(key, validator.etag) if self.enabled else None
+        if body is None:
+            body = build()
+            if self.enabled:
+                self.put(key, validator.etag, validator.keys, body)
+        return json_response(body, validator.headers)
+
+
+response_cache = ResponseCache()
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _invalidate_committed(session) -> None:
+    keys = session.info.pop(BUMPED_KEYS, None)
+    if keys:
+        response_cache.invalidate(keys)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _forget_rolled_back(session) -> None:
+    session.info.pop(BUMPED_KEYS, None)
@@ -0,0 +1,237 @@
+"""
+In-memory rollup of the numbers behind the dashboard endpoints.
+
+`dashboard_rollup` holds the totals, member counts per club and registration
+counts per event, and answers both stats endpoints without touching the
+database. It is loaded by a full `reconcile()` at startup and then kept
+current by SQLAlchemy session hooks: every committed insert, update or delete
+of a User, Club, Event, Membership or EventRegistration is applied as a
+delta. Rolled-back sessions contribute nothing.
+
+Deltas only cover ORM writes made by this process. Link rows removed by a
+cascade (deleting a user or club) are not visible to the hooks, so such a
+delete makes the next read reconcile. Other workers' writes and bulk Core
+statements are picked up by the periodic reconcile every
+`ANALYTICS_RECONCILE_SECONDS`. Responses report when the rollup was last
+reconciled so callers can judge staleness.
+"""
+
+import asyncio
+import heapq
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import event
+from sqlalchemy.orm import Session as OrmSession
+from sqlmodel import Session, func, select
+
+from app.core.config import ANALYTICS_RECONCILE_SECONDS
+from app.core.secure_error_handler import SecureErrorHandler
+from app.db.database import engine
+from app.db.models import Club, Event, EventRegistration, Membership, User
+
+_TRACKED = (User, Club, Event, Membership, EventRegistration)
+_DELTAS_KEY = "dashboard_rollup_deltas"
+
+# (kind, change, payload): change is "add", "update" or "delete"
+Delta = Tuple[str, str, tuple]
+
+
+def _delta(instance, change: str) -> Optional[Delta]:
+    if isinstance(instance, User):
+        return ("user", change, (instance.id,))
+    if isinstance(instance, Club):
+        return ("club", change, (instance.id, instance.name))
+    if isinstance(instance, Event):
+        return ("event", change, (instance.id, instance.name, instance.date))
+    if isinstance(instance, Membership):
+        return ("membership", change, (instance.club_id,))
+    if isinstance(instance, EventRegistration):
+        return ("registration", change, (instance.event_id,))
+    return None
+
+
+class DashboardRollup:
+    def __init__(self, reconcile_interval_seconds: int = ANALYTICS_RECONCILE_SECONDS):
+        self.reconcile_interval_seconds = reconcile_interval_seconds
+        self._lock = Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._loaded = False
+        self._needs_reconcile = False
+        self.reconciled_at: Optional[datetime] = None
+        self.updated_at: Optional[datetime] = None
+        self._reset()
+
+    def _reset(self) -> None:
+        self.users = 0
+        self.club_names: Dict[int, str] = {}
+        self.club_members: Dict[int, int] = {}
+        self.events: Dict[int, Tuple[str, datetime]] = {}
+        self.event_dates = SortedList()  # (date, event_id)
+        self.event_registrations: Dict[int, int] = {}
+
+    def reconcile(self) -> None:
+        """Recompute everything from the database and swap it in."""
+        with Session(engine) as db:
+            users = db.exec(select(func.count(User.id))).one()
+            clubs = db.exec(select(Club.id, Club.name)).all()
+            members = db.exec(select(Membership.club_id, func.count()).group_by(Membership.club_id)).all()
+            events = db.exec(select(Event.id, Event.name, Event.date)).all()
+            registrations = db.exec(
+                select(EventRegistration.event_id, func.count()).group_by(EventRegistration.event_id)
+            ).all()
+        with self._lock:
+            self._reset()
+            self.users = users
+            self.club_names = dict(clubs)
+            self.club_members = {club_id: 0 for club_id in self.club_names}
+            self.club_members.update(members)
+            for event_id, name, date in events:
+                self.events[event_id] = (name, date)
+                self.event_dates.add((date, event_id))
+            self.event_registrations = dict(registrations)
+            self.reconciled_at = self.updated_at = datetime.utcnow()
+            self._loaded = True
+            self._needs_reconcile = False
+
+    def apply(self, deltas: List[Delta]) -> None:
+        """Apply the changes of one committed transaction."""
+        if not self._loaded:
+            return  # The first reconcile will see them
+        with self._lock:
+            for kind, change, payload in deltas:
+                sign = {"add": 1, "delete": -1}.get(change, 0)
+                if kind == "user":
+                    self.users += sign
+                    if change == "delete":
+                        self._needs_reconcile = True  # Its memberships / registrations went with it
+                elif kind == "club":
+                    club_id, name = payload
+                    if change == "delete":
+                        self.club_names.pop(club_id, None)
+                        self.club_members.pop(club_id, None)
+                        self._needs_reconcile = True
+                    else:
+                        self.club_names[club_id] = name
+                        self.club_members.setdefault(club_id, 0)
+                elif kind == "event":
+                    event_id, name, date = payload
+                    previous = self.events.pop(event_id, None)
+                    if previous is not None:
+                        self.event_dates.discard((previous[1], event_id))
+                    if change == "delete":
+                        self.event_registrations.pop(event_id, None)
+                    else:
+                        self.events[event_id] = (name, date)
+                        self.event_dates.add((date, event_id))
+                elif kind == "membership":
+                    (club_id,) = payload
+                    self.club_members[club_id] = self.club_members.get(club_id, 0) + sign
+                elif kind == "registration":
+                    (event_id,) = payload
+                    self.event_registrations[event_id] = self.event_registrations.get(event_id, 0) + sign
+            self.updated_at = datetime.utcnow()
+
+    def _ensure_current(self) -> None:
+        if not self._loaded or self._needs_reconcile:
+            self.reconcile()
+
+    def freshness(self) -> dict:
+        now = datetime.utcnow()
+        return {
+            "reconciled_at": self.reconciled_at,
+            "updated_at": self.updated_at,
+            "age_seconds": round((now - self.reconciled_at).total_seconds(), 3),
+        }
+
+    def totals(self) -> dict:
+        self._ensure_current()
+        with self._lock:
+            return {
+                "users": self.users,
+                "clubs": len(self.club_names),
+                "events": len(self.events),
+                **self.freshness(),
+            }
+
+    def dashboard(self, top: int = 5) -> dict:
+        """Same shape as the old aggregate queries, plus `freshness`."""
+        self._ensure_current()
+        now = datetime.now()
+        with self._lock:
+            first_upcoming = self.event_dates.bisect_left((now, -1))
+            popular = heapq.nlargest(
+                top, ((c, n) for c, n in self.club_members.items() if c in self.club_names), key=lambda item: item[1]
+            )
+            upcoming = self.event_dates[first_upcoming:first_upcoming + top]
+            return {
+                "totals": {
+                    "users": self.users,
+                    "clubs": len(self.club_names),
+                    "events": len(self.events),
+                    "active_events": len(self.event_dates) - first_upcoming,
+                },
+                "popular_clubs": [
+                    {"name": self.club_names[club_id], "members": count} for club_id, count in popular
+                ],
+                "upcoming_events": [
+                    {
+                        "name": self.events[event_id][0],
+                        "date": date.isoformat(),
+                        "registrations": self.event_registrations.get(event_id, 0),
+                    }
+                    for date, event_id in upcoming
+                ],
+                "freshness": self.freshness(),
+            }
+
+    async def _reconcile_periodically(self) -> None:
+        while True:
+            await asyncio.sleep(self.reconcile_interval_seconds)
+            try:
+                await asyncio.to_thread(self.reconcile)
+            except Exception as e:
+                SecureErrorHandler.log_error(e, "Dashboard rollup reconcile")
+
+    def start(self) -> None:
+        if self._task is None:
+            self.reconcile()
+            self._task = asyncio.create_task(self._reconcile_periodically())
+
+    def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+
+dashboard_rollup = DashboardRollup()
+
+
+# --- Write hooks: collect deltas at flush, apply them only once the transaction commits ---
+
+@event.listens_for(OrmSession, "after_flush")
+def _collect_rollup_deltas(session, flush_context) -> None:
+    deltas = session.info.setdefault(_DELTAS_KEY, [])
+    for change, instances in (("add", session.new), ("update", session.dirty), ("delete", session.deleted)):
+        for instance in instances:
+            if not isinstance(instance, _TRACKED):
+                continue
+            if change == "update" and not isinstance(instance, (Club, Event)):
+                continue  # Only names and dates are rolled up
+            delta = _delta(instance, change)
+            if delta is not None:
+                deltas.append(delta)
+
+
+@event.listens_for(OrmSession, "after_commit")
+def _apply_rollup_deltas(session) -> None:
+    deltas = session.info.pop(_DELTAS_KEY, None)
+    if deltas:
+        dashboard_rollup.apply(deltas)
+
+
+@event.listens_for(OrmSession, "after_rollback")
+def _discard_rollup_deltas(session) -> None:
+    session.info.pop(_DELTAS_KEY, None)
@@ -0,0 +1,164 @@
+"""
+Hot / trending ranking for forum posts.
+
+    hot_score = log10(max(1, likes + FORUM_HOT_REPLY_WEIGHT * replies)) + created_at / FORUM_HOT_DECAY_SECONDS
+
+Time decay is expressed as a bonus for newer posts instead of a penalty that
+grows with age (every `FORUM_HOT_DECAY_SECONDS` of recency is worth 10x the
+engagement), so a post's score only changes when it is liked, unliked or
+replied to. It is stored in `ForumPost.hot_score`, indexed per scope, and
+recomputed in the same transaction as the counters.
+
+`TrendingIndex` keeps the top `FORUM_TRENDING_TOP_K` posts of each scope
+("all", "category:<name>", "club:<id>") in memory, rebuilt from that column at
+startup and updated on every score change, so the first trending page is a
+slice of a sorted list. Later pages (and scopes the memory cannot answer) use
+the `hot_score` indexes. If a member's score drops to the bottom of a full
+scope, the real next post may only be in the database, so that scope is
+refilled from the index on its next read.
+"""
+
+import math
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sortedcontainers import SortedList
+from sqlalchemy import update
+from sqlmodel import Session, select
+
+from app.core.config import FORUM_HOT_DECAY_SECONDS, FORUM_HOT_REPLY_WEIGHT, FORUM_TRENDING_TOP_K
+from app.db.database import engine
+from app.db.models import ForumPost
+
+_EPOCH = datetime(2024, 1, 1)
+
+
+def hot_score(likes: int, replies: int, created_at: datetime) -> float:
+    engagement = max(1, likes + FORUM_HOT_REPLY_WEIGHT * replies)
+    return round(math.log10(engagement) + (created_at - _EPOCH).total_seconds() / FORUM_HOT_DECAY_SECONDS, 7)
+
+
+def refresh_hot_score(db: Session, post_id: int) -> None:
+    """Recompute a post's score from its counters (call inside the transaction that changed them)."""
+    likes, replies, created_at = db.exec(
+        select(ForumPost.like_count, ForumPost.reply_count, ForumPost.created_at).where(ForumPost.id == post_id)
+    ).one()
+    db.execute(update(ForumPost).where(ForumPost.id == post_id).values(hot_score=hot_score(likes, replies, created_at)))
+
+
+def scopes_for(category: Optional[str], club_id: Optional[int]) -> List[str]:
+    scopes = ["all"]
+    if category:
+        scopes.append(f"category:{category}")
+    if club_id:
+        scopes.append(f"club:{club_id}")
+    return scopes
+
+
+class _TopK:
+    """Best `k` (score, post_id) pairs of one scope, highest first."""
+
+    def __init__(self, k: int, complete: bool = True):
+        self.k = k
+        self.entries = SortedList()  # (-score, -post_id): ascending order = hottest first
+        self.scores: Dict[int, float] = {}
+        self.complete = complete  # Holds every post of the scope
+        self.stale = False  # The database may hold a better post than the last entry
+
+    def add_loaded(self, post_id: int, score: float) -> None:
+        if len(self.entries) < self.k:
+            self.entries.add((-score, -post_id))
+            self.scores[post_id] = score
+        else:
+            self.complete = False
+
+    def update(self, post_id: int, score: float) -> None:
+        key = (-score, -post_id)
+        old = self.scores.pop(post_id, None)
+        if old is not None:
+            self.entries.remove((-old, -post_id))
+        elif len(self.entries) >= self.k and key > self.entries[-1]:
+            self.complete = False  # Not hot enough to make the cut
+            return
+        self.entries.add(key)
+        self.scores[post_id] = score
+        if len(self.entries) > self.k:
+            _, evicted = self.entries.pop()
+            del self.scores[-evicted]
+            self.complete = False
+        elif old is not None and score < old and not self.complete and self.entries[-1] == key:
+            self.stale = True
+
+    def page(self, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """Up to `limit + 1` hottest posts, or None when memory cannot answer for sure."""
+        if len(self.entries) <= limit and not self.complete:
+            return None
+        return [(-neg_id, -neg_score) for neg_score, neg_id in self.entries[: limit + 1]]
+
+
+class TrendingIndex:
+    def __init__(self, k: int = FORUM_TRENDING_TOP_K):
+        self.k = k
+        self._scopes: Dict[str, _TopK] = {}
+        self._lock = Lock()
+        self._loaded = False
+
+    def rebuild(self) -> None:
+        """Load every scope's top-k from the hot_score index in one ordered pass."""
+        scopes: Dict[str, _TopK] = {}
+        statement = (
+            select(ForumPost.id, ForumPost.category, ForumPost.club_id, ForumPost.hot_score)
+            .order_by(ForumPost.hot_score.desc(), ForumPost.id.desc())
+            .execution_options(yield_per=5000)
+        )
+        with Session(engine) as db:
+            for post_id, category, club_id, score in db.exec(statement):
+                for scope in scopes_for(category, club_id):
+                    scopes.setdefault(scope, _TopK(self.k)).add_loaded(post_id, score)
+        with self._lock:
+            self._scopes = scopes
+            self._loaded = True
+
+    def observe(self, post: ForumPost) -> None:
+        """Record a new post or a changed score."""
+        if not self._loaded:
+            return  # The next rebuild will pick it up
+        with self._lock:
+            for scope in scopes_for(post.category, post.club_id):
+                # A scope missing after a full rebuild had no posts, so it starts complete
+                self._scopes.setdefault(scope, _TopK(self.k)).update(post.id, post.hot_score)
+
+    def _refill(self, scope: str) -> _TopK:
+        statement = select(ForumPost.id, ForumPost.hot_score)
+        kind, _, value = scope.partition(":")
+        if kind == "category":
+            statement = statement.where(ForumPost.category == value)
+        elif kind == "club":
+            statement = statement.where(ForumPost.club_id == int(value))
+        with Session(engine) as db:
+            rows = db.exec(statement.order_by(ForumPost.hot_score.desc(), ForumPost.id.desc()).limit(self.k + 1)).all()
+        top = _TopK(self.k)
+        for post_id, score in rows:
+            top.add_loaded(post_id, score)
+        return top
+
+    def top(self, scope: str, limit: int) -> Optional[List[Tuple[int, float]]]:
+        """`(post_id, score)` for the hottest `limit + 1` posts of a scope, or None to fall back to SQL."""
+        if limit + 1 > self.k:
+            return None
+        if not self._loaded:
+            self.rebuild()
+        with self._lock:
+            current = self._scopes.get(scope)
+            if current is None:
+                return []
+            if not current.stale:
+                return current.page(limit)
+        refilled = self._refill(scope)
+        with self._lock:
+            self._scopes[scope] = refilled
+            return refilled.page(limit)
+
+
+trending = TrendingIndex()
@@ -0,0 +1,237 @@
+"""
+Bulk user import for onboarding a batch of students from a CSV or JSON file.
+
+Instead of one signup request per student (existence check, bcrypt hash and
+commit each), an import:
+
+1. validates every row and reports per-row errors (bad email, missing name,
+   duplicate in the file, unknown role)
+2. drops emails that already exist with one `IN` query per chunk
+3. hashes all passwords in a process pool (`USER_IMPORT_WORKERS`), since
+   bcrypt is deliberately slow and CPU-bound
+4. inserts `USER_IMPORT_CHUNK_ROWS` rows per executemany statement with
+   ON CONFLICT DO NOTHING, so a concurrent signup of the same email is
+   reported as a row error instead of failing the batch
+
+Everything commits in one transaction. Rows without a password get a random
+temporary password, which appears only in the returned report.
+
+Columns: email, full_name (required), password, role (student or
+club_admin; whitelisted super admin emails still become super admins) and
+whatsapp_number. Run as a CLI from the backend folder:
+
+    python -m app.core.user_import students.csv --passwords-out temp-passwords.csv
+"""
+
+import argparse
+import csv
+import io
+import json
+import re
+import secrets
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from threading import Lock
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, func, select
+
+from app.core import daily_stats
+from app.core.config import USER_IMPORT_CHUNK_ROWS, USER_IMPORT_MAX_ROWS, USER_IMPORT_WORKERS
+from app.core.rollups import dashboard_rollup
+from app.core.security import get_password_hash
+from app.core.super_admin_config import is_super_admin_email
+from app.db.database import engine
+from app.db.models import User, UserRole
+
+IMPORT_FORMATS = ("csv", "json")
+_IMPORTABLE_ROLES = {UserRole.student.value, UserRole.club_admin.value}
+_EMAIL_RE = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+# Below this many passwords the pool start-up costs more than it saves
+_POOL_MIN_PASSWORDS = 16
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def get_import_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=USER_IMPORT_WORKERS)
+        return _pool
+
+
+def shutdown_import_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def hash_passwords(passwords: List[str]) -> List[str]:
+    if USER_IMPORT_WORKERS <= 1 or len(passwords) < _POOL_MIN_PASSWORDS:
+        return [get_password_hash(p) for p in passwords]
+    chunksize = max(1, len(passwords) // (USER_IMPORT_WORKERS * 4))
+    return list(get_import_pool().map(get_password_hash, passwords, chunksize=chunksize))
+
+
+def parse_rows(data: bytes, fmt: str) -> List[dict]:
+    """Rows of a CSV (with a header line) or a JSON list of objects; raises ValueError if unreadable."""
+    if fmt not in IMPORT_FORMATS:
+        raise ValueError(f"Format must be one of {', '.join(IMPORT_FORMATS)}")
+    try:
+        text = data.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("File must be UTF-8 encoded")
+    if fmt == "csv":
+        rows = list(csv.DictReader(io.StringIO(text)))
+    else:
+        try:
+            rows = json.loads(text)
+        except json.JSONDecodeError:
+            raise ValueError("Invalid JSON")
+        if isinstance(rows, dict):
+            rows = rows.get("users")
+        if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+            raise ValueError("JSON must be a list of user objects (or {\"users\": [...]})")
+    if len(rows) > USER_IMPORT_MAX_ROWS:
+        raise ValueError(f"At most {USER_IMPORT_MAX_ROWS} users per import")
+    return rows
+
+
+def _field(row: dict, name: str) -> str:
+    value = row.get(name)
+    return str(value).strip() if value is not None else ""
+
+
+def _validate(rows: List[dict]) -> Tuple[List[Tuple[int, dict]], List[dict]]:
+    """(row number, cleaned record) for valid rows, and the errors of the rest; rows are numbered from 1."""
+    valid: List[Tuple[int, dict]] = []
+    errors: List[dict] = []
+    seen: Dict[str, int] = {}
+    for number, row in enumerate(rows, 1):
+        email, full_name = _field(row, "email"), _field(row, "full_name")
+        role = _field(row, "role") or UserRole.student.value
+        if not _EMAIL_RE.match(email):
+            error = "Invalid email"
+        elif not full_name:
+            error = "Missing full_name"
+        elif role not in _IMPORTABLE_ROLES:
+            error = f"Role must be one of {', '.join(sorted(_IMPORTABLE_ROLES))}"
+        elif email.lower() in seen:
+            error = f"Duplicate of row {seen[email.lower()]}"
+        else:
+            seen[email.lower()] = number
+            valid.append((number, {
+                "email": email,
+                "full_name": full_name,
+                "password": _field(row, "password"),
+                "role": UserRole.super_admin if is_super_admin_email(email) else UserRole(role),
+                "whatsapp_number": _field(row, "whatsapp_number") or None,
+            }))
+            continue
+        errors.append({"row": number, "email": email or None, "error": error})
+    return valid, errors
+
+
+def _insert_ignoring_existing():
+    dialect = postgresql if engine.dialect.name == "postgresql" else sqlite
+    table = User.__table__
+    return dialect.insert(table).on_conflict_do_nothing(index_elements=["email"]).returning(table.c.email)
+
+
+def import_users(db: Session, rows: List[dict]) -> dict:
+    valid, errors = _validate(rows)
+
+    # Existing emails: one IN query per chunk instead of one lookup per row. Case-insensitive,
+    # like the duplicate check in the file, so U@x.com doesn't become a second account next to u@x.com
+    emails = [record["email"].lower() for _, record in valid]
+    existing = set()
+    lowered = func.lower(User.email)
+    for start in range(0, len(emails), USER_IMPORT_CHUNK_ROWS):
+        existing.update(db.exec(select(lowered).where(lowered.in_(emails[start:start + USER_IMPORT_CHUNK_ROWS]))))
+    pending = []
+    for number, record in valid:
+        if record["email"].lower() in existing:
+            errors.append({"row": number, "email": record["email"], "error": "User with this email already exists"})
+        else:
+            pending.append((number, record))
+
+    temporary_passwords = []
+    for _, record in pending:
+        if not record["password"]:
+            record["password"] = secrets.token_urlsafe(9)
+            temporary_passwords.append({"email": record["email"], "password": record["password"]})
+    hashes = hash_passwords([record["password"] for _, record in pending])
+
+    now = datetime.utcnow()
+    values = [
+        {
+            "email": record["email"], "full_name": record["full_name"], "hashed_password": hashed,
+            "role": record["role"], "whatsapp_number": record["whatsapp_number"],
+            "whatsapp_verified": False, "whatsapp_consent": False, "created_at": now, "updated_at": now,
+        }
+        for (_, record), hashed in zip(pending, hashes)
+    ]
+    inserted = set()
+    statement = _insert_ignoring_existing()
+    for start in range(0, len(values), USER_IMPORT_CHUNK_ROWS):
+        inserted.update(db.execute(statement, values[start:start + USER_IMPORT_CHUNK_ROWS]).scalars())
+    for number, record in pending:
+        if record["email"] not in inserted:
+            errors.append({"row": number, "email": record["email"], "error": "User with this email already exists"})
+    # Core insert skips the ORM session hooks - signup counters update here, in the same transaction
+    daily_stats.record(db, {(daily_stats.SITE_WIDE, now.date(), "signups"): len(inserted)})
+    db.commit()
+    dashboard_rollup.apply([("user", "add", (None,))] * len(inserted))
+
+    errors.sort(key=lambda error: error["row"])
+    return {
+        "total_rows": len(rows),
+        "created": len(inserted),
+        "failed": len(errors),
+        "errors": errors,
+        "temporary_passwords": [p for p in temporary_passwords if p["email"] in inserted],
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import SAMVAD users from a CSV or JSON file")
+    parser.add_argument("path", help="CSV (with header) or JSON file")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, default=None, help="Default: from the file extension")
+    parser.add_argument("--passwords-out", default=None, help="Write generated temporary passwords to this CSV")
+    args = parser.parse_args()
+
+    fmt = args.format or ("json" if args.path.lower().endswith(".json") else "csv")
+    with open(args.path, "rb") as f:
+        try:
+            rows = parse_rows(f.read(), fmt)
+        except ValueError as e:
+            parser.error(str(e))
+    engine.echo = False
+    try:
+        with Session(engine) as db:
+            report = import_users(db, rows)
+    finally:
+        shutdown_import_pool()
+
+    for error in report["errors"]:
+        print(f"row {error['row']}: {error['email'] or '-'}: {error['error']}")
+    print(f"{report['created']} of {report['total_rows']} users created, {report['failed']} failed")
+    if report["temporary_passwords"]:
+        if args.passwords_out:
+            with open(args.passwords_out, "w", newline="") as f:
+                writer = csv.DictWriter(f, fieldnames=["email", "password"])
+                writer.writeheader()
+                writer.writerows(report["temporary_passwords"])
+            print(f"Temporary passwords written to {args.passwords_out}")
+        else:
+            for entry in report["temporary_passwords"]:
+                print(f"temporary password {entry['email']}: {entry['password']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,307 @@
+"""
+Bulk table exports for the data warehouse (NDJSON or Parquet).
+
+All requested tables are read on one connection inside one read-only
+snapshot transaction (REPEATABLE READ on Postgres, a single deferred
+transaction on SQLite). Cross-table references in one export always match,
+even while the app keeps writing. Rows stream through server-side cursors in
+`WAREHOUSE_BATCH_ROWS` batches, so memory stays flat whatever the table size.
+The app opens SQLite in WAL mode (app/db/database.py), where the snapshot
+does not block writers. In rollback-journal mode the read lock would make
+every write during the export fail with "database is locked".
+
+`updated_since` turns a full pull into an incremental one. Users, clubs and
+events are filtered on `updated_at`, and the append-only tables on their
+creation timestamp. Deletes are not visible to incremental pulls, so take a
+periodic full export to catch them. Pass the previous export's `snapshot_at`
+as the next `updated_since`.
+
+Those timestamps are set in Python before the row commits, so a row can
+carry a time before the snapshot and still be missing from it. Attendance
+marks are inserted up to `ATTENDANCE_FLUSH_INTERVAL_MS` after they are
+stamped, once per retry. `snapshot_at` is therefore the time the snapshot
+opened minus `WAREHOUSE_OVERLAP_SECONDS`. That is at least flush interval x
+(max retries + 1), so consecutive incremental pulls overlap and no row falls
+between them. Rows in the overlap come again in the next pull. Consumers
+dedupe on the primary key and keep the latest copy.
+
+Parquet needs the optional `pyarrow` package. Run as a CLI from the backend
+folder:
+
+    python -m app.core.warehouse --out ./export --format parquet --updated-since 2025-01-01T00:00:00
+"""
+
+import argparse
+import json
+import os
+import tempfile
+import zipfile
+from contextlib import ExitStack, contextmanager
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import Boolean, Date, DateTime, Float, Integer
+from sqlalchemy.engine import Connection
+from sqlmodel import select
+
+from app.core.config import WAREHOUSE_BATCH_ROWS, WAREHOUSE_OVERLAP_SECONDS
+from app.db.database import engine
+from app.db.models import AttendanceRecord, Club, Event, EventPhoto, EventRegistration, GalleryPhoto, Membership, User
+
+EXPORT_FORMATS = ("ndjson", "parquet")
+_FILE_CHUNK = 64 * 1024
+
+# table name -> (columns, column compared with updated_since)
+_TABLES: Dict[str, tuple] = {
+    # No password hash, face data or phone number
+    "users": (
+        (User.id, User.email, User.full_name, User.role, User.whatsapp_verified, User.whatsapp_consent,
+         User.created_at, User.updated_at),
+        User.updated_at,
+    ),
+    "clubs": (
+        (Club.id, Club.name, Club.description, Club.category, Club.admin_id, Club.coordinator_id,
+         Club.sub_coordinator_id, Club.contact_email, Club.website_url, Club.cover_image_url, Club.founded_date,
+         Club.updated_at),
+        Club.updated_at,
+    ),
+    "events": (
+        (Event.id, Event.name, Event.description, Event.date, Event.location, Event.club_id, Event.updated_at),
+        Event.updated_at,
+    ),
+    "memberships": ((Membership.user_id, Membership.club_id, Membership.joined_at), Membership.joined_at),
+    "registrations": (
+        (EventRegistration.user_id, EventRegistration.event_id, EventRegistration.registered_at),
+        EventRegistration.registered_at,
+    ),
+    "attendance": (
+        (AttendanceRecord.id, AttendanceRecord.user_id, AttendanceRecord.event_id, AttendanceRecord.day,
+         AttendanceRecord.timestamp, AttendanceRecord.notes),
+        AttendanceRecord.timestamp,
+    ),
+    "event_photos": (
+        (EventPhoto.id, EventPhoto.event_id, EventPhoto.image_url, EventPhoto.public_id, EventPhoto.timestamp),
+        EventPhoto.timestamp,
+    ),
+    "gallery_photos": (
+        (GalleryPhoto.id, GalleryPhoto.uploaded_by_id, GalleryPhoto.image_url, GalleryPhoto.public_id,
+         GalleryPhoto.caption, GalleryPhoto.timestamp),
+        GalleryPhoto.timestamp,
+    ),
+}
+TABLES = tuple(_TABLES)
+
+
+def table_statement(table: str, updated_since: Optional[datetime] = None):
+    columns, changed_column = _TABLES[table]
+    statement = select(*columns)
+    if updated_since is not None:
+        statement = statement.where(changed_column > updated_since)
+    # Primary-key order keeps repeated exports diffable
+    return statement.order_by(*columns[0].table.primary_key.columns)
+
+
+def column_names(table: str) -> List[str]:
+    return [column.key for column in _TABLES[table][0]]
+
+
+@contextmanager
+def snapshot() -> Iterator[Connection]:
+    """One connection whose reads all see the same committed state, fixed on entry."""
+    if engine.dialect.name == "postgresql":
+        with engine.connect().execution_options(isolation_level="REPEATABLE READ", postgresql_readonly=True) as conn:
+            with conn.begin():
+                # The snapshot is taken by the first query, not by BEGIN
+                conn.exec_driver_sql("SELECT 1")
+                yield conn
+        return
+    with engine.connect() as conn:
+        # pysqlite only opens transactions before writes; start the read snapshot explicitly.
+        # A deferred BEGIN reads nothing yet, so read once to fix the snapshot now
+        conn.exec_driver_sql("BEGIN")
+        try:
+            conn.exec_driver_sql("SELECT 1 FROM sqlite_master LIMIT 1")
+            yield conn
+        finally:
+            conn.rollback()
+
+
+def watermark() -> datetime:
+    """`snapshot_at` for a snapshot that was just opened: now, minus the safety overlap."""
+    return datetime.utcnow() - timedelta(seconds=WAREHOUSE_OVERLAP_SECONDS)
+
+
+def _rows(conn: Connection, table: str, updated_since: Optional[datetime]) -> Iterator[tuple]:
+    statement = table_statement(table, updated_since).execution_options(yield_per=WAREHOUSE_BATCH_ROWS)
+    for partition in conn.execute(statement).partitions():
+        yield from partition
+
+
+def _plain(value):
+    return value.value if isinstance(value, Enum) else value
+
+
+def _json_value(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return _plain(value)
+
+
+def ndjson_lines(conn: Connection, table: str, updated_since: Optional[datetime], tagged: bool) -> Iterator[bytes]:
+    """`WAREHOUSE_BATCH_ROWS` lines per chunk; `tagged` adds a `_table` field for multi-table streams."""
+    names = column_names(table)
+    batch: List[str] = []
+    for row in _rows(conn, table, updated_since):
+        record = {"_table": table} if tagged else {}
+        record.update(zip(names, map(_json_value, row)))
+        batch.append(json.dumps(record, separators=(",", ":"), ensure_ascii=False))
+        if len(batch) >= WAREHOUSE_BATCH_ROWS:
+            yield ("\n".join(batch) + "\n").encode()
+            batch = []
+    if batch:
+        yield ("\n".join(batch) + "\n").encode()
+
+
+def _arrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        return None
+    return pyarrow
+
+
+def parquet_available() -> bool:
+    return _arrow() is not None
+
+
+def _arrow_schema(pa, table: str):
+    fields = []
+    for column in _TABLES[table][0]:
+        if isinstance(column.type, Boolean):
+            arrow_type = pa.bool_()
+        elif isinstance(column.type, Integer):
+            arrow_type = pa.int64()
+        elif isinstance(column.type, Float):
+            arrow_type = pa.float64()
+        elif isinstance(column.type, DateTime):
+            arrow_type = pa.timestamp("us")
+        elif isinstance(column.type, Date):
+            arrow_type = pa.date32()
+        else:
+            arrow_type = pa.string()
+        fields.append(pa.field(column.key, arrow_type))
+    return pa.schema(fields)
+
+
+def write_parquet(conn: Connection, table: str, updated_since: Optional[datetime], sink) -> int:
+    """Write one table to `sink` (path or binary file), one row group per batch; returns the row count."""
+    pa = _arrow()
+    schema = _arrow_schema(pa, table)
+    names = schema.names
+    count = 0
+    with pa.parquet.ParquetWriter(sink, schema, compression="zstd") as writer:
+        statement = table_statement(table, updated_since).execution_options(yield_per=WAREHOUSE_BATCH_ROWS)
+        for partition in conn.execute(statement).partitions():
+            columns = list(zip(*partition))
+            arrays = [
+                pa.array([_plain(v) for v in values] if field.type == pa.string() else values, type=field.type)
+                for field, values in zip(schema, columns)
+            ]
+            writer.write_table(pa.Table.from_arrays(arrays, names=names))
+            count += len(partition)
+    return count
+
+
+def ndjson_stream(conn: Connection, tables: Sequence[str], updated_since: Optional[datetime]) -> Iterator[bytes]:
+    """Every table from the snapshot `conn`, as NDJSON lines tagged with `_table`."""
+    for table in tables:
+        yield from ndjson_lines(conn, table, updated_since, tagged=True)
+
+
+def parquet_zip_stream(conn: Connection, tables: Sequence[str], updated_since: Optional[datetime]) -> Iterator[bytes]:
+    """A zip of `<table>.parquet` files from the snapshot `conn`, spooled to disk and then streamed."""
+    with tempfile.TemporaryFile() as spool:
+        with zipfile.ZipFile(spool, "w", compression=zipfile.ZIP_STORED) as archive:
+            for table in tables:
+                # Parquet is already compressed; ZIP_STORED just bundles the files
+                with archive.open(f"{table}.parquet", "w", force_zip64=True) as member:
+                    write_parquet(conn, table, updated_since, member)
+        spool.seek(0)
+        while chunk := spool.read(_FILE_CHUNK):
+            yield chunk
+
+
+def export_stream(fmt: str, tables: Sequence[str], updated_since: Optional[datetime]) -> Tuple[datetime, Iterator[bytes]]:
+    """
+    Open the snapshot right away and return `(snapshot_at, body)`. The body
+    streams from that snapshot and closes it when it is done.
+    """
+    stack = ExitStack()
+    try:
+        conn = stack.enter_context(snapshot())
+        snapshot_at = watermark()
+    except BaseException:
+        stack.close()
+        raise
+    body = parquet_zip_stream(conn, tables, updated_since) if fmt == "parquet" else ndjson_stream(conn, tables, updated_since)
+
+    def stream() -> Iterator[bytes]:
+        with stack:
+            yield from body
+    return snapshot_at, stream()
+
+
+def export_to_directory(
+    out_dir: str, fmt: str, tables: Sequence[str] = TABLES, updated_since: Optional[datetime] = None,
+    log: Callable[[str], None] = print,
+) -> dict:
+    """Write one file per table plus `manifest.json`; returns the manifest."""
+    os.makedirs(out_dir, exist_ok=True)
+    counts = {}
+    with snapshot() as conn:
+        snapshot_at = watermark()
+        for table in tables:
+            path = os.path.join(out_dir, f"{table}.{fmt}")
+            if fmt == "parquet":
+                counts[table] = write_parquet(conn, table, updated_since, path)
+            else:
+                counts[table] = 0
+                with open(path, "wb") as f:
+                    for chunk in ndjson_lines(conn, table, updated_since, tagged=False):
+                        f.write(chunk)
+                        counts[table] += chunk.count(b"\n")
+            log(f"{table}: {counts[table]} rows -> {path}")
+    manifest = {
+        "snapshot_at": snapshot_at.isoformat(),
+        "updated_since": updated_since.isoformat() if updated_since else None,
+        "format": fmt,
+        "rows": counts,
+    }
+    with open(os.path.join(out_dir, "manifest.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Export SAMVAD tables for the data warehouse")
+    parser.add_argument("--out", required=True, help="Output directory")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, default="ndjson")
+    parser.add_argument("--tables", default=",".join(TABLES), help=f"Comma-separated subset of: {', '.join(TABLES)}")
+    parser.add_argument("--updated-since", type=datetime.fromisoformat, default=None,
+                        help="Only rows created/changed after this UTC time (previous manifest's snapshot_at)")
+    args = parser.parse_args()
+
+    tables = [t.strip() for t in args.tables.split(",") if t.strip()]
+    unknown = set(tables) - set(TABLES)
+    if unknown:
+        parser.error(f"Unknown tables: {', '.join(sorted(unknown))}")
+    if args.format == "parquet" and not parquet_available():
+        parser.error("Parquet export needs pyarrow (pip install pyarrow)")
+    engine.echo = False
+    export_to_directory(args.out, args.format, tables, args.updated_since)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from sqlalchemy import event
 from sqlmodel import SQLModel, Session, create_engine
 from app.core.config import DATABASE_URL
 import os
@@ -6,6 +7,14 @@ import os
 if DATABASE_URL.startswith("sqlite"):
     # SQLite configuration
     engine = create_engine(DATABASE_URL, echo=True, connect_args={"check_same_thread": False})
+
+    @event.listens_for(engine, "connect")
+    def _enable_wal(dbapi_connection, connection_record):
+        # WAL: lambe read (warehouse export) ke dauraan bhi writes chalte rehte hain,
+        # rollback journal mein woh "database is locked" se fail ho jaate
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.close()
 else:
     # PostgreSQL configuration (for production)
     engine = create_engine(DATABASE_URL, echo=True)
@@ -18,6 +27,9 @@ def create_db_and_tables():
     # -----------
     
     SQLModel.metadata.create_all(engine)
+    # create_all existing tables mein naye columns / indexes nahi jodta
+    from app.db.schema_upgrade import upgrade_schema
+    upgrade_schema(engine)
 
 def get_session():
     with Session(engine) as session:
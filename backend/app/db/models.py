@@ -1,7 +1,8 @@
 from typing import List, Optional
 from enum import Enum
+from sqlalchemy import Column, JSON, LargeBinary, Index, text
 from sqlmodel import Field, Relationship, SQLModel
-from datetime import datetime
+from datetime import date, datetime
 
 # --- Enums and Link Models ---
 
@@ -13,10 +14,12 @@ class UserRole(str, Enum):
 class Membership(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id", primary_key=True)
     club_id: int = Field(foreign_key="club.id", primary_key=True)
+    joined_at: datetime = Field(default_factory=datetime.utcnow)
 
 class EventRegistration(SQLModel, table=True):
     user_id: int = Field(foreign_key="user.id", primary_key=True)
     event_id: int = Field(foreign_key="event.id", primary_key=True)
+    registered_at: datetime = Field(default_factory=datetime.utcnow)
 
 # --- Main Models ---
 
@@ -29,10 +32,14 @@ class User(SQLModel, table=True):
     full_name: str
     hashed_password: str
     role: UserRole = Field(default=UserRole.student)
-    face_encoding: Optional[str] = Field(default=None, max_length=4096)
+    face_encoding: Optional[str] = Field(default=None, max_length=4096)  # Legacy comma-separated format
+    face_embedding: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))  # 128 x float32
     whatsapp_number: Optional[str] = Field(default=None, index=True)
     whatsapp_verified: bool = Field(default=False)
     whatsapp_consent: bool = Field(default=False)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    # Bumped on every ORM update; warehouse exports pull rows changed since a cutoff
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow})
     
     # Relationships
     clubs: List["Club"] = Relationship(back_populates="members", link_model=Membership)
@@ -75,6 +82,7 @@ class Club(SQLModel, table=True):
     
     coordinator_id: Optional[int] = Field(default=None, foreign_key="user.id")
     sub_coordinator_id: Optional[int] = Field(default=None, foreign_key="user.id")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow})
     
     # Relationships
     admin: "User" = Relationship(
@@ -104,6 +112,7 @@ class Event(SQLModel, table=True):
     date: datetime
     location: str
     club_id: int = Field(foreign_key="club.id")
+    updated_at: datetime = Field(default_factory=datetime.utcnow, index=True, sa_column_kwargs={"onupdate": datetime.utcnow})
     
     club: Club = Relationship(back_populates="events")
     attendees: List[User] = Relationship(back_populates="events_attending", link_model=EventRegistration)
@@ -126,12 +135,26 @@ class EventPhoto(SQLModel, table=True):
     event: Event = Relationship(back_populates="photos")
 
 class AttendanceRecord(SQLModel, table=True):
+    # One mark per user per event (or general attendance, event_id NULL) per UTC day
+    __table_args__ = (
+        Index("uq_attendance_user_event_day", "user_id", text("coalesce(event_id, 0)"), "day", unique=True),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     timestamp: datetime = Field(default_factory=datetime.utcnow)
+    day: date = Field(default_factory=lambda: datetime.utcnow().date(), index=True)
     notes: Optional[str] = Field(default=None)
     user_id: int = Field(foreign_key="user.id")
     event_id: Optional[int] = Field(default=None, foreign_key="event.id")
 
+class DailyStat(SQLModel, table=True):
+    # Daily rollup per club (club_id 0 = whole site); the primary key order makes any
+    # window of a club, all metrics at once, one index range scan
+    club_id: int = Field(primary_key=True)
+    day: date = Field(primary_key=True)
+    metric: str = Field(primary_key=True, max_length=20)  # members, registrations, attendance, signups
+    count: int = Field(default=0)
+
 class GalleryPhoto(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
     image_url: str
@@ -147,6 +170,12 @@ class RoleRequestStatus(str, Enum):
     rejected = "rejected"
 
 class RoleRequest(SQLModel, table=True):
+    # Review pages filter on status / requester and page by (created_at, id)
+    __table_args__ = (
+        Index("ix_rolerequest_status_created", "status", "created_at"),
+        Index("ix_rolerequest_user_created", "user_id", "created_at"),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     user_id: int = Field(foreign_key="user.id")
     requested_role: UserRole = Field(index=True)
@@ -165,3 +194,94 @@ class RoleRequest(SQLModel, table=True):
     reviewed_by: Optional["User"] = Relationship(
         sa_relationship_kwargs={'foreign_keys': '[RoleRequest.reviewed_by_id]'}
     )
+
+class ResourceVersion(SQLModel, table=True):
+    # Bumped in the same transaction as writes to the resource; see app/core/http_cache.py
+    key: str = Field(primary_key=True, max_length=64)  # "clubs", "club:3", "events", "gallery", "users"
+    version: int = Field(default=0)
+
+class OTPCode(SQLModel, table=True):
+    # Shared OTP store rows (OTP_STORE_BACKEND=database), one live code per phone number
+    phone: str = Field(primary_key=True)
+    code_hash: str
+    expires_at: datetime = Field(index=True)
+    sent_at: datetime
+    attempts: int = Field(default=0)
+
+class EnrollmentStatus(str, Enum):
+    pending = "pending"
+    processing = "processing"
+    completed = "completed"
+    failed = "failed"
+
+class EnrollmentJob(SQLModel, table=True):
+    # Background face enrollment (see app/face/enrollment.py); any worker can answer the status poll.
+    # No foreign key: jobs are short-lived and must not block deleting the user
+    id: str = Field(primary_key=True, max_length=32)
+    user_id: int = Field(index=True)
+    image_count: int
+    status: EnrollmentStatus = Field(default=EnrollmentStatus.pending)
+    accepted_images: int = Field(default=0)
+    rejected: List[dict] = Field(default_factory=list, sa_column=Column(JSON))  # [{"image", "reason"}]
+    detail: Optional[str] = Field(default=None)
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    finished_at: Optional[datetime] = Field(default=None)
+
+# --- Forums ---
+
+class ForumPost(SQLModel, table=True):
+    # Listing queries filter on one scope and page by (created_at, id)
+    __table_args__ = (
+        Index("ix_forumpost_club_created", "club_id", "created_at"),
+        Index("ix_forumpost_event_created", "event_id", "created_at"),
+        Index("ix_forumpost_category_created", "category", "created_at"),
+        # "Hot" sort pages by (hot_score, id) within the same scopes
+        Index("ix_forumpost_club_hot", "club_id", "hot_score"),
+        Index("ix_forumpost_event_hot", "event_id", "hot_score"),
+        Index("ix_forumpost_category_hot", "category", "hot_score"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    title: str = Field(max_length=300)
+    content: str
+    category: str = Field(default="general")  # general, question, announcement, discussion, events
+    author_id: int = Field(foreign_key="user.id", index=True)
+    club_id: Optional[int] = Field(default=None, foreign_key="club.id")
+    event_id: Optional[int] = Field(default=None, foreign_key="event.id")
+    created_at: datetime = Field(default_factory=datetime.utcnow, index=True)
+    # Denormalized counters, updated in the same transaction as the reply / like rows
+    reply_count: int = Field(default=0)
+    like_count: int = Field(default=0)
+    # Recomputed with the counters; see app/core/trending.py
+    hot_score: float = Field(default=0.0, index=True)
+
+class ForumReply(SQLModel, table=True):
+    # `path` is the materialized path of zero-padded ancestor ids ("0000000003/0000000017"),
+    # so ORDER BY path is depth-first thread order and a subtree is one range scan
+    __table_args__ = (
+        Index("ix_forumreply_post_created", "post_id", "created_at"),
+        Index("ix_forumreply_post_path", "post_id", "path"),
+        Index("ix_forumreply_post_depth_path", "post_id", "depth", "path"),
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    content: str
+    post_id: int = Field(foreign_key="forumpost.id")
+    author_id: int = Field(foreign_key="user.id", index=True)
+    parent_id: Optional[int] = Field(default=None, foreign_key="forumreply.id")
+    path: str = Field(default="", max_length=512)
+    depth: int = Field(default=0)  # 0 = direct reply to the post
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    like_count: int = Field(default=0)
+    child_count: int = Field(default=0)  # Direct replies, kept like the post counters
+
+class ForumPostLike(SQLModel, table=True):
+    # Composite primary key = one like per user per post
+    post_id: int = Field(foreign_key="forumpost.id", primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+
+class ForumReplyLike(SQLModel, table=True):
+    reply_id: int = Field(foreign_key="forumreply.id", primary_key=True)
+    user_id: int = Field(foreign_key="user.id", primary_key=True)
+    created_at: datetime = Field(default_factory=datetime.utcnow)
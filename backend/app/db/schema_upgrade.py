@@ -0,0 +1,112 @@
+"""
+In-place upgrade of a database created before the current models.
+
+`create_all` only creates missing tables; it never adds columns or indexes
+to a table that already exists. This step runs right after it at startup and
+is idempotent. For each table it:
+
+1. adds the columns the models have and the table lacks (nullable, since
+   existing rows have no value yet)
+2. backfills them: timestamps with the upgrade time, `AttendanceRecord.day`
+   from the record's timestamp
+3. removes duplicate attendance marks (keeping the first one), which the new
+   one-mark-per-day index would otherwise reject
+4. creates the model indexes that are missing, so the unique attendance index
+   is only built once `day` is filled in and the duplicates are gone
+
+On PostgreSQL the backfilled columns are then made NOT NULL as declared.
+`User.face_embedding` stays empty: rows enrolled before it existed keep their
+`face_encoding`, which the matcher still reads.
+"""
+
+import logging
+from datetime import datetime
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Connection, Engine
+
+logger = logging.getLogger(__name__)
+
+# Columns whose existing rows need a value once the column is added
+_NOW_BACKFILLS = {
+    ("user", "created_at"),
+    ("user", "updated_at"),
+    ("club", "updated_at"),
+    ("event", "updated_at"),
+    ("membership", "joined_at"),
+    ("eventregistration", "registered_at"),
+}
+
+_DEDUPE_ATTENDANCE = text(
+    'DELETE FROM attendancerecord WHERE id NOT IN '
+    '(SELECT MIN(id) FROM attendancerecord GROUP BY user_id, coalesce(event_id, 0), day)'
+)
+
+
+def _day_backfill(dialect: str):
+    day = "date(timestamp)" if dialect == "sqlite" else "CAST(timestamp AS DATE)"
+    return text(f"UPDATE attendancerecord SET day = {day} WHERE day IS NULL")
+
+
+def _index_names(conn: Connection, table_name: str) -> set:
+    # Straight from the catalog: reflection skips expression indexes like the attendance one
+    if conn.dialect.name == "sqlite":
+        query = text("SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :table")
+    else:
+        query = text("SELECT indexname FROM pg_indexes WHERE tablename = :table")
+    return set(conn.execute(query, {"table": table_name}).scalars())
+
+
+def _add_columns(conn: Connection, table, existing: set) -> list:
+    added = []
+    preparer = conn.dialect.identifier_preparer
+    for column in table.columns:
+        if column.name in existing:
+            continue
+        column_type = column.type.compile(dialect=conn.dialect)
+        conn.execute(text(
+            f"ALTER TABLE {preparer.format_table(table)} ADD COLUMN {preparer.format_column(column)} {column_type}"
+        ))
+        added.append(column.name)
+    return added
+
+
+def upgrade_schema(engine: Engine) -> None:
+    from sqlmodel import SQLModel
+
+    dialect = engine.dialect.name
+    with engine.begin() as conn:
+        inspector = inspect(conn)
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            added = _add_columns(conn, table, existing)
+            if not added:
+                continue
+            logger.warning("Schema upgrade: added %s.%s", table.name, ", ".join(added))
+
+            preparer = conn.dialect.identifier_preparer
+            quoted_table = preparer.format_table(table)
+            for name in added:
+                quoted = preparer.quote(name)
+                if (table.name, name) in _NOW_BACKFILLS:
+                    conn.execute(text(f"UPDATE {quoted_table} SET {quoted} = :now WHERE {quoted} IS NULL"),
+                                 {"now": datetime.utcnow()})
+                elif (table.name, name) == ("attendancerecord", "day"):
+                    conn.execute(_day_backfill(dialect))
+                    conn.execute(_DEDUPE_ATTENDANCE)
+                else:
+                    continue
+                if dialect == "postgresql" and not table.columns[name].nullable:
+                    conn.execute(text(f"ALTER TABLE {quoted_table} ALTER COLUMN {quoted} SET NOT NULL"))
+
+        # Indexes of tables that already existed (create_all skipped them), after the backfills
+        for table in SQLModel.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            present = _index_names(conn, table.name)
+            for index in table.indexes:
+                if index.name not in present:
+                    index.create(conn)
+                    logger.warning("Schema upgrade: created index %s", index.name)
@@ -0,0 +1,64 @@
+"""
+Face embedding storage helpers.
+
+Embeddings are stored on the User row as raw little-endian float32 bytes
+(128 * 4 = 512 bytes) instead of comma-separated text, so a whole table of
+them can be turned into one contiguous matrix without any float parsing.
+"""
+
+from typing import Iterable, Optional, Tuple
+
+import numpy as np
+
+EMBEDDING_DIM = 128
+EMBEDDING_DTYPE = np.dtype("<f4")
+EMBEDDING_NBYTES = EMBEDDING_DIM * EMBEDDING_DTYPE.itemsize
+
+
+def encoding_to_bytes(encoding: np.ndarray) -> bytes:
+    """Serialize one embedding to the binary blob format."""
+    vector = np.asarray(encoding, dtype=EMBEDDING_DTYPE).reshape(-1)
+    if vector.shape[0] != EMBEDDING_DIM:
+        raise ValueError(f"Expected a {EMBEDDING_DIM}-d embedding, got {vector.shape[0]}")
+    return vector.tobytes()
+
+
+def bytes_to_encoding(blob: bytes) -> np.ndarray:
+    """Deserialize one blob into a read-only float32 view (no copy)."""
+    if len(blob) != EMBEDDING_NBYTES:
+        raise ValueError(f"Expected {EMBEDDING_NBYTES} bytes, got {len(blob)}")
+    return np.frombuffer(blob, dtype=EMBEDDING_DTYPE)
+
+
+def legacy_string_to_encoding(encoding_str: str) -> np.ndarray:
+    """Parse the old comma-separated `User.face_encoding` format."""
+    return np.array(encoding_str.split(","), dtype=EMBEDDING_DTYPE)
+
+
+def stack_embeddings(
+    rows: Iterable[Tuple[int, Optional[bytes], Optional[str]]],
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Build `(user_ids, matrix)` from `(user_id, face_embedding, face_encoding)`
+    rows. Binary blobs are joined and viewed as one (n, 128) float32 matrix;
+    rows that only have the legacy text column are parsed as a fallback.
+    """
+    user_ids = []
+    chunks = []
+    for user_id, blob, legacy in rows:
+        if blob is not None and len(blob) == EMBEDDING_NBYTES:
+            chunks.append(bytes(blob))
+        elif legacy:
+            try:
+                chunks.append(encoding_to_bytes(legacy_string_to_encoding(legacy)))
+            except ValueError:
+                continue
+        else:
+            continue
+        user_ids.append(user_id)
+
+    ids = np.asarray(user_ids, dtype=np.int64)
+    if not chunks:
+        return ids, np.empty((0, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+    matrix = np.frombuffer(b"".join(chunks), dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+    return ids, matrix
@@ -0,0 +1,69 @@
+"""
+Face detection + embedding backends.
+
+`dlib` uses the `face_recognition` package when it is installed. `stub` is a
+dependency-free stand-in (a normalised 16x8 grayscale thumbnail of the frame)
+for local development and benchmarks; it is deterministic but is NOT a real
+face model.
+"""
+
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+from PIL import Image
+
+from app.core.config import FACE_ENCODER_BACKEND
+from app.core.secure_error_handler import SecureErrorHandler
+from app.face.embeddings import EMBEDDING_DIM, EMBEDDING_DTYPE
+
+try:
+    import face_recognition
+except ImportError:  # dlib is not part of the default deployment
+    face_recognition = None
+
+
+class FaceEncoder(ABC):
+    """Finds faces in an RGB image and returns one embedding per face."""
+
+    name = "base"
+
+    @abstractmethod
+    def encode_faces(self, image_np: np.ndarray) -> List[np.ndarray]:
+        """One `EMBEDDING_DIM` float32 embedding per face found in `image_np`."""
+
+
+class DlibFaceEncoder(FaceEncoder):
+    name = "dlib"
+
+    def encode_faces(self, image_np: np.ndarray) -> List[np.ndarray]:
+        locations = face_recognition.face_locations(image_np)
+        if not locations:
+            return []
+        encodings = face_recognition.face_encodings(image_np, known_face_locations=locations)
+        return [np.asarray(e, dtype=EMBEDDING_DTYPE) for e in encodings]
+
+
+class StubFaceEncoder(FaceEncoder):
+    name = "stub"
+
+    def encode_faces(self, image_np: np.ndarray) -> List[np.ndarray]:
+        thumb = Image.fromarray(image_np).convert("L").resize((16, EMBEDDING_DIM // 16))
+        vector = np.asarray(thumb, dtype=EMBEDDING_DTYPE).reshape(-1)
+        vector -= vector.mean()
+        norm = float(np.linalg.norm(vector))
+        if norm == 0.0:
+            return []
+        return [vector / norm]
+
+
+@lru_cache(maxsize=1)
+def get_face_encoder() -> Optional[FaceEncoder]:
+    """Return the configured encoder, or None if its backend is unavailable."""
+    if FACE_ENCODER_BACKEND == "stub":
+        return StubFaceEncoder()
+    if face_recognition is None:
+        SecureErrorHandler.log_error(Exception("face_recognition not installed"), "Face encoder setup")
+        return None
+    return DlibFaceEncoder()
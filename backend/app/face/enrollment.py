@@ -0,0 +1,130 @@
+"""
+Background multi-photo face enrollment.
+
+The endpoint only validates and reads the uploads, then returns a job id.
+Each photo is decoded and encoded in the shared frame process pool; photos
+without exactly one face are skipped, embeddings far from the per-job median
+are rejected as outliers, and the mean of the rest is stored on the user and
+inserted into the live face index.
+
+Job status is stored in the `EnrollmentJob` table, so the poll can land on
+any worker. Jobs are deleted `ENROLLMENT_JOB_TTL_SECONDS` after they were
+created. The job itself runs on the worker that took the upload.
+"""
+
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+from typing import List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import delete
+from sqlmodel import Session
+
+from app.core.config import ENROLLMENT_MIN_FACES, ENROLLMENT_OUTLIER_DISTANCE, ENROLLMENT_JOB_TTL_SECONDS
+from app.core.secure_error_handler import SecureErrorHandler
+from app.db.database import engine
+from app.db.models import EnrollmentJob, EnrollmentStatus, User
+from app.face.embeddings import EMBEDDING_DTYPE, encoding_to_bytes
+from app.face.frames import encode_frame_in_pool
+from app.face.matcher import add_face_to_index
+
+
+def create_enrollment_job(user_id: int, image_count: int) -> EnrollmentJob:
+    with Session(engine) as db:
+        # Expired jobs go here, so a job that died with its worker doesn't linger either
+        cutoff = datetime.utcnow() - timedelta(seconds=ENROLLMENT_JOB_TTL_SECONDS)
+        db.execute(delete(EnrollmentJob).where(EnrollmentJob.created_at < cutoff))
+        job = EnrollmentJob(id=uuid.uuid4().hex, user_id=user_id, image_count=image_count)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+
+def _update_job(job_id: str, **values) -> Optional[EnrollmentJob]:
+    """Set fields on a job; None if the row is gone (TTL-swept or deleted)."""
+    with Session(engine) as db:
+        job = db.get(EnrollmentJob, job_id)
+        if job is None:
+            SecureErrorHandler.log_error(LookupError(f"Enrollment job {job_id} no longer exists"), "Face enrollment job")
+            return None
+        for name, value in values.items():
+            setattr(job, name, value)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        return job
+
+
+def combine_embeddings(
+    per_image: List[List[np.ndarray]],
+    outlier_distance: float = ENROLLMENT_OUTLIER_DISTANCE,
+) -> Tuple[Optional[np.ndarray], List[dict]]:
+    """
+    Reduce per-image face embeddings to one mean embedding.
+    Returns `(mean or None, rejected)` where `rejected` lists `{"image", "reason"}`.
+    """
+    rejected = []
+    candidates = []
+    for i, faces in enumerate(per_image):
+        if not faces:
+            rejected.append({"image": i, "reason": "No face found"})
+        elif len(faces) > 1:
+            rejected.append({"image": i, "reason": "Multiple faces found"})
+        else:
+            candidates.append((i, np.asarray(faces[0], dtype=EMBEDDING_DTYPE)))
+
+    if not candidates:
+        return None, rejected
+
+    # Median is robust to a minority of bad shots (blur, a different person, ...)
+    matrix = np.stack([e for _, e in candidates])
+    median = np.median(matrix, axis=0)
+    distances = np.linalg.norm(matrix - median, axis=1)
+    keep = distances <= outlier_distance
+    for (i, _), kept in zip(candidates, keep):
+        if not kept:
+            rejected.append({"image": i, "reason": "Face does not match the other photos"})
+    rejected.sort(key=lambda r: r["image"])
+
+    if not keep.any():
+        return None, rejected
+    return matrix[keep].mean(axis=0).astype(EMBEDDING_DTYPE), rejected
+
+
+def _store_embedding(user_id: int, embedding: np.ndarray) -> bool:
+    with Session(engine) as db:
+        user = db.get(User, user_id)
+        if not user:
+            return False
+        user.face_embedding = encoding_to_bytes(embedding)
+        user.face_encoding = None
+        db.add(user)
+        db.commit()
+    add_face_to_index(user_id, embedding)
+    return True
+
+
+async def run_enrollment_job(job_id: str, images: List[bytes]) -> None:
+    job = await asyncio.to_thread(_update_job, job_id, status=EnrollmentStatus.processing)
+    if job is None:
+        return
+    result = {}
+    try:
+        per_image = await asyncio.gather(*(encode_frame_in_pool(image) for image in images))
+        embedding, rejected = combine_embeddings(list(per_image))
+        result.update(rejected=rejected, accepted_images=job.image_count - len(rejected))
+
+        if embedding is None or result["accepted_images"] < ENROLLMENT_MIN_FACES:
+            result.update(status=EnrollmentStatus.failed,
+                          detail=f"Need at least {ENROLLMENT_MIN_FACES} clear photo(s) with exactly one face.")
+        elif not await asyncio.to_thread(_store_embedding, job.user_id, embedding):
+            result.update(status=EnrollmentStatus.failed, detail="User not found")
+        else:
+            result["status"] = EnrollmentStatus.completed
+    except Exception as e:
+        SecureErrorHandler.log_error(e, "Face enrollment job", user_id=job.user_id)
+        result.update(status=EnrollmentStatus.failed, detail="Enrollment failed. Please try again with clear photos.")
+    finally:
+        await asyncio.to_thread(_update_job, job_id, finished_at=datetime.utcnow(), **result)
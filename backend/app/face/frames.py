@@ -0,0 +1,204 @@
+"""
+Live attendance frame pipeline.
+
+Frames are decoded and encoded in a shared process pool so the event loop
+never runs PIL or the face model. Each websocket connection owns a
+`LatestFrameBuffer` with a single slot: a frame that arrives while the
+previous one is still pending replaces it, so slow processing drops stale
+frames instead of queueing them. `RateController` turns measured processing
+time into a suggested client send interval.
+
+Wire protocol: the client opens with a JSON hello (`{"type": "hello",
+"binary": true, "formats": [...], "max_side": n}`) and the server answers
+with a `CONFIG` message fixing protocol, format, max side and quality.
+Binary frames are `FRAME_HEADER` (version, flags, frame id, event id; event
+id 0 means general attendance) followed by the raw image bytes. Clients that
+send a `data:` URL instead of a hello stay on the legacy text protocol.
+"""
+
+import asyncio
+import base64
+import io
+import struct
+from concurrent.futures import ProcessPoolExecutor
+from threading import Lock
+from typing import List, NamedTuple, Optional
+
+import numpy as np
+from PIL import Image, features
+
+from app.core.config import FRAME_MAX_SIDE, FRAME_WORKERS, FRAME_MIN_INTERVAL_MS, FRAME_MAX_INTERVAL_MS, FRAME_QUALITY
+from app.face.encoder import get_face_encoder
+
+FRAME_PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct("!BBII")  # version, flags, frame_id, event_id
+
+
+class Frame(NamedTuple):
+    data: bytes
+    offset: int  # Image bytes start here (binary frames keep their header)
+    frame_id: Optional[int] = None
+    event_id: Optional[int] = None
+
+
+def parse_binary_frame(message: bytes) -> Frame:
+    """Split a binary message into header fields without copying the image bytes."""
+    if len(message) <= FRAME_HEADER.size:
+        raise ValueError("Frame is too short")
+    version, _flags, frame_id, event_id = FRAME_HEADER.unpack_from(message)
+    if version != FRAME_PROTOCOL_VERSION:
+        raise ValueError(f"Unsupported frame protocol version {version}")
+    return Frame(message, FRAME_HEADER.size, frame_id, event_id or None)
+
+
+def parse_text_frame(message: str) -> Frame:
+    """Legacy text protocol: a `data:image/...;base64,...` URL."""
+    _header, encoded = message.split(",", 1)
+    return Frame(base64.b64decode(encoded), 0)
+
+
+def supported_frame_formats() -> List[str]:
+    formats = ["image/jpeg"]
+    if features.check("webp"):
+        formats.insert(0, "image/webp")
+    return formats
+
+
+def negotiate_frame_config(hello: dict) -> dict:
+    """Pick protocol, image format, size and quality from a client hello."""
+    offered = hello.get("formats") or ["image/jpeg"]
+    image_format = next((f for f in supported_frame_formats() if f in offered), "image/jpeg")
+    try:
+        max_side = min(int(hello.get("max_side") or FRAME_MAX_SIDE), FRAME_MAX_SIDE)
+    except (TypeError, ValueError):
+        max_side = FRAME_MAX_SIDE
+    return {
+        "protocol": "binary" if hello.get("binary") else "text",
+        "version": FRAME_PROTOCOL_VERSION,
+        "format": image_format,
+        "max_side": max(max_side, 64),
+        "quality": FRAME_QUALITY,
+    }
+
+
+class _OffsetBytesIO(io.BytesIO):
+    """
+    Read-only view of `data[offset:]`. PIL seeks to 0 before sniffing the
+    format, so positions are shifted instead of slicing (which would copy).
+    """
+
+    def __init__(self, data: bytes, offset: int):
+        super().__init__(data)
+        self._offset = offset
+        super().seek(offset)
+
+    def seek(self, pos: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos += self._offset
+        return super().seek(pos, whence) - self._offset
+
+    def tell(self) -> int:
+        return super().tell() - self._offset
+
+
+def decode_frame(data: bytes, max_side: int = FRAME_MAX_SIDE, offset: int = 0) -> np.ndarray:
+    """
+    Decode a JPEG/PNG/WebP frame starting at `offset` to an RGB array no larger
+    than `max_side`. For JPEG, `draft()` makes libjpeg decode at 1/2, 1/4 or
+    1/8 scale directly from the DCT coefficients, which is far cheaper than
+    decoding at full size and resizing afterwards.
+    """
+    image = Image.open(_OffsetBytesIO(data, offset) if offset else io.BytesIO(data))
+    image.draft("RGB", (max_side, max_side))
+    image = image.convert("RGB")
+    if max(image.size) > max_side:
+        image.thumbnail((max_side, max_side))
+    return np.asarray(image)
+
+
+def process_frame(data: bytes, offset: int = 0, max_side: int = FRAME_MAX_SIDE) -> List[np.ndarray]:
+    """Worker-process entry point: decode one frame (at most `max_side`) and return its face embeddings."""
+    encoder = get_face_encoder()
+    if encoder is None:
+        return []
+    return encoder.encode_faces(decode_frame(data, max_side, offset))
+
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = Lock()
+
+
+def get_frame_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(max_workers=FRAME_WORKERS)
+        return _pool
+
+
+def shutdown_frame_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+async def encode_frame_in_pool(data: bytes, offset: int = 0, max_side: int = FRAME_MAX_SIDE) -> List[np.ndarray]:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_frame_pool(), process_frame, data, offset, max_side)
+
+
+class LatestFrameBuffer:
+    """Single-slot, latest-wins handoff between the receive and process loops."""
+
+    def __init__(self):
+        self._frame: Optional[Frame] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.dropped = 0
+
+    def put(self, frame: Frame) -> None:
+        if self._frame is not None:
+            self.dropped += 1
+        self._frame = frame
+        self._ready.set()
+
+    def close(self) -> None:
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Frame]:
+        """Wait for the newest frame; returns None once the buffer is closed."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._frame = self._frame, None
+        return frame
+
+
+class RateController:
+    """Suggests a client send interval from an EMA of processing latency."""
+
+    def __init__(self, initial_ms: int = 2000, alpha: float = 0.3, headroom: float = 1.25):
+        self.interval_ms = initial_ms
+        self.alpha = alpha
+        self.headroom = headroom
+        self._ema_ms: Optional[float] = None
+        self._last_dropped = 0
+
+    def observe(self, elapsed_ms: float, dropped: int) -> Optional[int]:
+        """Record one processed frame; returns a new interval when it should be sent to the client."""
+        self._ema_ms = elapsed_ms if self._ema_ms is None else self.alpha * elapsed_ms + (1 - self.alpha) * self._ema_ms
+        target = self._ema_ms * self.headroom
+        if dropped > self._last_dropped:
+            # Client is still outrunning us: back off harder than the latency alone suggests
+            target = max(target, self.interval_ms * 1.5)
+        self._last_dropped = dropped
+        target = int(min(max(target, FRAME_MIN_INTERVAL_MS), FRAME_MAX_INTERVAL_MS))
+        if abs(target - self.interval_ms) < 0.2 * self.interval_ms:
+            return None
+        self.interval_ms = target
+        return target
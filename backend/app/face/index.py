@@ -0,0 +1,350 @@
+"""
+Pluggable face indexes for attendance matching.
+
+Both backends keep embeddings in growable, contiguous float32 "buckets" with
+precomputed squared norms, support O(1) insert / delete by user id, and can
+be saved to / loaded from a single .npz file.
+
+- `BruteForceFaceIndex` has one bucket and scans every enrolled face (exact).
+- `IVFFaceIndex` clusters faces with k-means into ~sqrt(n) buckets and only
+  scans the `nprobe` buckets whose centroids are closest to the probe
+  (approximate, much faster at 100k faces).
+"""
+
+import os
+from threading import RLock
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from app.core.config import FACE_MATCH_TOLERANCE
+from app.face.embeddings import EMBEDDING_DIM, EMBEDDING_DTYPE
+
+
+@dataclass
+class FaceMatch:
+    user_id: int
+    distance: float
+
+
+def _sq_distances(probes: np.ndarray, vectors: np.ndarray, sq_norms: np.ndarray) -> np.ndarray:
+    """Squared euclidean distances (m, n) via |a|^2 + |b|^2 - 2ab."""
+    sq = np.einsum("ij,ij->i", probes, probes)[:, None] + sq_norms[None, :] - 2.0 * (probes @ vectors.T)
+    return np.maximum(sq, 0.0, out=sq)
+
+
+class _Bucket:
+    """Growable contiguous block of (user_id, embedding) rows with swap-remove."""
+
+    def __init__(self, capacity: int = 16):
+        self.ids = np.empty(capacity, dtype=np.int64)
+        self.vectors = np.empty((capacity, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+        self.sq_norms = np.empty(capacity, dtype=EMBEDDING_DTYPE)
+        self.size = 0
+
+    def _reserve(self, needed: int) -> None:
+        capacity = self.ids.shape[0]
+        if needed <= capacity:
+            return
+        new_capacity = max(needed, capacity * 2)
+        for name in ("ids", "vectors", "sq_norms"):
+            old = getattr(self, name)
+            grown = np.empty((new_capacity,) + old.shape[1:], dtype=old.dtype)
+            grown[: self.size] = old[: self.size]
+            setattr(self, name, grown)
+
+    def extend(self, ids: np.ndarray, vectors: np.ndarray) -> int:
+        """Append rows in bulk; returns the position of the first new row."""
+        start = self.size
+        self._reserve(start + ids.shape[0])
+        self.ids[start : start + ids.shape[0]] = ids
+        self.vectors[start : start + ids.shape[0]] = vectors
+        self.sq_norms[start : start + ids.shape[0]] = np.einsum("ij,ij->i", vectors, vectors)
+        self.size += ids.shape[0]
+        return start
+
+    def remove_at(self, pos: int) -> Optional[int]:
+        """Delete row `pos` by moving the last row into it; returns the moved user id."""
+        last = self.size - 1
+        moved = None
+        if pos != last:
+            self.ids[pos] = self.ids[last]
+            self.vectors[pos] = self.vectors[last]
+            self.sq_norms[pos] = self.sq_norms[last]
+            moved = int(self.ids[pos])
+        self.size = last
+        return moved
+
+    def view(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return self.ids[: self.size], self.vectors[: self.size], self.sq_norms[: self.size]
+
+
+class FaceIndex:
+    """Base class: bucket storage, id bookkeeping, matching and persistence."""
+
+    backend = "base"
+
+    def __init__(self, tolerance: float = FACE_MATCH_TOLERANCE):
+        self.tolerance = tolerance
+        self._buckets: List[_Bucket] = [_Bucket()]
+        self._where: Dict[int, Tuple[int, int]] = {}
+        # Enrollment threads mutate buckets while websocket handlers search them
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, user_id: int) -> bool:
+        return user_id in self._where
+
+    # --- Backend hooks ---
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        """Bucket number for each vector."""
+        return np.zeros(vectors.shape[0], dtype=np.int64)
+
+    def _buckets_to_scan(self, probe: np.ndarray) -> List[int]:
+        return list(range(len(self._buckets)))
+
+    # --- Mutation ---
+    def add(self, user_id: int, embedding: np.ndarray) -> None:
+        """Insert or replace one user's embedding."""
+        self.add_many(np.array([user_id], dtype=np.int64), np.asarray(embedding).reshape(1, -1))
+
+    def add_many(self, user_ids: np.ndarray, embeddings: np.ndarray) -> None:
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+        assignment = self._assign(embeddings)
+        with self._lock:
+            for user_id in user_ids.tolist():
+                if user_id in self._where:
+                    self.remove(user_id)
+            for bucket_no in np.unique(assignment).tolist():
+                rows = np.flatnonzero(assignment == bucket_no)
+                start = self._buckets[bucket_no].extend(user_ids[rows], embeddings[rows])
+                for offset, user_id in enumerate(user_ids[rows].tolist()):
+                    self._where[user_id] = (bucket_no, start + offset)
+
+    def remove(self, user_id: int) -> bool:
+        with self._lock:
+            location = self._where.pop(user_id, None)
+            if location is None:
+                return False
+            bucket_no, pos = location
+            moved = self._buckets[bucket_no].remove_at(pos)
+            if moved is not None:
+                self._where[moved] = (bucket_no, pos)
+            return True
+
+    # --- Search ---
+    def search(self, probes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Nearest enrolled user id and euclidean distance per probe (-1 / inf if empty)."""
+        probes = np.asarray(probes, dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+        best_ids = np.full(probes.shape[0], -1, dtype=np.int64)
+        best_sq = np.full(probes.shape[0], np.inf, dtype=EMBEDDING_DTYPE)
+        with self._lock:
+            for i, probe in enumerate(probes):
+                for bucket_no in self._buckets_to_scan(probe):
+                    ids, vectors, sq_norms = self._buckets[bucket_no].view()
+                    if ids.shape[0] == 0:
+                        continue
+                    sq = _sq_distances(probe[None, :], vectors, sq_norms)[0]
+                    j = int(sq.argmin())
+                    if sq[j] < best_sq[i]:
+                        best_sq[i] = sq[j]
+                        best_ids[i] = ids[j]
+        return best_ids, np.sqrt(best_sq)
+
+    def match(self, probes: np.ndarray) -> List[Optional[FaceMatch]]:
+        """For each probe, the closest enrolled face if it is within tolerance."""
+        ids, dists = self.search(probes)
+        return [
+            FaceMatch(user_id=int(u), distance=float(d)) if u >= 0 and d <= self.tolerance else None
+            for u, d in zip(ids, dists)
+        ]
+
+    def best_match(self, probes: np.ndarray) -> Optional[FaceMatch]:
+        """The single closest within-tolerance match across all probes in a frame."""
+        matches = [m for m in self.match(probes) if m is not None]
+        return min(matches, key=lambda m: m.distance) if matches else None
+
+    # --- Persistence ---
+    def _extra_state(self) -> dict:
+        return {}
+
+    def _restore_extra_state(self, state) -> None:
+        pass
+
+    def save(self, path: str) -> None:
+        """Write the whole index atomically to `path` (.npz)."""
+        with self._lock:
+            ids = np.concatenate([b.view()[0] for b in self._buckets])
+            vectors = np.concatenate([b.view()[1] for b in self._buckets])
+            buckets = np.concatenate([np.full(b.size, n, dtype=np.int64) for n, b in enumerate(self._buckets)])
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            np.savez(
+                f,
+                backend=np.array(self.backend),
+                nbuckets=np.array(len(self._buckets)),
+                ids=ids,
+                vectors=vectors,
+                buckets=buckets,
+                **self._extra_state(),
+            )
+        os.replace(tmp_path, path)
+
+    def sync(self, user_ids: np.ndarray, embeddings: np.ndarray) -> int:
+        """
+        Make the index hold exactly `(user_ids, embeddings)`, touching only rows
+        that were added, changed or removed. Returns the number of rows touched.
+        """
+        user_ids = np.asarray(user_ids, dtype=np.int64)
+        embeddings = np.asarray(embeddings, dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+        with self._lock:
+            have_ids = np.concatenate([b.view()[0] for b in self._buckets])
+            have_vectors = np.concatenate([b.view()[1] for b in self._buckets])
+            order = np.argsort(have_ids)
+            have_ids, have_vectors = have_ids[order], have_vectors[order]
+
+            if have_ids.shape[0]:
+                pos = np.searchsorted(have_ids, user_ids).clip(max=have_ids.shape[0] - 1)
+                known = have_ids[pos] == user_ids
+            else:
+                pos = np.zeros(user_ids.shape[0], dtype=np.int64)
+                known = np.zeros(user_ids.shape[0], dtype=bool)
+            changed = ~known
+            changed[known] = np.any(have_vectors[pos[known]] != embeddings[known], axis=1)
+            stale = np.setdiff1d(have_ids, user_ids, assume_unique=True)
+
+            for user_id in stale.tolist():
+                self.remove(user_id)
+            if changed.any():
+                self.add_many(user_ids[changed], embeddings[changed])
+            return int(stale.shape[0] + changed.sum())
+
+
+class BruteForceFaceIndex(FaceIndex):
+    """Exact search over every enrolled face in one (m, n) computation."""
+
+    backend = "brute"
+
+    def search(self, probes: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        probes = np.asarray(probes, dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+        with self._lock:
+            ids, vectors, sq_norms = self._buckets[0].view()
+            if ids.shape[0] == 0:
+                return np.full(probes.shape[0], -1, dtype=np.int64), np.full(probes.shape[0], np.inf)
+            sq = _sq_distances(probes, vectors, sq_norms)
+            best = sq.argmin(axis=1)
+            return ids[best].copy(), np.sqrt(sq[np.arange(sq.shape[0]), best])
+
+
+class IVFFaceIndex(FaceIndex):
+    """
+    Inverted-file index: k-means centroids partition the faces; a probe only
+    scans its `nprobe` nearest partitions. New faces are routed to their
+    nearest centroid; call `build()` again to retrain after heavy growth.
+    """
+
+    backend = "ivf"
+
+    def __init__(
+        self,
+        nprobe: int = 8,
+        tolerance: float = FACE_MATCH_TOLERANCE,
+        min_train_size: int = 2000,
+        train_iters: int = 10,
+        seed: int = 0,
+    ):
+        super().__init__(tolerance)
+        self.nprobe = nprobe
+        self.min_train_size = min_train_size
+        self.train_iters = train_iters
+        self.seed = seed
+        self.centroids = np.empty((0, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+
+    def _assign(self, vectors: np.ndarray) -> np.ndarray:
+        if self.centroids.shape[0] == 0:
+            return np.zeros(vectors.shape[0], dtype=np.int64)
+        c_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        out = np.empty(vectors.shape[0], dtype=np.int64)
+        for start in range(0, vectors.shape[0], 8192):
+            chunk = vectors[start : start + 8192]
+            out[start : start + chunk.shape[0]] = _sq_distances(chunk, self.centroids, c_sq).argmin(axis=1)
+        return out
+
+    def _buckets_to_scan(self, probe: np.ndarray) -> List[int]:
+        if self.centroids.shape[0] == 0:
+            return [0]
+        c_sq = np.einsum("ij,ij->i", self.centroids, self.centroids)
+        sq = _sq_distances(probe[None, :], self.centroids, c_sq)[0]
+        nprobe = min(self.nprobe, sq.shape[0])
+        return np.argpartition(sq, nprobe - 1)[:nprobe].tolist()
+
+    def _train(self, vectors: np.ndarray) -> None:
+        nlist = int(np.sqrt(vectors.shape[0]))
+        rng = np.random.default_rng(self.seed)
+        sample = vectors[rng.choice(vectors.shape[0], min(vectors.shape[0], nlist * 64), replace=False)]
+        centroids = sample[rng.choice(sample.shape[0], nlist, replace=False)].copy()
+        for _ in range(self.train_iters):
+            c_sq = np.einsum("ij,ij->i", centroids, centroids)
+            labels = _sq_distances(sample, centroids, c_sq).argmin(axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, labels, sample)
+            counts = np.bincount(labels, minlength=nlist)
+            filled = counts > 0
+            centroids[filled] = sums[filled] / counts[filled, None]
+        self.centroids = centroids
+
+    def build(self, user_ids: np.ndarray, embeddings: np.ndarray) -> None:
+        """(Re)train centroids and bulk-load all faces."""
+        embeddings = np.asarray(embeddings, dtype=EMBEDDING_DTYPE).reshape(-1, EMBEDDING_DIM)
+        with self._lock:
+            if embeddings.shape[0] >= self.min_train_size:
+                self._train(embeddings)
+            else:
+                self.centroids = np.empty((0, EMBEDDING_DIM), dtype=EMBEDDING_DTYPE)
+            self._buckets = [_Bucket() for _ in range(max(1, self.centroids.shape[0]))]
+            self._where = {}
+            self.add_many(user_ids, embeddings)
+
+    def _extra_state(self) -> dict:
+        return {"centroids": self.centroids, "nprobe": np.array(self.nprobe)}
+
+    def _restore_extra_state(self, state) -> None:
+        self.centroids = state["centroids"].astype(EMBEDDING_DTYPE)
+        self.nprobe = int(state["nprobe"])
+
+
+FACE_INDEX_BACKENDS = {
+    BruteForceFaceIndex.backend: BruteForceFaceIndex,
+    IVFFaceIndex.backend: IVFFaceIndex,
+}
+
+
+def create_face_index(backend: str, user_ids: np.ndarray, embeddings: np.ndarray) -> FaceIndex:
+    """Build a fresh index of the given backend from `(ids, matrix)`."""
+    if backend not in FACE_INDEX_BACKENDS:
+        raise ValueError(f"Unknown face index backend: {backend}")
+    index = FACE_INDEX_BACKENDS[backend]()
+    if isinstance(index, IVFFaceIndex):
+        index.build(user_ids, embeddings)
+    else:
+        index.add_many(user_ids, embeddings)
+    return index
+
+
+def load_face_index_file(path: str) -> FaceIndex:
+    """Restore an index written by `FaceIndex.save`, without retraining."""
+    with np.load(path, allow_pickle=False) as state:
+        index = FACE_INDEX_BACKENDS[str(state["backend"])]()
+        index._restore_extra_state(state)
+        index._buckets = [_Bucket() for _ in range(int(state["nbuckets"]))]
+        ids, vectors, buckets = state["ids"], state["vectors"], state["buckets"]
+        for bucket_no in range(len(index._buckets)):
+            rows = np.flatnonzero(buckets == bucket_no)
+            start = index._buckets[bucket_no].extend(ids[rows], vectors[rows])
+            for offset, user_id in enumerate(ids[rows].tolist()):
+                index._where[user_id] = (bucket_no, start + offset)
+    return index
@@ -0,0 +1,114 @@
+"""
+Process-wide face index for the attendance subsystem.
+
+On first use the index is restored from `FACE_INDEX_PATH` (skipping IVF
+training) and reconciled against a column-only query of enrolled faces, so
+only rows enrolled, re-enrolled or deleted since the snapshot are touched.
+Without a usable snapshot it is built from scratch. Enrollments and user
+deletions update it in place, and it is written back to disk on shutdown.
+
+Each worker process keeps its own copy. Face writes bump the "faces" version
+counter (app/core/http_cache.py) in the same transaction, and at most every
+`FACE_INDEX_SYNC_SECONDS` `get_face_index` compares that version with the one
+its copy was synced at. On a change it runs the same `sync` as a snapshot
+load, so enrollments and deletions on other workers show up here too.
+"""
+
+import os
+import time
+from threading import Lock
+from typing import Optional
+
+import numpy as np
+from sqlmodel import Session, select, or_
+
+from app.core.config import FACE_INDEX_BACKEND, FACE_INDEX_PATH, FACE_INDEX_SYNC_SECONDS
+from app.core.http_cache import FACES_KEY
+from app.core.secure_error_handler import SecureErrorHandler
+from app.db.models import ResourceVersion, User
+from app.face.embeddings import stack_embeddings
+from app.face.index import FaceIndex, create_face_index, load_face_index_file
+
+_enrolled = or_(User.face_embedding != None, User.face_encoding != None)
+
+_index: Optional[FaceIndex] = None
+_index_version: Optional[int] = None  # "faces" version the index was last synced at
+_checked_at = 0.0
+_index_lock = Lock()
+
+
+def _enrolled_embeddings(db: Session):
+    """(user_ids, matrix) from a column-only query (no User ORM objects)."""
+    rows = db.exec(select(User.id, User.face_embedding, User.face_encoding).where(_enrolled)).all()
+    return stack_embeddings(rows)
+
+
+def build_face_index(db: Session, backend: str = FACE_INDEX_BACKEND) -> FaceIndex:
+    user_ids, matrix = _enrolled_embeddings(db)
+    return create_face_index(backend, user_ids, matrix)
+
+
+def _load_persisted_index(db: Session) -> Optional[FaceIndex]:
+    if not FACE_INDEX_PATH or not os.path.exists(FACE_INDEX_PATH):
+        return None
+    try:
+        index = load_face_index_file(FACE_INDEX_PATH)
+    except Exception as e:
+        SecureErrorHandler.log_error(e, "Face index load")
+        return None
+    if index.backend != FACE_INDEX_BACKEND:
+        return None
+    index.sync(*_enrolled_embeddings(db))
+    return index
+
+
+def _faces_version(db: Session) -> int:
+    return db.exec(select(ResourceVersion.version).where(ResourceVersion.key == FACES_KEY)).first() or 0
+
+
+def get_face_index(db: Session) -> FaceIndex:
+    """
+    Process-wide index, loaded from disk or the database on first use and
+    synced when another worker changed the enrolled faces.
+    """
+    global _index, _index_version, _checked_at
+    with _index_lock:
+        now = time.monotonic()
+        if _index is not None and now - _checked_at < FACE_INDEX_SYNC_SECONDS:
+            return _index
+        _checked_at = now
+        # Read before the embeddings: a write in between is picked up by the next check
+        version = _faces_version(db)
+        if _index is None:
+            _index = _load_persisted_index(db)
+            if _index is None:
+                _index = build_face_index(db)
+        elif version != _index_version:
+            _index.sync(*_enrolled_embeddings(db))
+        _index_version = version
+        return _index
+
+
+def add_face_to_index(user_id: int, embedding: np.ndarray) -> None:
+    """Insert / replace a user's face after enrollment (no-op until the index is loaded)."""
+    with _index_lock:
+        if _index is not None:
+            _index.add(user_id, embedding)
+
+
+def remove_face_from_index(user_id: int) -> None:
+    """Drop a user's face, e.g. when the account is deleted."""
+    with _index_lock:
+        if _index is not None:
+            _index.remove(user_id)
+
+
+def save_face_index() -> None:
+    """Persist the in-memory index so the next start skips the rebuild."""
+    with _index_lock:
+        if _index is None or not FACE_INDEX_PATH:
+            return
+        try:
+            _index.save(FACE_INDEX_PATH)
+        except Exception as e:
+            SecureErrorHandler.log_error(e, "Face index save")
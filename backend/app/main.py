@@ -3,13 +3,34 @@ from contextlib import asynccontextmanager
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.db.database import create_db_and_tables
-from app.api.routes import users, clubs, events, admin, photos, attendance, verification, analytics, forums, role_requests
+from app.face.matcher import save_face_index
+from app.face.frames import shutdown_frame_pool
+from app.core.attendance_writer import attendance_writer
+from app.core.otp_store import otp_store
+from app.core.messaging import messaging_gateway
+from app.core.trending import trending
+from app.core.rollups import dashboard_rollup
+from app.core.daily_stats import backfill_if_empty
+from app.core.user_import import shutdown_import_pool
+from app.api.routes import users, clubs, events, admin, photos, attendance, verification, analytics, forums, role_requests, exports, realtime
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Creating database and tables...")
     create_db_and_tables()
+    trending.rebuild()
+    backfill_if_empty()
+    attendance_writer.start()
+    otp_store.start()
+    dashboard_rollup.start()
     yield
+    dashboard_rollup.stop()
+    otp_store.stop()
+    await messaging_gateway.aclose()
+    await attendance_writer.stop()
+    shutdown_frame_pool()
+    shutdown_import_pool()
+    save_face_index()
     print("Application shutdown.")
 
 app = FastAPI(
@@ -41,6 +62,8 @@ app.include_router(verification.router, prefix="/verification", tags=["Verificat
 app.include_router(analytics.router, prefix="/analytics", tags=["Analytics"])
 app.include_router(forums.router, prefix="/forums", tags=["Forums"])
 app.include_router(role_requests.router, prefix="/role-requests", tags=["Role Requests"])
+app.include_router(exports.router, prefix="/exports", tags=["Exports"])
+app.include_router(realtime.router, prefix="/realtime", tags=["Realtime"])
 
 @app.get("/", tags=["Root"])
 def read_root():
@@ -74,6 +74,9 @@ class DashboardStats(BaseModel):
     active_clubs: int
     total_events: int
     pending_clubs: int = 0
+    # Rollup freshness: when the counts were last recomputed from scratch
+    reconciled_at: Optional[datetime] = None
+    age_seconds: Optional[float] = None
 
 class ClubAdminView(ClubPublic):
     member_count: int
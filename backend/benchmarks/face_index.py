@@ -0,0 +1,86 @@
+"""
+Face index benchmark: recall@1 and per-probe latency of the IVF backend at
+several `nprobe` settings, against exact brute force, plus build / save /
+load times.
+
+Run from the backend folder:
+    python -m benchmarks.face_index [n_users]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from app.face.embeddings import EMBEDDING_DIM
+from app.face.index import BruteForceFaceIndex, IVFFaceIndex, load_face_index_file
+
+PROBES = 500
+NPROBES = (1, 2, 4, 8, 16, 32)
+
+
+def _clustered_embeddings(n: int, rng: np.random.Generator) -> np.ndarray:
+    # Real face embeddings are clumpy (age, ethnicity, lighting), not uniform noise
+    centers = rng.normal(size=(64, EMBEDDING_DIM)).astype(np.float32)
+    vectors = centers[rng.integers(0, 64, n)] + rng.normal(scale=0.6, size=(n, EMBEDDING_DIM)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors
+
+
+def _per_probe_ms(index, probes) -> float:
+    start = time.perf_counter()
+    for probe in probes:
+        index.search(probe)
+    return (time.perf_counter() - start) * 1e3 / probes.shape[0]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    rng = np.random.default_rng(0)
+    embeddings = _clustered_embeddings(n, rng)
+    ids = np.arange(1, n + 1, dtype=np.int64)
+    picked = rng.integers(0, n, PROBES)
+    probes = embeddings[picked] + rng.normal(scale=0.02, size=(PROBES, EMBEDDING_DIM)).astype(np.float32)
+
+    brute = BruteForceFaceIndex()
+    brute.add_many(ids, embeddings)
+    truth, _ = brute.search(probes)
+    brute_ms = _per_probe_ms(brute, probes)
+
+    ivf = IVFFaceIndex()
+    start = time.perf_counter()
+    ivf.build(ids, embeddings)
+    build_s = time.perf_counter() - start
+
+    print(f"{n} enrolled faces, {PROBES} probes, {ivf.centroids.shape[0]} IVF lists (build {build_s:.2f}s)\n")
+    print(f"{'backend':<14} {'recall@1':>9} {'ms/probe':>9} {'speedup':>8}")
+    print(f"{'brute':<14} {1.0:>9.3f} {brute_ms:>9.3f} {1.0:>7.1f}x")
+    for nprobe in NPROBES:
+        ivf.nprobe = nprobe
+        found, _ = ivf.search(probes)
+        recall = float(np.mean(found == truth))
+        ms = _per_probe_ms(ivf, probes)
+        print(f"{f'ivf nprobe={nprobe}':<14} {recall:>9.3f} {ms:>9.3f} {brute_ms / ms:>7.1f}x")
+
+    path = os.path.join(tempfile.mkdtemp(), "face_index.npz")
+    start = time.perf_counter()
+    ivf.save(path)
+    save_s = time.perf_counter() - start
+    start = time.perf_counter()
+    restored = load_face_index_file(path)
+    load_s = time.perf_counter() - start
+    assert len(restored) == n
+    print(f"\nsave {save_s * 1e3:.0f}ms, load {load_s * 1e3:.0f}ms ({os.path.getsize(path) / 1e6:.1f} MB) vs rebuild {build_s * 1e3:.0f}ms")
+
+    start = time.perf_counter()
+    for user_id, vector in zip(range(n + 1, n + 1001), _clustered_embeddings(1000, rng)):
+        ivf.add(user_id, vector)
+    for user_id in range(1, 1001):
+        ivf.remove(user_id)
+    print(f"1000 inserts + 1000 deletes: {(time.perf_counter() - start) * 1e3:.1f}ms")
+
+
+if __name__ == "__main__":
+    main()
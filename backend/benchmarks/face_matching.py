@@ -0,0 +1,77 @@
+"""
+Face matching benchmark: legacy text encodings + per-face comparison versus
+binary float32 blobs + the vectorized brute-force face index.
+
+Run from the backend folder:
+    python -m benchmarks.face_matching
+"""
+
+import time
+
+import numpy as np
+
+from app.face.embeddings import EMBEDDING_DIM, encoding_to_bytes, legacy_string_to_encoding, stack_embeddings
+from app.face.index import BruteForceFaceIndex
+
+SIZES = (1_000, 10_000, 50_000)
+PROBES = 20
+TOLERANCE = 0.5
+
+
+def _timed(fn, repeat=1):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat, result
+
+
+def _legacy_compare_faces(known, probe):
+    # Same semantics as face_recognition.compare_faces + "first True wins"
+    matches = list(np.linalg.norm(np.array(known) - probe, axis=1) <= TOLERANCE)
+    return matches.index(True) if True in matches else None
+
+
+def run(n: int, rng: np.random.Generator) -> dict:
+    enrolled = rng.normal(size=(n, EMBEDDING_DIM)).astype(np.float32)
+    enrolled /= np.linalg.norm(enrolled, axis=1, keepdims=True)
+    probes = enrolled[rng.integers(0, n, PROBES)] + rng.normal(scale=0.01, size=(PROBES, EMBEDDING_DIM)).astype(np.float32)
+
+    legacy_rows = [",".join(map(str, row)) for row in enrolled]
+    blob_rows = [(i, encoding_to_bytes(row), None) for i, row in enumerate(enrolled)]
+
+    legacy_load, known = _timed(lambda: [legacy_string_to_encoding(s) for s in legacy_rows])
+    blob_load, (ids, matrix) = _timed(lambda: stack_embeddings(blob_rows))
+    matcher = BruteForceFaceIndex(tolerance=TOLERANCE)
+    matcher.add_many(ids, matrix)
+
+    legacy_match, _ = _timed(lambda: [_legacy_compare_faces(known, p) for p in probes])
+    vector_match, _ = _timed(lambda: [matcher.match(p) for p in probes], repeat=3)
+    batch_match, _ = _timed(lambda: matcher.match(probes), repeat=3)
+
+    return {
+        "n": n,
+        "legacy_load_ms": legacy_load * 1e3,
+        "blob_load_ms": blob_load * 1e3,
+        "legacy_match_ms": legacy_match * 1e3 / PROBES,
+        "vector_match_ms": vector_match * 1e3 / PROBES,
+        "batch_match_ms": batch_match * 1e3 / PROBES,
+        "matrix_mb": matrix.nbytes / 1e6,
+    }
+
+
+def main():
+    rng = np.random.default_rng(0)
+    header = f"{'users':>8} {'load text':>11} {'load blob':>11} {'match legacy':>13} {'match vec':>11} {'match batch':>12} {'matrix MB':>10}"
+    print(header)
+    print("-" * len(header))
+    for n in SIZES:
+        r = run(n, rng)
+        print(
+            f"{r['n']:>8} {r['legacy_load_ms']:>9.1f}ms {r['blob_load_ms']:>9.1f}ms "
+            f"{r['legacy_match_ms']:>11.2f}ms {r['vector_match_ms']:>9.2f}ms {r['batch_match_ms']:>10.2f}ms {r['matrix_mb']:>10.1f}"
+        )
+    print("\nmatch times are per probe face; load times are per websocket connection before this change.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Local stand-in for the messaging provider's Messages endpoint.
+
+Accepts the same form POST as Twilio (`/2010-04-01/Accounts/{sid}/Messages.json`),
+waits `--latency-ms` (plus optional jitter) and answers with a message sid.
+Numbers listed in `--reject` get a 400 like an invalid recipient, and
+`--error-rate` returns random 503s.
+
+Run from the backend folder, then point the app at it:
+    python -m benchmarks.fake_provider --port 8025 --latency-ms 300
+    MESSAGING_API_BASE_URL=http://127.0.0.1:8025 TWILIO_ACCOUNT_SID=AC... uvicorn app.main:app
+"""
+
+import argparse
+import asyncio
+import itertools
+import random
+import threading
+import time
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def create_fake_provider(latency_ms: float = 200, jitter_ms: float = 0, error_rate: float = 0.0, reject=()) -> FastAPI:
+    app = FastAPI(title="Fake messaging provider")
+    app.state.sent = []
+    counter = itertools.count(1)
+    rejected = {f"whatsapp:{number}" for number in reject}
+
+    @app.post("/2010-04-01/Accounts/{account_sid}/Messages.json")
+    async def create_message(account_sid: str, request: Request):
+        form = await request.form()
+        await asyncio.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+        if form.get("To") in rejected:
+            return JSONResponse({"code": 21211, "message": "Invalid 'To' Phone Number", "status": 400}, status_code=400)
+        if random.random() < error_rate:
+            return JSONResponse({"code": 20503, "message": "Service Unavailable", "status": 503}, status_code=503)
+        sid = f"SM{next(counter):032d}"
+        app.state.sent.append({"sid": sid, "to": form.get("To"), "from": form.get("From"), "body": form.get("Body")})
+        return JSONResponse({"sid": sid, "status": "queued", "to": form.get("To")}, status_code=201)
+
+    return app
+
+
+class FakeProviderServer:
+    """Runs the fake provider in a background thread (for benchmarks and local checks)."""
+
+    def __init__(self, port: int = 8025, **options):
+        self.app = create_fake_provider(**options)
+        self.url = f"http://127.0.0.1:{port}"
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host="127.0.0.1", port=port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, daemon=True)
+
+    def __enter__(self) -> "FakeProviderServer":
+        self._thread.start()
+        while not self._server.started:
+            time.sleep(0.01)
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._server.should_exit = True
+        self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8025)
+    parser.add_argument("--latency-ms", type=float, default=200)
+    parser.add_argument("--jitter-ms", type=float, default=0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--reject", nargs="*", default=[], help="E.164 numbers to reject with a 400")
+    args = parser.parse_args()
+    app = create_fake_provider(args.latency_ms, args.jitter_ms, args.error_rate, args.reject)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -0,0 +1,126 @@
+"""
+Forum listing benchmark with 100k replies: the old list scans versus
+per-post COUNT(*) subqueries versus the denormalized counter columns.
+
+Builds a throwaway SQLite database in a temp directory. Run from the
+backend folder:
+    python -m benchmarks.forum_counts
+"""
+
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, insert, update
+from sqlmodel import Session, SQLModel, create_engine, func, select
+
+from app.db.models import User, ForumPost, ForumReply, ForumPostLike
+
+POSTS = 2_000
+REPLIES = 100_000
+USERS = 500
+LIKES = 50_000
+PAGE = 20
+REPEAT = 20
+
+
+def _timed(fn, repeat=REPEAT):
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def _seed(engine, rng: random.Random):
+    now = datetime.utcnow()
+    users = [{"id": i, "email": f"u{i}@example.com", "full_name": f"User {i}", "hashed_password": "x", "role": "student",
+              "whatsapp_verified": False, "whatsapp_consent": False} for i in range(1, USERS + 1)]
+    posts = [{"id": i, "title": f"Post {i}", "content": "...", "category": "general", "author_id": rng.randint(1, USERS),
+              "created_at": now - timedelta(minutes=POSTS - i)} for i in range(1, POSTS + 1)]
+    replies = [{"id": i, "content": "...", "post_id": rng.randint(1, POSTS), "author_id": rng.randint(1, USERS),
+                "created_at": now} for i in range(1, REPLIES + 1)]
+    likes = {(rng.randint(1, POSTS), rng.randint(1, USERS)) for _ in range(LIKES)}
+    reply_counts, like_counts = {}, {}
+    for r in replies:
+        reply_counts[r["post_id"]] = reply_counts.get(r["post_id"], 0) + 1
+    for post_id, _ in likes:
+        like_counts[post_id] = like_counts.get(post_id, 0) + 1
+    for p in posts:
+        p["reply_count"] = reply_counts.get(p["id"], 0)
+        p["like_count"] = like_counts.get(p["id"], 0)
+    with Session(engine) as db:
+        db.execute(insert(User), users)
+        db.execute(insert(ForumPost), posts)
+        db.execute(insert(ForumReply), replies)
+        db.execute(insert(ForumPostLike), [{"post_id": p, "user_id": u, "created_at": now} for p, u in likes])
+        db.commit()
+    return posts, replies, [{"post_id": p, "user_id": u} for p, u in likes]
+
+
+def main():
+    rng = random.Random(7)
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'forums.db')}")
+        SQLModel.metadata.create_all(engine)
+        posts, replies, likes = _seed(engine, rng)
+        print(f"{POSTS:,} posts, {REPLIES:,} replies, {len(likes):,} likes; one page = {PAGE} posts\n")
+
+        # 1. Old in-memory lists: a page of posts counts by scanning every reply and like
+        def list_page():
+            page = sorted(posts, key=lambda p: p["created_at"], reverse=True)[:PAGE]
+            return [(len([r for r in replies if r["post_id"] == p["id"]]),
+                     len([l for l in likes if l["post_id"] == p["id"]])) for p in page]
+
+        def list_toggle():
+            target = likes[-1]
+            return next((l for l in likes if l["post_id"] == target["post_id"] and l["user_id"] == target["user_id"]), None)
+
+        # 2. Tables, counting with a correlated COUNT(*) per post
+        replies_count = select(func.count()).where(ForumReply.post_id == ForumPost.id).scalar_subquery()
+        likes_count = select(func.count()).where(ForumPostLike.post_id == ForumPost.id).scalar_subquery()
+        count_stmt = (
+            select(ForumPost.id, User.full_name, replies_count, likes_count)
+            .join(User, User.id == ForumPost.author_id)
+            .order_by(ForumPost.created_at.desc(), ForumPost.id.desc()).limit(PAGE)
+        )
+        # 3. Counter columns: the counts come back with the page in one read
+        counter_stmt = (
+            select(ForumPost.id, User.full_name, ForumPost.reply_count, ForumPost.like_count)
+            .join(User, User.id == ForumPost.author_id)
+            .order_by(ForumPost.created_at.desc(), ForumPost.id.desc()).limit(PAGE)
+        )
+
+        with Session(engine) as db:
+            t_list, expected = _timed(list_page, repeat=3)
+            t_count, by_count = _timed(lambda: db.exec(count_stmt).all())
+            t_counter, by_counter = _timed(lambda: db.exec(counter_stmt).all())
+            assert [(r[2], r[3]) for r in by_count] == [(r[2], r[3]) for r in by_counter] == expected
+
+            t_list_toggle, _ = _timed(list_toggle, repeat=3)
+            post_id, user_id = likes[-1]["post_id"], likes[-1]["user_id"]
+
+            def db_toggle():
+                # Unlike + like again, each with its counter update, as the endpoint does
+                for delta in (-1, 1):
+                    if delta < 0:
+                        db.execute(delete(ForumPostLike).where(ForumPostLike.post_id == post_id, ForumPostLike.user_id == user_id))
+                    else:
+                        db.add(ForumPostLike(post_id=post_id, user_id=user_id))
+                        db.flush()
+                    db.execute(update(ForumPost).where(ForumPost.id == post_id).values(like_count=ForumPost.like_count + delta))
+                    db.commit()
+
+            t_db_toggle, _ = _timed(db_toggle)
+
+        print(f"{'listing page (old list scans)':<40} {t_list:9.2f} ms")
+        print(f"{'listing page (COUNT(*) subqueries)':<40} {t_count:9.2f} ms")
+        print(f"{'listing page (counter columns)':<40} {t_counter:9.2f} ms")
+        print(f"{'like lookup (old list scan)':<40} {t_list_toggle:9.2f} ms")
+        print(f"{'unlike + like (PK + counter, 2 commits)':<40} {t_db_toggle:9.2f} ms")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
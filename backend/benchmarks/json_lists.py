@@ -0,0 +1,100 @@
+"""
+List serialization benchmark at 10k rows: FastAPI's default path (ORM
+objects -> response-model validation -> jsonable_encoder -> json.dumps)
+versus the fast path in app/core/fast_json.py (column rows -> dicts ->
+orjson), for the event list and the club list with its nested admin.
+
+Builds a throwaway SQLite database in a temp directory. Run from the
+backend folder:
+    python -m benchmarks.json_lists
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import insert
+from sqlmodel import Session, SQLModel, create_engine, select
+
+from app.core import fast_json
+from app.db.models import Club, Event, User
+from app.schemas import ClubPublic, EventPublic
+
+ROWS = 10_000
+USERS = 200
+REPEAT = 10
+
+EVENT_ROWS = fast_json.RowShape({
+    "name": Event.name, "description": Event.description, "date": Event.date, "location": Event.location,
+    "id": Event.id, "club_id": Event.club_id,
+})
+CLUB_ROWS = fast_json.RowShape({
+    "name": Club.name, "description": Club.description, "id": Club.id, "admin_id": Club.admin_id,
+    "admin": {"id": User.id, "email": User.email, "full_name": User.full_name, "role": User.role},
+})
+
+
+def _timed(fn, repeat=REPEAT):
+    fn()  # Warm-up (adapter build, statement cache)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn()
+    return (time.perf_counter() - start) / repeat * 1000, result
+
+
+def _seed(engine):
+    now = datetime.utcnow()
+    users = [{"id": i, "email": f"u{i}@example.com", "full_name": f"User {i}", "hashed_password": "x", "role": "club_admin",
+              "whatsapp_verified": False, "whatsapp_consent": False, "created_at": now, "updated_at": now}
+             for i in range(1, USERS + 1)]
+    clubs = [{"id": i, "name": f"Club {i}", "description": "A club " * 8, "admin_id": i % USERS + 1, "category": "General",
+              "updated_at": now} for i in range(1, ROWS + 1)]
+    events = [{"id": i, "name": f"Event {i}", "description": "An event " * 8, "date": now + timedelta(hours=i),
+               "location": "Main Hall", "club_id": i % ROWS + 1, "updated_at": now} for i in range(1, ROWS + 1)]
+    with Session(engine) as db:
+        db.execute(insert(User), users)
+        db.execute(insert(Club), clubs)
+        db.execute(insert(Event), events)
+        db.commit()
+
+
+def _default_path(db: Session, statement, response_model) -> bytes:
+    # What FastAPI does for a route returning ORM objects with response_model=List[...]
+    objects = db.exec(statement).all()
+    validated = TypeAdapter(response_model).validate_python(objects, from_attributes=True)
+    body = json.dumps(jsonable_encoder(validated), ensure_ascii=False, separators=(",", ":")).encode()
+    db.expunge_all()
+    return body
+
+
+def main():
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'lists.db')}")
+        SQLModel.metadata.create_all(engine)
+        _seed(engine)
+        print(f"{ROWS:,} rows per list; orjson {'installed' if fast_json.orjson else 'missing (adapter fallback)'}\n")
+
+        with Session(engine) as db:
+            cases = [
+                ("events", select(Event).order_by(Event.id), List[EventPublic],
+                 lambda: fast_json.dumps(EVENT_ROWS.dicts(db.exec(EVENT_ROWS.select().order_by(Event.id)).all()), List[EventPublic])),
+                ("clubs + admin", select(Club).order_by(Club.id), List[ClubPublic],
+                 lambda: fast_json.dumps(CLUB_ROWS.dicts(db.exec(
+                     CLUB_ROWS.select().join(User, User.id == Club.admin_id).order_by(Club.id)).all()), List[ClubPublic])),
+            ]
+            for name, statement, model, fast in cases:
+                t_default, slow_body = _timed(lambda: _default_path(db, statement, model))
+                t_fast, fast_body = _timed(fast)
+                assert json.loads(slow_body) == json.loads(fast_body)
+                print(f"{name + ' (default path)':<32} {t_default:9.2f} ms")
+                print(f"{name + ' (fast path)':<32} {t_fast:9.2f} ms   {t_default / t_fast:5.1f}x, {len(fast_body) / 1024:,.0f} KB\n")
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Messaging benchmark against the local fake provider.
+
+Compares the old pattern (a blocking HTTP client, one call per message, either
+sequentially like the announcement loop or from a 40-thread pool like
+concurrent sync `send-otp` requests) with the shared async gateway.
+
+Run from the backend folder:
+    python -m benchmarks.messaging
+"""
+
+import asyncio
+import logging
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+from app.core.messaging import MessagingGateway
+from benchmarks.fake_provider import FakeProviderServer
+
+LATENCY_MS = 100
+MESSAGES = 400
+THREADPOOL_SIZE = 40  # Starlette's default threadpool for sync endpoints
+SID, TOKEN, FROM = "ACbenchmark", "token", "whatsapp:+10000000000"
+
+
+def _summary(name, total_s, latencies_ms, n):
+    latencies_ms = sorted(latencies_ms)
+    p95 = latencies_ms[int(0.95 * (len(latencies_ms) - 1))]
+    print(f"{name:<34} {total_s:7.2f}s {n / total_s:8.1f} msg/s   p50 {statistics.median(latencies_ms):6.0f} ms   p95 {p95:6.0f} ms")
+
+
+def blocking(url: str, n: int, workers: int, name: str):
+    session = requests.Session()
+    session.auth = (SID, TOKEN)
+
+    def send(i):
+        started = time.perf_counter()
+        session.post(
+            f"{url}/2010-04-01/Accounts/{SID}/Messages.json",
+            data={"From": FROM, "To": f"whatsapp:+9100000{i:05d}", "Body": "benchmark"},
+            timeout=10,
+        ).raise_for_status()
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        latencies = list(pool.map(send, range(n)))
+    _summary(name, time.perf_counter() - started, latencies, n)
+
+
+async def gateway(url: str, n: int, concurrency: int):
+    gw = MessagingGateway(SID, TOKEN, FROM, base_url=url, max_connections=concurrency, max_concurrency=concurrency)
+
+    async def send(i):
+        started = time.perf_counter()
+        await gw.send_whatsapp(f"+9100000{i:05d}", "benchmark")
+        return (time.perf_counter() - started) * 1000
+
+    await send(0)  # Open the first connection outside the timing
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(send(i) for i in range(n)))
+    _summary(f"async gateway (concurrency {concurrency})", time.perf_counter() - started, latencies, n)
+    await gw.aclose()
+
+
+def main():
+    # requests' default pool (10) is what the sync SDK used too; don't log every discarded connection
+    logging.getLogger("urllib3").setLevel(logging.ERROR)
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+    print(f"{MESSAGES} messages, provider latency {LATENCY_MS} ms\n")
+    with FakeProviderServer(port=8025, latency_ms=LATENCY_MS) as provider:
+        blocking(provider.url, MESSAGES // 10, 1, f"blocking, sequential ({MESSAGES // 10} msgs)")
+        blocking(provider.url, MESSAGES, THREADPOOL_SIZE, f"blocking, {THREADPOOL_SIZE} threads")
+        for concurrency in (20, 100):
+            asyncio.run(gateway(provider.url, MESSAGES, concurrency))
+    print("\nBlocking sends hold one worker thread per in-flight message; the gateway holds none.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.pool import StaticPool
+from sqlmodel import Session, SQLModel, create_engine
+
+from app.api.routes.role_requests import RoleRequestReview, _apply_reviews
+from app.db.models import RoleRequest, RoleRequestStatus, User, UserRole
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _user(db, email, role=UserRole.student):
+    user = User(email=email, full_name=email, hashed_password="x", role=role)
+    db.add(user)
+    db.commit()
+    db.refresh(user)
+    return user
+
+
+def _request(db, user, created_at):
+    request = RoleRequest(
+        user_id=user.id, requested_role=UserRole.club_admin, current_role=user.role,
+        reason="r", created_at=created_at,
+    )
+    db.add(request)
+    db.commit()
+    db.refresh(request)
+    return request
+
+
+def _statuses(db, *requests):
+    db.expire_all()
+    return [db.get(RoleRequest, r.id).status for r in requests]
+
+
+APPROVE = RoleRequestReview(status=RoleRequestStatus.approved)
+
+
+@pytest.mark.parametrize("newest_first", [False, True])
+def test_bulk_approve_newest_request_of_a_user_wins(db, newest_first):
+    reviewer = _user(db, "admin@x.com", UserRole.super_admin)
+    student = _user(db, "s@x.com")
+    other = _user(db, "o@x.com")
+    now = datetime.utcnow()
+    older = _request(db, student, now - timedelta(hours=1))
+    newer = _request(db, student, now)
+    single = _request(db, other, now - timedelta(hours=2))
+
+    ids = [newer.id, older.id, single.id] if newest_first else [older.id, newer.id, single.id]
+    outcomes = _apply_reviews(db, ids, APPROVE, reviewer)
+
+    assert outcomes == {older.id: "superseded", newer.id: "approved", single.id: "approved"}
+    assert _statuses(db, older, newer, single) == [
+        RoleRequestStatus.pending, RoleRequestStatus.approved, RoleRequestStatus.approved,
+    ]
+    assert db.get(User, student.id).role == UserRole.club_admin
+
+
+def test_bulk_approve_same_timestamp_falls_back_to_id(db):
+    reviewer = _user(db, "admin@x.com", UserRole.super_admin)
+    student = _user(db, "s@x.com")
+    now = datetime.utcnow()
+    first, second = _request(db, student, now), _request(db, student, now)
+
+    outcomes = _apply_reviews(db, [second.id, first.id], APPROVE, reviewer)
+
+    assert outcomes == {first.id: "superseded", second.id: "approved"}
+
+
+def test_bulk_reject_decides_every_request(db):
+    reviewer = _user(db, "admin@x.com", UserRole.super_admin)
+    student = _user(db, "s@x.com")
+    now = datetime.utcnow()
+    older, newer = _request(db, student, now - timedelta(hours=1)), _request(db, student, now)
+
+    outcomes = _apply_reviews(db, [older.id, newer.id, 999], RoleRequestReview(status=RoleRequestStatus.rejected), reviewer)
+
+    assert outcomes == {older.id: "rejected", newer.id: "rejected", 999: "not_found"}
+    assert db.get(User, student.id).role == UserRole.student
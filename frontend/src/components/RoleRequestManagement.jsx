@@ -20,24 +20,30 @@ const RoleRequestManagement = () => {
     const [filter, setFilter] = useState('pending'); // pending, all
     const [reviewingId, setReviewingId] = useState(null);
     const [reviewNotes, setReviewNotes] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
+    const [loadingMore, setLoadingMore] = useState(false);
 
     useEffect(() => {
         fetchRequests();
     }, [filter]);
 
-    const fetchRequests = async () => {
-        setLoading(true);
+    // Bina cursor ke pehla page; "Load more" X-Next-Cursor wala agla page jodta hai
+    const fetchRequests = async (cursor = null) => {
+        if (cursor) setLoadingMore(true); else setLoading(true);
         setError('');
         
         try {
+            const params = { cursor: cursor || undefined };
             const response = filter === 'pending' 
-                ? await roleRequestApi.getPendingRequests()
-                : await roleRequestApi.getAllRequests();
-            setRequests(response.data);
+                ? await roleRequestApi.getPendingRequests(params)
+                : await roleRequestApi.getAllRequests(params);
+            setRequests(prev => cursor ? [...prev, ...response.data] : response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
         } catch (err) {
             setError(err.message || 'Failed to fetch role requests');
         } finally {
             setLoading(false);
+            setLoadingMore(false);
         }
     };
 
@@ -115,7 +121,7 @@ const RoleRequestManagement = () => {
                     <p className="text-secondary">Review and manage user role upgrade requests</p>
                 </div>
                 <button
-                    onClick={fetchRequests}
+                    onClick={() => fetchRequests()}
                     className="flex items-center space-x-2 px-4 py-2 bg-accent/10 text-accent rounded-xl hover:bg-accent/20 transition-colors"
                 >
                     <RefreshCw className="w-4 h-4" />
@@ -144,7 +150,7 @@ const RoleRequestManagement = () => {
                                 ? 'bg-white/20 text-white'
                                 : 'bg-accent/10 text-accent'
                         }`}>
-                            {tab.count}
+                            {tab.count}{nextCursor && filter === tab.key ? '+' : ''}
                         </span>
                     </button>
                 ))}
@@ -306,6 +312,17 @@ const RoleRequestManagement = () => {
                         </motion.div>
                     ))
                 )}
+                {nextCursor && (
+                    <div className="text-center">
+                        <button
+                            onClick={() => fetchRequests(nextCursor)}
+                            disabled={loadingMore}
+                            className="px-4 py-2 rounded-xl border border-border text-primary hover:bg-border disabled:opacity-50"
+                        >
+                            {loadingMore ? 'Loading...' : 'Load more'}
+                        </button>
+                    </div>
+                )}
             </div>
         </div>
     );
@@ -131,32 +131,65 @@ const UserTable = ({ users, handleRoleChange, handleDeleteUser, currentUser }) =
 const UserManagementPanel = () => {
     const [users, setUsers] = useState([]);
     const [loading, setLoading] = useState(true);
+    const [search, setSearch] = useState('');
+    const [nextCursor, setNextCursor] = useState(null);
+    const [roleCounts, setRoleCounts] = useState({});
     const { user: currentUser } = useAuth();
-    const fetchUsers = useCallback(async () => { setLoading(true); try { const response = await adminApi.getAllUsers(); setUsers(response.data); } catch (err) { console.error('Failed to fetch users.'); } finally { setLoading(false); } }, []);
-    useEffect(() => { fetchUsers(); }, [fetchUsers]);
+    // Search server par hota hai; "Load more" agla page cursor se laata hai
+    const fetchUsers = useCallback(async (cursor = null) => {
+        if (!cursor) setLoading(true);
+        try {
+            const params = { q: search || undefined };
+            // Counts sirf pehle page ke saath - "Load more" se nahi badalte
+            const [response, counts] = await Promise.all([
+                adminApi.getAllUsers({ ...params, cursor: cursor || undefined }),
+                cursor ? null : adminApi.getUserRoleCounts(params),
+            ]);
+            setUsers(prev => cursor ? [...prev, ...response.data] : response.data);
+            setNextCursor(response.headers['x-next-cursor'] || null);
+            if (counts) setRoleCounts(counts.data);
+        } catch (err) { console.error('Failed to fetch users.'); } finally { setLoading(false); }
+    }, [search]);
+    useEffect(() => { const timer = setTimeout(() => fetchUsers(), 300); return () => clearTimeout(timer); }, [fetchUsers]);
+    const handleExport = async () => {
+        try {
+            const response = await adminApi.exportUsers({ q: search || undefined });
+            const url = URL.createObjectURL(response.data);
+            const link = document.createElement('a');
+            link.href = url;
+            link.download = 'users.csv';
+            link.click();
+            URL.revokeObjectURL(url);
+        } catch (err) { alert('Failed to export users.'); }
+    };
     const handleRoleChange = async (userId, newRole) => { if (!window.confirm(`Are you sure you want to change this user's role to ${newRole}?`)) return; try { await adminApi.updateUserRole(userId, newRole); fetchUsers(); } catch (err) { alert('Failed to update role.'); } };
     const handleDeleteUser = async (userId) => { if (!window.confirm('Are you sure you want to PERMANENTLY delete this user?')) return; try { await adminApi.deleteUser(userId); fetchUsers(); } catch (err) { alert(err.response?.data?.detail || 'Failed to delete user.'); } };
     
-    if (loading) return <div className="text-center text-secondary py-8">Loading user data...</div>;
-    
     const superAdmins = users.filter(u => u.role === 'super_admin');
     const clubAdmins = users.filter(u => u.role === 'club_admin');
     const students = users.filter(u => u.role === 'student');
 
     return (
         <div className="space-y-8 animate-fade-in">
+            <div className="flex items-center gap-4">
+                <input type="search" value={search} onChange={(e) => setSearch(e.target.value)} placeholder="Search by name or email..." className="flex-1 bg-card border border-border rounded-lg px-4 py-2 text-primary" />
+                <button onClick={handleExport} className="px-4 py-2 rounded-lg border border-border text-primary hover:bg-border">Export CSV</button>
+            </div>
+            {loading ? <div className="text-center text-secondary py-8">Loading user data...</div> : <>
             <div>
-                <h3 className="text-xl font-bold text-primary mb-4">Super Admins ({superAdmins.length})</h3>
+                <h3 className="text-xl font-bold text-primary mb-4">Super Admins ({roleCounts.super_admin ?? superAdmins.length})</h3>
                 <UserTable users={superAdmins} handleRoleChange={handleRoleChange} handleDeleteUser={handleDeleteUser} currentUser={currentUser} />
             </div>
             <div>
-                <h3 className="text-xl font-bold text-primary mb-4">Club Admins ({clubAdmins.length})</h3>
+                <h3 className="text-xl font-bold text-primary mb-4">Club Admins ({roleCounts.club_admin ?? clubAdmins.length})</h3>
                 <UserTable users={clubAdmins} handleRoleChange={handleRoleChange} handleDeleteUser={handleDeleteUser} currentUser={currentUser} />
             </div>
             <div>
-                <h3 className="text-xl font-bold text-primary mb-4">Students ({students.length})</h3>
+                <h3 className="text-xl font-bold text-primary mb-4">Students ({roleCounts.student ?? students.length})</h3>
                 <UserTable users={students} handleRoleChange={handleRoleChange} handleDeleteUser={handleDeleteUser} currentUser={currentUser} />
             </div>
+            {nextCursor && <div className="text-center"><button onClick={() => fetchUsers(nextCursor)} className="px-4 py-2 rounded-lg border border-border text-primary hover:bg-border">Load more</button></div>}
+            </>}
         </div>
     );
 };
@@ -53,6 +53,16 @@ const EnrollFacePage = () => {
     };
 
     // Enroll karne ke liye
+    // Background job khatam hone tak status poll karein
+    const waitForEnrollment = async (jobId) => {
+        while (true) {
+            const { data: job } = await authApi.getEnrollmentJob(jobId);
+            if (job.status === 'completed') return job;
+            if (job.status === 'failed') throw new Error(job.detail || 'Enrollment failed.');
+            await new Promise(resolve => setTimeout(resolve, 1000));
+        }
+    };
+
     const handleEnroll = () => {
         if (!capturedImage) {
             setError("Please capture a photo first.");
@@ -63,11 +73,12 @@ const EnrollFacePage = () => {
             setIsEnrolling(true);
             setMessage('Enrolling your face... Please wait.');
             try {
-                await authApi.enrollFace(blob);
+                const { data: job } = await authApi.enrollFace(blob);
+                await waitForEnrollment(job.job_id);
                 setMessage('Enrollment Successful! You can now use AI attendance.');
                 setCapturedImage(null); // Reset after success
             } catch (err) {
-                const errorDetail = err.response?.data?.detail || "Enrollment failed. Please try again with a clear photo.";
+                const errorDetail = err.response?.data?.detail || err.message || "Enrollment failed. Please try again with a clear photo.";
                 setError(errorDetail);
                 setMessage('');
             } finally {
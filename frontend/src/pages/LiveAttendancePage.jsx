@@ -1,10 +1,17 @@
 import React, { useState, useEffect, useRef } from 'react';
 import { Camera, Zap, CheckCircle, UserX, Users } from 'lucide-react';
 
+const FRAME_HEADER_SIZE = 10;
+
 const LiveAttendancePage = () => {
     const videoRef = useRef(null);
     const canvasRef = useRef(null);
     const wsRef = useRef(null);
+    // Server RATE messages ke hisaab se frame bhejne ka interval badalta hai
+    const sendIntervalRef = useRef(2000);
+    // CONFIG milne tak purana text (data URL) protocol hi chalega
+    const frameConfigRef = useRef({ protocol: 'text', format: 'image/jpeg', max_side: 640, quality: 0.5 });
+    const frameIdRef = useRef(0);
 
     const [isConnected, setIsConnected] = useState(false);
     const [lastMessage, setLastMessage] = useState({ status: 'INITIALIZING', name: 'System Ready' });
@@ -31,13 +38,30 @@ const LiveAttendancePage = () => {
         const wsUrl = apiBaseUrl.replace('http', 'ws').replace('https', 'wss') + '/attendance/ws/general';
         wsRef.current = new WebSocket(wsUrl);
 
-        wsRef.current.onopen = () => setIsConnected(true);
+        wsRef.current.onopen = () => {
+            setIsConnected(true);
+            // Server ke saath binary protocol, format aur resolution tay karein
+            wsRef.current.send(JSON.stringify({
+                type: 'hello',
+                binary: true,
+                formats: ['image/webp', 'image/jpeg'],
+                max_side: 1280,
+            }));
+        };
         wsRef.current.onclose = () => setIsConnected(false);
         wsRef.current.onerror = () => setError("Connection to attendance server failed.");
 
         // 3. Backend se message receive karein
         wsRef.current.onmessage = (event) => {
             const data = JSON.parse(event.data);
+            if (data.status === 'CONFIG') {
+                frameConfigRef.current = data;
+                return;
+            }
+            if (data.status === 'RATE') {
+                sendIntervalRef.current = data.interval_ms;
+                return;
+            }
             setLastMessage(data);
 
             if ((data.status === 'SUCCESS' || data.status === 'ALREADY_MARKED')) {
@@ -51,26 +75,50 @@ const LiveAttendancePage = () => {
             }
         };
 
-        // 4. Har 2 second mein video ka frame backend ko bhejein
-        const intervalId = setInterval(() => {
+        // Binary frame: 10-byte header (version, flags, frame id, event id) + raw image bytes
+        const sendBinaryFrame = async (blob) => {
+            if (!blob || wsRef.current?.readyState !== WebSocket.OPEN) return;
+            const image = new Uint8Array(await blob.arrayBuffer());
+            const frame = new Uint8Array(FRAME_HEADER_SIZE + image.length);
+            const header = new DataView(frame.buffer);
+            frameIdRef.current = (frameIdRef.current + 1) >>> 0;
+            header.setUint8(0, frameConfigRef.current.version || 1);
+            header.setUint8(1, 0);
+            header.setUint32(2, frameIdRef.current);
+            header.setUint32(6, 0); // 0 = general attendance
+            frame.set(image, FRAME_HEADER_SIZE);
+            wsRef.current.send(frame.buffer);
+        };
+
+        // 4. Server jitni tezi se process kar sake utni tezi se video frame bhejein
+        let timeoutId;
+        const sendFrame = () => {
             if (wsRef.current?.readyState === WebSocket.OPEN && videoRef.current) {
                 const video = videoRef.current;
                 // Check karein ki video capture karne ke liye taiyaar hai ya nahi
                 if (video.readyState >= 3) {
+                    const config = frameConfigRef.current;
+                    const scale = Math.min(1, config.max_side / Math.max(video.videoWidth, video.videoHeight));
                     const canvas = canvasRef.current;
-                    canvas.width = video.videoWidth;
-                    canvas.height = video.videoHeight;
+                    canvas.width = Math.round(video.videoWidth * scale);
+                    canvas.height = Math.round(video.videoHeight * scale);
                     const context = canvas.getContext('2d');
                     context.drawImage(video, 0, 0, canvas.width, canvas.height);
-                    const dataUrl = canvas.toDataURL('image/jpeg', 0.5); // Quality kam karke speed badhayein
-                    wsRef.current.send(dataUrl);
+                    if (config.protocol === 'binary') {
+                        canvas.toBlob(sendBinaryFrame, config.format, config.quality);
+                    } else {
+                        const dataUrl = canvas.toDataURL('image/jpeg', config.quality); // Quality kam karke speed badhayein
+                        wsRef.current.send(dataUrl);
+                    }
                 }
             }
-        }, 2000);
+            timeoutId = setTimeout(sendFrame, sendIntervalRef.current);
+        };
+        timeoutId = setTimeout(sendFrame, sendIntervalRef.current);
 
         // 5. Component band hone par sab kuch saaf karein
         return () => {
-            clearInterval(intervalId);
+            clearTimeout(timeoutId);
             if (wsRef.current) wsRef.current.close();
             if (videoRef.current?.srcObject) {
                 videoRef.current.srcObject.getTracks().forEach(track => track.stop());
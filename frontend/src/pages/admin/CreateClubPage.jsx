@@ -19,8 +19,10 @@ const CreateClubPage = () => {
     const [coordinatorId, setCoordinatorId] = useState('');
     const [subCoordinatorId, setSubCoordinatorId] = useState('');
 
-    // User list for dropdowns
+    // User list for dropdowns: one page of search results, plus whoever is already picked
     const [users, setUsers] = useState([]);
+    const [userSearch, setUserSearch] = useState('');
+    const [pickedUsers, setPickedUsers] = useState({});
 
     // General State
     const [loading, setLoading] = useState(false);
@@ -29,24 +31,36 @@ const CreateClubPage = () => {
     const navigate = useNavigate();
     const { user } = useAuth();
 
-    // Fetch all users to populate coordinator dropdowns
+    // Coordinator dropdowns search users on the server (name or email) instead of loading everyone
     useEffect(() => {
         if (user && user.role === 'super_admin') {
             const fetchUsers = async () => {
                 try {
-                    const response = await adminApi.getAllUsers();
+                    const response = await adminApi.getAllUsers({ q: userSearch || undefined, limit: 50 });
                     setUsers(response.data);
                 } catch (err) {
                     console.error("Failed to fetch users:", err);
                     setError("Could not load user list for coordinators.");
                 }
             };
-            fetchUsers();
+            const timer = setTimeout(fetchUsers, 300);
+            return () => clearTimeout(timer);
         } else {
             // Redirect if not a super admin
             navigate('/dashboard');
         }
-    }, [user, navigate]);
+    }, [user, navigate, userSearch]);
+
+    // Picked users stay in the options when a new search no longer returns them
+    const userOptions = [
+        ...Object.values(pickedUsers).filter(p => !users.some(u => u.id === p.id)),
+        ...users,
+    ];
+    const pickUser = (setter) => (e) => {
+        const picked = userOptions.find(u => String(u.id) === e.target.value);
+        if (picked) setPickedUsers(prev => ({ ...prev, [picked.id]: picked }));
+        setter(e.target.value);
+    };
 
     const handleFileChange = (e) => {
         const selectedFile = e.target.files[0];
@@ -157,18 +171,22 @@ const CreateClubPage = () => {
                                     <label htmlFor="website" className="flex items-center text-sm font-medium text-secondary"><Link size={14} className="mr-2"/>Website URL</label>
                                     <input id="website" type="url" value={websiteUrl} onChange={(e) => setWebsiteUrl(e.target.value)} className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent" />
                                 </div>
+                                <div className="md:col-span-2">
+                                    <label htmlFor="user-search" className="block text-sm font-medium text-secondary">Find coordinators</label>
+                                    <input id="user-search" type="search" value={userSearch} onChange={(e) => setUserSearch(e.target.value)} placeholder="Search users by name or email..." className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent" />
+                                </div>
                                 <div>
                                     <label htmlFor="coordinator" className="block text-sm font-medium text-secondary">Coordinator</label>
-                                    <select id="coordinator" value={coordinatorId} onChange={(e) => setCoordinatorId(e.target.value)} className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent">
+                                    <select id="coordinator" value={coordinatorId} onChange={pickUser(setCoordinatorId)} className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent">
                                         <option value="">Select a coordinator...</option>
-                                        {users.map(u => <option key={u.id} value={u.id}>{u.full_name}</option>)}
+                                        {userOptions.map(u => <option key={u.id} value={u.id}>{u.full_name} ({u.email})</option>)}
                                     </select>
                                 </div>
                                 <div>
                                     <label htmlFor="sub-coordinator" className="block text-sm font-medium text-secondary">Sub-Coordinator</label>
-                                    <select id="sub-coordinator" value={subCoordinatorId} onChange={(e) => setSubCoordinatorId(e.target.value)} className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent">
+                                    <select id="sub-coordinator" value={subCoordinatorId} onChange={pickUser(setSubCoordinatorId)} className="mt-1 w-full px-4 py-2 bg-background border border-border rounded-md focus:ring-2 focus:ring-accent">
                                         <option value="">Select a sub-coordinator...</option>
-                                        {users.map(u => <option key={u.id} value={u.id}>{u.full_name}</option>)}
+                                        {userOptions.map(u => <option key={u.id} value={u.id}>{u.full_name} ({u.email})</option>)}
                                     </select>
                                 </div>
                             </div>
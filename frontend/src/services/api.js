@@ -65,13 +65,15 @@ export const authApi = {
     loginWithGoogle: (googleToken) => apiClient.post('/users/google-login', { token: googleToken }),
     getCurrentUser: () => apiClient.get('/users/me'),
     getMyClubs: () => apiClient.get('/users/me/administered-clubs'),
-    enrollFace: (imageBlob) => {
+    // Accepts one blob or an array of blobs; returns a background job to poll
+    enrollFace: (imageBlobs) => {
         const formData = new FormData();
-        formData.append('file', imageBlob, 'face.jpg');
+        [].concat(imageBlobs).forEach((blob, i) => formData.append('files', blob, `face-${i}.jpg`));
         return apiClient.post('/users/me/enroll-face', formData, {
             headers: { 'Content-Type': 'multipart/form-data' },
         });
     },
+    getEnrollmentJob: (jobId) => apiClient.get(`/users/me/enroll-face/${jobId}`),
 };
 
 
@@ -158,7 +160,19 @@ export const photoApi = {
 // --- ⚙️ Admin API ---
 // ============================================================================
 export const adminApi = {
-    getAllUsers: () => apiClient.get('/admin/users'),
+    // params: { q, role, limit, cursor } - next page cursor is in the X-Next-Cursor header
+    getAllUsers: (params) => apiClient.get('/admin/users', { params }),
+    // params: { q } - users per role for the same search, not just the loaded page
+    getUserRoleCounts: (params) => apiClient.get('/admin/users/role-counts', { params }),
+    exportUsers: (params) => apiClient.get('/admin/users/export', { params, responseType: 'blob' }),
+    // CSV or JSON file; the report lists per-row errors and any generated temporary passwords
+    importUsers: (file) => {
+        const formData = new FormData();
+        formData.append('file', file);
+        return apiClient.post('/admin/users/import', formData, {
+            headers: { 'Content-Type': 'multipart/form-data' },
+        });
+    },
     updateUserRole: (userId, newRole) => apiClient.put(`/admin/users/${userId}/role?new_role=${newRole}`),
     deleteUser: (userId) => apiClient.delete(`/admin/users/${userId}`),
     getDashboardStats: () => apiClient.get('/admin/stats'),
@@ -192,10 +206,13 @@ export const attendanceApi = {
 // ============================================================================
 export const roleRequestApi = {
     requestRole: (requestData) => apiClient.post('/role-requests/request-role', requestData),
-    getMyRequests: () => apiClient.get('/role-requests/my-requests'),
-    getAllRequests: () => apiClient.get('/role-requests/all-requests'),
-    getPendingRequests: () => apiClient.get('/role-requests/pending-requests'),
+    // params: { status, requested_role, limit, cursor } - next page cursor is in the X-Next-Cursor header
+    getMyRequests: (params) => apiClient.get('/role-requests/my-requests', { params }),
+    getAllRequests: (params) => apiClient.get('/role-requests/all-requests', { params }),
+    getPendingRequests: (params) => apiClient.get('/role-requests/pending-requests', { params }),
     reviewRequest: (requestId, reviewData) => apiClient.post(`/role-requests/review-request/${requestId}`, reviewData),
+    // reviewData: { request_ids: [...], status: 'approved' | 'rejected', admin_notes }
+    bulkReviewRequests: (reviewData) => apiClient.post('/role-requests/review-requests', reviewData),
     cancelRequest: (requestId) => apiClient.delete(`/role-requests/cancel-request/${requestId}`),
 };
 